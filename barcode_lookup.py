@@ -7,7 +7,10 @@ Optional dependencies: pyzbar (for scanning), requests (for API calls), pillow (
 """
 
 import json
+import re
 import sys
+import time
+from functools import lru_cache
 
 # Try to import optional dependencies
 try:
@@ -26,11 +29,28 @@ except ImportError:
 
 OPEN_FOOD_FACTS_API = "https://world.openfoodfacts.org/api/v0/product/{}.json"
 
+# One session per process, so lookups reuse a pooled keep-alive connection
+# instead of paying a new TCP and TLS handshake each time
+_session = requests.Session() if REQUESTS_AVAILABLE else None
+
+# Separators stripped from scanned or typed barcodes (any whitespace, dashes)
+_BARCODE_SEPARATORS = re.compile(r'[\s-]+')
+
+# Barcodes the API had no product for, mapped to when to ask again. Products
+# get added over time, so a miss is only remembered for a day.
+_NOT_FOUND_TTL = 24 * 60 * 60
+_NOT_FOUND_MAX = 1024
+_not_found = {}
+
 
 def lookup_barcode(barcode):
     """
     Look up product information from Open Food Facts API.
     
+    Successful lookups are memoized per normalized barcode, so scanning the
+    same bottle again does not repeat the network request. Barcodes with no
+    product are remembered for a day; network and API errors are not.
+    
     Args:
         barcode (str): Barcode/UPC/EAN code.
         
@@ -45,33 +65,23 @@ def lookup_barcode(barcode):
         print("Error: Barcode cannot be empty.")
         return None
     
-    # Clean barcode (remove spaces, dashes)
-    barcode = ''.join(barcode.split())
-    barcode = barcode.replace('-', '')
+    # Clean barcode (remove spaces, dashes) in a single pass
+    barcode = _BARCODE_SEPARATORS.sub('', barcode)
+    
+    retry_at = _not_found.get(barcode)
+    if retry_at is not None and retry_at > time.monotonic():
+        print(f"No product found for barcode: {barcode}")
+        return None
     
     try:
-        url = OPEN_FOOD_FACTS_API.format(barcode)
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data.get('status') == 1 and data.get('product'):
-            product = data['product']
-            return {
-                'name': product.get('product_name', '') or product.get('product_name_en', '') or 'Unknown',
-                'brand': product.get('brands', '') or product.get('brand', ''),
-                'category': _extract_category(product),
-                'abv': _extract_abv(product),
-                'volume': _extract_volume(product),
-                'description': product.get('generic_name', '') or product.get('generic_name_en', ''),
-                'image_url': product.get('image_url', ''),
-                'barcode': barcode,
-                'source': 'openfoodfacts'
-            }
-        else:
-            print(f"No product found for barcode: {barcode}")
-            return None
-            
+        # Copy so callers can't modify the memoized result
+        return dict(_lookup_impl(barcode))
+    except _ProductNotFound:
+        if len(_not_found) >= _NOT_FOUND_MAX:
+            _not_found.clear()
+        _not_found[barcode] = time.monotonic() + _NOT_FOUND_TTL
+        print(f"No product found for barcode: {barcode}")
+        return None
     except requests.exceptions.RequestException as e:
         print(f"Error connecting to Open Food Facts API: {e}")
         return None
@@ -83,6 +93,49 @@ def lookup_barcode(barcode):
         return None
 
 
+class _ProductNotFound(Exception):
+    """Raised by _lookup_impl when the API has no product for a barcode."""
+
+
+@lru_cache(maxsize=1024)
+def _lookup_impl(barcode):
+    """
+    Fetch product information for a normalized barcode.
+    
+    Misses and errors are raised rather than returned, so lru_cache only
+    keeps successful lookups and a failed barcode is retried next time.
+    
+    Args:
+        barcode (str): Normalized barcode.
+        
+    Returns:
+        dict: Product information.
+        
+    Raises:
+        _ProductNotFound: If the API has no product for the barcode.
+    """
+    url = OPEN_FOOD_FACTS_API.format(barcode)
+    response = _session.get(url, timeout=10)
+    response.raise_for_status()
+    data = response.json()
+    
+    if data.get('status') != 1 or not data.get('product'):
+        raise _ProductNotFound(barcode)
+    
+    product = data['product']
+    return {
+        'name': product.get('product_name', '') or product.get('product_name_en', '') or 'Unknown',
+        'brand': product.get('brands', '') or product.get('brand', ''),
+        'category': _extract_category(product),
+        'abv': _extract_abv(product),
+        'volume': _extract_volume(product),
+        'description': product.get('generic_name', '') or product.get('generic_name_en', ''),
+        'image_url': product.get('image_url', ''),
+        'barcode': barcode,
+        'source': 'openfoodfacts'
+    }
+
+
 def _extract_category(product):
     """Extract category from product data, mapping to spirits categories."""
     # Try various category fields
@@ -148,7 +201,6 @@ def _extract_abv(product):
     
     # Try to extract from product name or description
     name = (product.get('product_name', '') + ' ' + product.get('generic_name', '')).lower()
-    import re
     abv_match = re.search(r'(\d+(?:\.\d+)?)\s*%', name)
     if abv_match:
         try:
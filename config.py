@@ -7,7 +7,11 @@ Handles user preferences and configuration settings.
 
 import json
 import os
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
+
+from json_utils import parse_json_bytes, write_json_atomic
 
 
 DEFAULT_CONFIG = {
@@ -33,38 +37,96 @@ DEFAULT_CONFIG = {
     }
 }
 
+# Merged configs: real path -> (st_mtime_ns, st_size, config)
+_CONFIG_CACHE = {}
+
 
 def load_config(filepath='config.json'):
     """Load configuration from JSON file.
     
+    The merged result is cached in-process and reused until the file's
+    modification time or size changes. It is returned as a read-only view
+    (nested dicts are mappingproxies, lists are tuples) so every caller can
+    share it without copying; use mutable_copy() to get an editable dict.
+    
     Args:
         filepath (str): Path to configuration file.
         
     Returns:
-        dict: Configuration data, or default config if file not found.
+        Mapping: Configuration data, or default config if file not found.
     """
-    if not os.path.exists(filepath):
+    try:
+        st = os.stat(filepath)
+    except FileNotFoundError:
         # Create default config file
         save_config(DEFAULT_CONFIG, filepath)
-        return DEFAULT_CONFIG.copy()
+        return _freeze(DEFAULT_CONFIG)
+    except OSError as e:
+        print(f"Error loading config: {e}. Using defaults.")
+        return _freeze(DEFAULT_CONFIG)
+    
+    key = os.path.realpath(filepath)
+    cached = _CONFIG_CACHE.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
     
     try:
-        with open(filepath, 'r') as f:
-            config = json.load(f)
-            # Merge with defaults to ensure all keys exist
-            merged = DEFAULT_CONFIG.copy()
-            merged.update(config)
-            # Deep merge for nested dictionaries
-            if 'user_preferences' in config:
-                merged['user_preferences'].update(config['user_preferences'])
-            if 'import_sources' in config:
-                merged['import_sources'].update(config['import_sources'])
-            if 'data_files' in config:
-                merged['data_files'].update(config['data_files'])
-            return merged
+        config = parse_json_bytes(Path(filepath).read_bytes())
     except (json.JSONDecodeError, PermissionError) as e:
         print(f"Error loading config: {e}. Using defaults.")
-        return DEFAULT_CONFIG.copy()
+        return _freeze(DEFAULT_CONFIG)
+    
+    # Merge with defaults to ensure all keys exist, one level deep for
+    # nested sections. Start from a fresh copy so DEFAULT_CONFIG's nested
+    # dicts are never updated in place.
+    merged = mutable_copy(DEFAULT_CONFIG)
+    for section, values in config.items():
+        if isinstance(values, dict) and isinstance(merged.get(section), dict):
+            merged[section].update(values)
+        else:
+            merged[section] = values
+    
+    frozen = _freeze(merged)
+    _CONFIG_CACHE[key] = (st.st_mtime_ns, st.st_size, frozen)
+    return frozen
+
+
+def mutable_copy(config):
+    """Return a plain, editable deep copy of a configuration.
+    
+    Args:
+        config (Mapping): Configuration, e.g. as returned by load_config.
+        
+    Returns:
+        dict: Copy built from plain dicts and lists.
+    """
+    if isinstance(config, Mapping):
+        return {key: mutable_copy(value) for key, value in config.items()}
+    if isinstance(config, (list, tuple)):
+        return [mutable_copy(value) for value in config]
+    return config
+
+
+def _freeze(config):
+    """Return a read-only view of config: mappingproxies and tuples all the way down."""
+    if isinstance(config, Mapping):
+        return MappingProxyType({key: _freeze(value) for key, value in config.items()})
+    if isinstance(config, (list, tuple)):
+        return tuple(_freeze(value) for value in config)
+    return config
+
+
+def invalidate(filepath=None):
+    """Drop cached configuration so the next load_config re-reads from disk.
+    
+    Args:
+        filepath (str, optional): Config file to evict. Clears the whole
+            cache if None.
+    """
+    if filepath is None:
+        _CONFIG_CACHE.clear()
+    else:
+        _CONFIG_CACHE.pop(os.path.realpath(filepath), None)
 
 
 def save_config(config, filepath='config.json'):
@@ -78,8 +140,9 @@ def save_config(config, filepath='config.json'):
         bool: True if successful, False otherwise.
     """
     try:
-        with open(filepath, 'w') as f:
-            json.dump(config, f, indent=2)
+        # Accepts read-only configs from load_config as well as plain dicts;
+        # the atomic write never leaves a truncated config behind
+        write_json_atomic(mutable_copy(config), filepath)
         return True
     except PermissionError:
         print(f"Error: Permission denied writing to {filepath}.")
@@ -87,6 +150,8 @@ def save_config(config, filepath='config.json'):
     except Exception as e:
         print(f"Error saving config: {e}")
         return False
+    finally:
+        invalidate(filepath)
 
 
 def get_tasting_frequency_days(config):
@@ -0,0 +1,31 @@
+"""
+Date Helpers for Dram Planner
+
+Date parsing shared by the CLI modules and the web app. This module only
+uses the standard library, so either can import it without pulling in the
+other's configuration.
+"""
+
+from datetime import date
+
+
+def parse_iso_date(value):
+    """Parse a YYYY-MM-DD string into a date.
+    
+    Uses the C-level date.fromisoformat rather than strptime. Newer Pythons
+    accept other ISO forms there too, so the round trip keeps the strict
+    YYYY-MM-DD format.
+    
+    Args:
+        value (str): Date string.
+        
+    Returns:
+        date: Parsed date.
+        
+    Raises:
+        ValueError: If value is not a valid YYYY-MM-DD date.
+    """
+    parsed = date.fromisoformat(value)
+    if parsed.isoformat() != value:
+        raise ValueError(f"Invalid isoformat string: {value!r}")
+    return parsed
@@ -8,7 +8,9 @@ Handles importing bottles from various formats: CSV, JSON, Excel
 import json
 import csv
 import os
-from datetime import datetime
+from datetime import date, datetime
+
+from json_utils import parse_json_bytes
 
 # Try to import optional dependencies
 try:
@@ -17,6 +19,19 @@ try:
 except ImportError:
     EXCEL_AVAILABLE = False
 
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# JSON imports at least this large are streamed (when ijson is installed)
+# rather than parsed into memory in one piece
+_JSON_STREAM_THRESHOLD = 16 * 1024 * 1024
+
+# Fields every imported bottle must have a non-blank value for
+_REQUIRED_FIELDS = ('name', 'category')
+
 
 def validate_bottle_data(bottle_data, row_num=None):
     """
@@ -32,11 +47,9 @@ def validate_bottle_data(bottle_data, row_num=None):
     errors = []
     
     # Required fields
-    if 'name' not in bottle_data or not bottle_data.get('name', '').strip():
-        errors.append(f"Row {row_num}: Missing or empty 'name' field")
-    
-    if 'category' not in bottle_data or not bottle_data.get('category', '').strip():
-        errors.append(f"Row {row_num}: Missing or empty 'category' field")
+    for field in _REQUIRED_FIELDS:
+        if not bottle_data.get(field, '').strip():
+            errors.append(f"Row {row_num}: Missing or empty '{field}' field")
     
     # Validate ABV if provided
     if 'abv' in bottle_data and bottle_data['abv'] is not None:
@@ -57,15 +70,39 @@ def validate_bottle_data(bottle_data, row_num=None):
             errors.append(f"Row {row_num}: Invalid price value: {bottle_data['price_paid']}")
     
     # Validate date format if provided
-    if 'purchase_date' in bottle_data and bottle_data.get('purchase_date'):
-        try:
-            datetime.strptime(bottle_data['purchase_date'], '%Y-%m-%d')
-        except ValueError:
-            errors.append(f"Row {row_num}: Invalid date format '{bottle_data['purchase_date']}'. Use YYYY-MM-DD")
+    purchase_date = bottle_data.get('purchase_date')
+    if purchase_date and not _is_valid_date(purchase_date):
+        errors.append(f"Row {row_num}: Invalid date format '{purchase_date}'. Use YYYY-MM-DD")
     
     return len(errors) == 0, errors
 
 
+def _is_valid_date(value):
+    """
+    Check that value is a date in YYYY-MM-DD form (as strptime accepts it).
+    
+    Canonical dates are checked with the C-level date.fromisoformat, which is
+    several times faster than strptime; anything else (e.g. unpadded months)
+    falls back to strptime so the accepted inputs don't change.
+    
+    Args:
+        value (str): Date string.
+        
+    Returns:
+        bool: True if the date is valid.
+    """
+    try:
+        if date.fromisoformat(value).isoformat() == value:
+            return True
+    except (ValueError, TypeError):
+        pass
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
 def normalize_bottle_data(bottle_data):
     """
     Normalize bottle data to standard format.
@@ -135,7 +172,7 @@ def import_from_csv(csv_file, preview=False):
             sniffer = csv.Sniffer()
             try:
                 delimiter = sniffer.sniff(sample).delimiter
-            except:
+            except csv.Error:
                 delimiter = ','
             
             reader = csv.DictReader(f, delimiter=delimiter)
@@ -219,8 +256,11 @@ def import_from_json(json_file, preview=False):
         return bottles, errors, warnings
     
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if IJSON_AVAILABLE and os.path.getsize(json_file) >= _JSON_STREAM_THRESHOLD:
+            return _import_from_json_stream(json_file)
+        
+        with open(json_file, 'rb') as f:
+            data = parse_json_bytes(f.read())
         
         # Extract bottles array
         if isinstance(data, list):
@@ -239,19 +279,7 @@ def import_from_json(json_file, preview=False):
             errors.append("Bottles data must be an array")
             return bottles, errors, warnings
         
-        # Process each bottle
-        for idx, bottle_data in enumerate(bottles_data, start=1):
-            if not isinstance(bottle_data, dict):
-                errors.append(f"Bottle {idx}: Must be an object")
-                continue
-            
-            normalized = normalize_bottle_data(bottle_data)
-            is_valid, validation_errors = validate_bottle_data(normalized, idx)
-            
-            if is_valid:
-                bottles.append(normalized)
-            else:
-                errors.extend(validation_errors)
+        _process_json_bottles(bottles_data, bottles, errors)
                 
     except json.JSONDecodeError as e:
         errors.append(f"Invalid JSON: {e}")
@@ -261,6 +289,76 @@ def import_from_json(json_file, preview=False):
     return bottles, errors, warnings
 
 
+def _import_from_json_stream(json_file):
+    """
+    Import bottles from a large JSON file without loading it whole.
+    
+    Bottles are parsed one at a time with ijson, so memory use is bounded by
+    the imported bottles rather than by the size of the document.
+    
+    Args:
+        json_file (str): Path to JSON file.
+        
+    Returns:
+        tuple: (bottles_list, errors_list, warnings_list)
+    """
+    bottles = []
+    errors = []
+    warnings = []
+    
+    try:
+        with open(json_file, 'rb') as f:
+            # Pick the array prefix from the first significant byte
+            head = f.read(64).lstrip()
+            f.seek(0)
+            if head.startswith(b'['):
+                prefix = 'item'
+            elif head.startswith(b'{'):
+                prefix = 'bottles.item'
+            else:
+                errors.append("JSON file must be an object or array")
+                return bottles, errors, warnings
+            
+            count = _process_json_bottles(ijson.items(f, prefix, use_float=True), bottles, errors)
+        
+        if count == 0 and prefix == 'bottles.item':
+            errors.append("JSON file must contain 'bottles' array or be an array of bottles")
+    except ijson.JSONError as e:
+        errors.append(f"Invalid JSON: {e}")
+    except Exception as e:
+        errors.append(f"Error reading JSON file: {e}")
+    
+    return bottles, errors, warnings
+
+
+def _process_json_bottles(bottles_data, bottles, errors):
+    """
+    Normalize and validate bottle records, collecting the valid ones.
+    
+    Args:
+        bottles_data (iterable): Raw bottle records.
+        bottles (list): Receives normalized valid bottles.
+        errors (list): Receives validation errors.
+        
+    Returns:
+        int: Number of records processed.
+    """
+    idx = 0
+    for idx, bottle_data in enumerate(bottles_data, start=1):
+        if not isinstance(bottle_data, dict):
+            errors.append(f"Bottle {idx}: Must be an object")
+            continue
+        
+        normalized = normalize_bottle_data(bottle_data)
+        is_valid, validation_errors = validate_bottle_data(normalized, idx)
+        
+        if is_valid:
+            bottles.append(normalized)
+        else:
+            errors.extend(validation_errors)
+    return idx
+
+
 def import_from_excel(excel_file, sheet_name=None, preview=False):
     """
     Import bottles from Excel file (.xlsx).
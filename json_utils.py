@@ -0,0 +1,97 @@
+"""
+JSON File Helpers for Dram Planner
+
+Encoding, decoding and atomic writes shared by the CLI modules, using
+orjson when it is installed and the stdlib json module otherwise.
+"""
+
+import json
+import os
+
+# Optional fast JSON parser/encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def parse_json_bytes(raw):
+    """Parse JSON bytes, using orjson when available.
+    
+    orjson rejects the NaN/Infinity literals the stdlib writes, so anything
+    it cannot parse is handed to the stdlib parser to accept or report.
+    
+    Args:
+        raw (bytes): Encoded JSON document.
+    
+    Returns:
+        Parsed JSON data.
+    
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON.
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
+
+
+def dump_json_bytes(data):
+    """Encode data as indented JSON bytes, using orjson when available.
+    
+    Args:
+        data: JSON-serializable data.
+    
+    Returns:
+        bytes: Encoded JSON document.
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            # e.g. non-string keys or oversized ints, which the stdlib handles
+            pass
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+if ORJSON_AVAILABLE:
+    dump_json_line = orjson.dumps
+else:
+    def dump_json_line(data):
+        """Encode data as compact single-line JSON bytes."""
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def write_json_atomic(data, filepath):
+    """Write data as indented JSON, replacing filepath in one step.
+    
+    The document is encoded once, written to a per-process temp file beside
+    the target, synced and renamed over it, so readers and crashes never see
+    a partially written file and concurrent writers never share a temp file.
+    
+    Args:
+        data: JSON-serializable data.
+        filepath (str): Destination path.
+    
+    Raises:
+        Exception: Whatever encoding or writing raised; the temp file is
+            removed first.
+    """
+    payload = dump_json_bytes(data)
+    tmp_path = f"{filepath}.tmp.{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            # Sync just this file's data rather than relying on a later
+            # whole-filesystem flush; fdatasync is not available everywhere
+            getattr(os, 'fdatasync', os.fsync)(f.fileno())
+        os.replace(tmp_path, filepath)
+    finally:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
@@ -12,6 +12,7 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 import argparse
 import config
+from json_utils import write_json_atomic
 
 
 def load_collection(filepath='collection.json'):
@@ -24,16 +25,18 @@ def load_collection(filepath='collection.json'):
         dict: Collection data or None if file not found or invalid.
     """
     try:
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-            # Validate collection structure
-            if not isinstance(data, dict):
-                print(f"Error: {filepath} is not a valid JSON object.")
-                return None
-            if 'bottles' not in data:
-                print(f"Error: {filepath} missing 'bottles' key.")
-                return None
-            return data
+        # Read bytes so json detects the UTF-8 that the savers write,
+        # whatever the locale's default encoding is
+        with open(filepath, 'rb') as f:
+            data = json.loads(f.read())
+        # Validate collection structure
+        if not isinstance(data, dict):
+            print(f"Error: {filepath} is not a valid JSON object.")
+            return None
+        if 'bottles' not in data:
+            print(f"Error: {filepath} missing 'bottles' key.")
+            return None
+        return data
     except FileNotFoundError:
         print(f"Error: Collection file {filepath} not found. Please create it first.")
         return None
@@ -65,8 +68,7 @@ def save_collection(data, filepath='collection.json'):
         if 'metadata' not in data:
             data['metadata'] = {}
         data['metadata']['last_updated'] = datetime.now().isoformat()
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        write_json_atomic(data, filepath)
         return True
     except PermissionError:
         print(f"Error: Permission denied writing to {filepath}.")
@@ -133,7 +135,7 @@ def is_avoid_date(date, avoid_dates):
     
     Args:
         date (datetime): Date to check.
-        avoid_dates (list): List of date strings in YYYY-MM-DD format.
+        avoid_dates (list or set): Date strings in YYYY-MM-DD format.
         
     Returns:
         bool: True if date should be avoided.
@@ -217,7 +219,8 @@ def generate_schedule(collection, start_date=None, weeks=104, config_data=None):
     # Get preferences from config
     frequency_days = config.get_tasting_frequency_days(config_data)
     preferred_days = config.get_preferred_days(config_data)
-    avoid_dates = config.get_avoid_dates(config_data)
+    # Set once so the per-slot is_avoid_date check is a hash lookup
+    avoid_dates = frozenset(config.get_avoid_dates(config_data))
     category_prefs = config.get_category_preferences(config_data)
     seasonal_enabled = config.get_seasonal_adjustments(config_data)
     min_days_between_category = config.get_min_days_between_category(config_data)
@@ -241,12 +244,11 @@ def generate_schedule(collection, start_date=None, weeks=104, config_data=None):
         print("No bottles in collection!")
         return []
     
-    # Separate tasted and untasted bottles
-    untasted = [b for b in bottles if not b.get('tasted', False)]
-    tasted = [b for b in bottles if b.get('tasted', False)]
-    
-    # Categorize bottles
-    categories = categorize_bottles(bottles)
+    # Separate tasted and untasted bottles in one pass
+    untasted = []
+    tasted = []
+    for bottle in bottles:
+        (tasted if bottle.get('tasted', False) else untasted).append(bottle)
     
     # Create weighted bottle pool with preferences
     all_bottles = []
@@ -264,18 +266,22 @@ def generate_schedule(collection, start_date=None, weeks=104, config_data=None):
     total_days = weeks * 7  # Rough estimate, will adjust based on frequency
     total_tastings = int(total_days / frequency_days)
     
+    # all_bottles holds the untasted bottles first, then the tasted ones, so
+    # the two groups can be sliced out instead of re-filtered.
+    split = len(untasted)
+    
     # If we have fewer bottles than tastings, we'll repeat some
     if total_bottles <= total_tastings:
         needed_repeats = total_tastings - total_bottles
-        repeat_pool = [(b, w) for b, w in all_bottles if b.get('tasted', False)]
+        repeat_pool = all_bottles[split:]
         if not repeat_pool:
             repeat_pool = all_bottles.copy()
         random.shuffle(repeat_pool)
         all_bottles.extend(repeat_pool[:needed_repeats])
     else:
         # We have more bottles than tastings - prioritize untasted
-        untasted_weighted = [(b, w) for b, w in all_bottles if not b.get('tasted', False)]
-        tasted_weighted = [(b, w) for b, w in all_bottles if b.get('tasted', False)]
+        untasted_weighted = all_bottles[:split]
+        tasted_weighted = all_bottles[split:]
         if len(untasted_weighted) >= total_tastings:
             all_bottles = untasted_weighted[:total_tastings]
         else:
@@ -359,13 +365,16 @@ def save_schedule(schedule, filepath='tasting_schedule.json'):
         if not isinstance(schedule, list):
             print("Error: Schedule must be a list.")
             return False
+        # Keep entries ordered by date on disk, so readers sorting upcoming
+        # entries get an already-ordered run. sorted() is stable and linear
+        # for the already-ordered output of generate_schedule().
+        schedule = sorted(schedule, key=lambda entry: entry.get('date', ''))
         schedule_data = {
             'generated_date': datetime.now().isoformat(),
             'total_weeks': len(schedule),
             'schedule': schedule
         }
-        with open(filepath, 'w') as f:
-            json.dump(schedule_data, f, indent=2)
+        write_json_atomic(schedule_data, filepath)
         print(f"Schedule saved to {filepath}")
         return True
     except PermissionError:
@@ -433,11 +442,14 @@ def main():
         return 1
     
     if args.preview:
-        print("\nPreview of first 10 weeks:")
-        print(f"{'Week':<6} {'Date':<12} {'Bottle':<30} {'Category':<15}")
-        print("-" * 70)
-        for entry in schedule[:10]:
-            print(f"{entry['week']:<6} {entry['date']:<12} {entry['bottle_name']:<30} {entry['category']:<15}")
+        lines = [
+            "\nPreview of first 10 weeks:",
+            f"{'Week':<6} {'Date':<12} {'Bottle':<30} {'Category':<15}",
+            "-" * 70,
+        ]
+        lines.extend(f"{entry['week']:<6} {entry['date']:<12} {entry['bottle_name']:<30} {entry['category']:<15}"
+                     for entry in schedule[:10])
+        print('\n'.join(lines))
     else:
         if save_schedule(schedule, args.output):
             print_schedule_summary(schedule)
@@ -7,16 +7,30 @@ CLI tool for managing your tasting schedule, recording notes, and tracking progr
 
 import json
 import argparse
-from datetime import datetime
-from collections import defaultdict
+from datetime import date, datetime
+from operator import itemgetter
 import config
 import os
+import shlex
+import subprocess
 import sys
+from date_utils import parse_iso_date
+from json_utils import dump_json_line, parse_json_bytes, write_json_atomic
+
+
+# Parsed JSON files: absolute path -> (st_mtime_ns, st_size, data)
+_JSON_CACHE = {}
+# Bottle lookup tables: absolute path -> (collection, {bottle_id: bottle})
+_ID_INDEX = {}
 
 
 def load_json(filepath):
     """Load JSON file.
     
+    Parsed results are cached in-process and reused until the file's
+    modification time or size changes. Callers share the cached object, so
+    they must not modify it; writers copy the parts they change.
+    
     Args:
         filepath (str): Path to JSON file.
         
@@ -24,8 +38,69 @@ def load_json(filepath):
         dict: JSON data or None if file not found or invalid.
     """
     try:
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        st = os.stat(filepath)
+    except FileNotFoundError:
+        return None
+    except OSError:
+        return _load_json_uncached(filepath)
+    
+    key = os.path.abspath(filepath)
+    cached = _JSON_CACHE.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        data = cached[2]
+    else:
+        data = _load_json_uncached(filepath)
+        if data is None:
+            return None
+        _JSON_CACHE[key] = (st.st_mtime_ns, st.st_size, data)
+    return data
+
+
+def invalidate_json_cache(filepath=None):
+    """Drop cached JSON data so the next load_json re-reads from disk.
+    
+    Args:
+        filepath (str, optional): File to evict. Clears the whole cache if None.
+    """
+    if filepath is None:
+        _JSON_CACHE.clear()
+        _ID_INDEX.clear()
+    else:
+        key = os.path.abspath(filepath)
+        _JSON_CACHE.pop(key, None)
+        _ID_INDEX.pop(key, None)
+
+
+def _bottle_index(filepath, collection):
+    """Return an id -> bottle mapping for a collection loaded from filepath.
+    
+    The mapping is built once per loaded collection object and reused while
+    load_json keeps returning that object.
+    
+    Args:
+        filepath (str): Path the collection was loaded from.
+        collection (dict): Collection data with a 'bottles' list.
+        
+    Returns:
+        dict: Bottles keyed by ID. The first bottle wins if IDs repeat.
+    """
+    key = os.path.abspath(filepath)
+    cached = _ID_INDEX.get(key)
+    if cached is not None and cached[0] is collection:
+        return cached[1]
+    
+    index = {}
+    for bottle in collection['bottles']:
+        index.setdefault(bottle.get('id'), bottle)
+    _ID_INDEX[key] = (collection, index)
+    return index
+
+
+def _load_json_uncached(filepath):
+    """Load and parse a JSON file without consulting the cache."""
+    try:
+        with open(filepath, 'rb') as f:
+            return _intern_enum_fields(parse_json_bytes(f.read()))
     except FileNotFoundError:
         return None
     except json.JSONDecodeError as e:
@@ -39,9 +114,46 @@ def load_json(filepath):
         return None
 
 
+# Low-cardinality string fields repeated across every bottle/schedule entry
+_ENUM_FIELDS = ('category',)
+
+
+def _intern_enum_fields(data):
+    """Intern enum-like string fields in bottle and schedule records.
+    
+    A collection repeats a handful of category names thousands of times;
+    interning collapses them to one object each and makes the dict lookups
+    in view_progress compare by identity.
+    
+    Args:
+        data: Parsed JSON data.
+        
+    Returns:
+        The same data, modified in place.
+    """
+    if not isinstance(data, dict):
+        return data
+    intern = sys.intern
+    for key in ('bottles', 'schedule'):
+        records = data.get(key)
+        if not isinstance(records, list):
+            continue
+        for record in records:
+            if not isinstance(record, dict):
+                continue
+            for field in _ENUM_FIELDS:
+                value = record.get(field)
+                if type(value) is str:
+                    record[field] = intern(value)
+    return data
+
+
 def save_json(data, filepath):
     """Save data to JSON file.
     
+    The data is written to a temporary file, synced, and renamed over the
+    target, so a crash mid-write never leaves a truncated collection behind.
+    
     Args:
         data (dict): Data to save.
         filepath (str): Path to save JSON file.
@@ -50,8 +162,7 @@ def save_json(data, filepath):
         bool: True if successful, False otherwise.
     """
     try:
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        write_json_atomic(data, filepath)
         return True
     except PermissionError:
         print(f"Error: Permission denied writing to {filepath}.")
@@ -59,6 +170,10 @@ def save_json(data, filepath):
     except Exception as e:
         print(f"Error saving {filepath}: {e}")
         return False
+    finally:
+        # The file may have changed even if a later step failed, so drop the
+        # cached entry rather than trust its mtime/size key.
+        invalidate_json_cache(filepath)
 
 
 def record_tasting(collection_file, bottle_id, rating, notes, date=None):
@@ -74,12 +189,13 @@ def record_tasting(collection_file, bottle_id, rating, notes, date=None):
     Returns:
         bool: True if successful, False otherwise.
     """
-    # Validate inputs
-    if not isinstance(bottle_id, int) or bottle_id < 1:
+    # Validate inputs (argparse already coerces bottle_id to int and rating
+    # to float, so only the ranges need checking; NaN fails the chained compare)
+    if bottle_id < 1:
         print(f"Error: Invalid bottle ID: {bottle_id}")
         return False
     
-    if not isinstance(rating, (int, float)) or rating < 0 or rating > 10:
+    if not (0.0 <= rating <= 10.0):
         print(f"Error: Rating must be between 0 and 10. Got: {rating}")
         return False
     
@@ -92,11 +208,7 @@ def record_tasting(collection_file, bottle_id, rating, notes, date=None):
         print(f"Error: Invalid collection structure in {collection_file}.")
         return False
     
-    bottle = None
-    for b in collection['bottles']:
-        if b.get('id') == bottle_id:
-            bottle = b
-            break
+    bottle = _bottle_index(collection_file, collection).get(bottle_id)
     
     if not bottle:
         print(f"Error: Bottle with ID {bottle_id} not found!")
@@ -107,11 +219,15 @@ def record_tasting(collection_file, bottle_id, rating, notes, date=None):
     else:
         # Validate date format
         try:
-            datetime.strptime(date, '%Y-%m-%d')
+            parse_iso_date(date)
         except ValueError:
             print(f"Error: Invalid date format '{date}'. Use YYYY-MM-DD.")
             return False
     
+    # Copy-on-write: only the bottle and the containers above it are copied,
+    # so the cached collection is left untouched if the save fails
+    original = bottle
+    bottle = dict(original)
     bottle['tasted'] = True
     bottle['tasting_date'] = date
     bottle['rating'] = float(rating)
@@ -120,7 +236,10 @@ def record_tasting(collection_file, bottle_id, rating, notes, date=None):
     if not bottle.get('opened_date'):
         bottle['opened_date'] = date
     
-    if save_json(collection, collection_file):
+    updated = dict(collection)
+    updated['bottles'] = [bottle if b is original else b for b in collection['bottles']]
+    
+    if save_json(updated, collection_file):
         print(f"✓ Recorded tasting for {bottle['name']} on {date}")
         print(f"  Rating: {rating}/10")
         print(f"  Notes: {notes[:50]}..." if len(notes) > 50 else f"  Notes: {notes}")
@@ -128,12 +247,13 @@ def record_tasting(collection_file, bottle_id, rating, notes, date=None):
     return False
 
 
-def view_schedule(schedule_file, weeks=10):
+def view_schedule(schedule_file, weeks=10, as_json=False):
     """View upcoming tasting schedule.
     
     Args:
         schedule_file (str): Path to schedule JSON file.
         weeks (int): Number of weeks to show (default: 10).
+        as_json (bool): Emit upcoming entries as JSON lines instead of a table.
     """
     if weeks <= 0:
         print("Error: Weeks must be a positive number.")
@@ -149,35 +269,62 @@ def view_schedule(schedule_file, weeks=10):
         return
     
     schedule = schedule_data['schedule']
-    today = datetime.now().date()
-    
-    print(f"\n{'='*80}")
-    print(f"Upcoming Tastings (next {weeks} weeks)")
-    print(f"{'='*80}")
-    print(f"{'Week':<6} {'Date':<12} {'Bottle':<35} {'Category':<15} {'ABV':<6}")
-    print("-" * 80)
-    
-    shown = 0
+    today = date.today().isoformat()
+    
+    lines = [] if as_json else [
+        f"\n{'='*80}",
+        f"Upcoming Tastings (next {weeks} weeks)",
+        f"{'='*80}",
+        f"{'Week':<6} {'Date':<12} {'Bottle':<35} {'Category':<15} {'ABV':<6}",
+        "-" * 80,
+    ]
+    
+    # Every entry is validated so a malformed one is reported wherever it
+    # sits, which is why the loop does not stop once `weeks` entries are
+    # found. Valid YYYY-MM-DD strings order like the dates they name, so the
+    # upcoming entries are picked and sorted by comparing strings, and the
+    # rendering loop below runs without exception handling.
+    upcoming = []
     for entry in schedule:
         try:
-            entry_date = datetime.strptime(entry['date'], '%Y-%m-%d').date()
-            if entry_date >= today and shown < weeks:
-                print(f"{entry.get('week', 'N/A'):<6} {entry['date']:<12} {entry.get('bottle_name', 'Unknown'):<35} "
-                      f"{entry.get('category', 'other'):<15} {entry.get('abv', 0):<6}")
-                shown += 1
-        except (KeyError, ValueError) as e:
-            print(f"Warning: Skipping invalid schedule entry: {e}")
+            entry_date = entry['date']
+            parse_iso_date(entry_date)
+        except (KeyError, TypeError, ValueError) as e:
+            warning = f"Warning: Skipping invalid schedule entry: {e}"
+            if as_json:
+                print(warning, file=sys.stderr)
+            else:
+                lines.append(warning)
             continue
+        if entry_date >= today:
+            upcoming.append(entry)
     
-    if shown == 0:
-        print("No upcoming tastings found.")
+    # Schedules are saved in date order, which the sort passes over in one run
+    upcoming.sort(key=itemgetter('date'))
+    del upcoming[weeks:]
+    
+    if as_json:
+        _write_json_lines(upcoming)
+        return
+    
+    lines.extend(
+        f"{entry.get('week', 'N/A'):<6} {entry['date']:<12} {entry.get('bottle_name', 'Unknown'):<35} "
+        f"{entry.get('category', 'other'):<15} {entry.get('abv', 0):<6}"
+        for entry in upcoming
+    )
+    
+    if not upcoming:
+        lines.append("No upcoming tastings found.")
+    
+    _write_lines(lines)
 
 
-def view_progress(collection_file):
+def view_progress(collection_file, as_json=False):
     """View tasting progress statistics.
     
     Args:
         collection_file (str): Path to collection JSON file.
+        as_json (bool): Emit the statistics as a JSON line instead of text.
     """
     collection = load_json(collection_file)
     if not collection:
@@ -195,71 +342,118 @@ def view_progress(collection_file):
         print("No bottles in collection.")
         return
     
-    tasted = sum(1 for b in bottles if b.get('tasted', False))
-    untasted = total - tasted
-    
-    categories = defaultdict(lambda: {'total': 0, 'tasted': 0})
-    ratings = []
+    # Single pass over the collection; per-category stats are [total, tasted]
+    categories = {}
+    tasted = 0
+    rating_sum = 0.0
+    rating_count = 0
+    rating_min = float('inf')
+    rating_max = float('-inf')
     
     for bottle in bottles:
-        cat = bottle.get('category', 'other')
-        categories[cat]['total'] += 1
-        if bottle.get('tasted', False):
-            categories[cat]['tasted'] += 1
-            rating = bottle.get('rating')
+        get = bottle.get
+        cat = get('category', 'other')
+        stats = categories.get(cat)
+        if stats is None:
+            stats = categories[cat] = [0, 0]
+        stats[0] += 1
+        if get('tasted', False):
+            tasted += 1
+            stats[1] += 1
+            rating = get('rating')
             if rating is not None:
                 try:
-                    ratings.append(float(rating))
+                    rating = float(rating)
                 except (ValueError, TypeError):
-                    pass
+                    continue
+                rating_sum += rating
+                rating_count += 1
+                if rating < rating_min:
+                    rating_min = rating
+                if rating > rating_max:
+                    rating_max = rating
+    
+    untasted = total - tasted
     
-    print(f"\n{'='*60}")
-    print(f"Tasting Progress")
-    print(f"{'='*60}")
-    print(f"Total bottles: {total}")
+    if as_json:
+        _write_json_lines([{
+            'total': total,
+            'tasted': tasted,
+            'untasted': untasted,
+            'average_rating': rating_sum / rating_count if rating_count else None,
+            'highest_rating': rating_max if rating_count else None,
+            'lowest_rating': rating_min if rating_count else None,
+            'categories': {cat: {'total': stats[0], 'tasted': stats[1]}
+                           for cat, stats in sorted(categories.items())},
+        }])
+        return
+    
+    lines = [
+        f"\n{'='*60}",
+        f"Tasting Progress",
+        f"{'='*60}",
+        f"Total bottles: {total}",
+    ]
     if total > 0:
-        print(f"Tasted: {tasted} ({tasted/total*100:.1f}%)")
-        print(f"Untasted: {untasted} ({untasted/total*100:.1f}%)")
+        lines.append(f"Tasted: {tasted} ({tasted/total*100:.1f}%)")
+        lines.append(f"Untasted: {untasted} ({untasted/total*100:.1f}%)")
     
-    if ratings:
-        avg_rating = sum(ratings) / len(ratings)
-        print(f"\nAverage rating: {avg_rating:.1f}/10")
-        print(f"Highest rated: {max(ratings)}/10")
-        print(f"Lowest rated: {min(ratings)}/10")
+    if rating_count:
+        lines.append(f"\nAverage rating: {rating_sum / rating_count:.1f}/10")
+        lines.append(f"Highest rated: {rating_max}/10")
+        lines.append(f"Lowest rated: {rating_min}/10")
     
-    print(f"\nProgress by category:")
+    lines.append(f"\nProgress by category:")
     for cat in sorted(categories.keys()):
-        stats = categories[cat]
-        pct = (stats['tasted'] / stats['total'] * 100) if stats['total'] > 0 else 0
-        print(f"  {cat.capitalize():<15} {stats['tasted']}/{stats['total']} ({pct:.1f}%)")
+        cat_total, cat_tasted = categories[cat]
+        pct = (cat_tasted / cat_total * 100) if cat_total > 0 else 0
+        lines.append(f"  {cat.capitalize():<15} {cat_tasted}/{cat_total} ({pct:.1f}%)")
+    
+    _write_lines(lines)
 
 
-def list_bottles(collection_file, category=None, tasted=None):
-    """List bottles in collection with optional filters."""
+def list_bottles(collection_file, category=None, tasted=None, as_json=False):
+    """List bottles in collection with optional filters.
+    
+    With as_json, matching bottles are written unsorted as JSON lines.
+    """
     collection = load_json(collection_file)
     if not collection:
         print(f"Collection file {collection_file} not found!")
         return
     
-    bottles = collection['bottles']
-    
-    if category:
-        bottles = [b for b in bottles if b.get('category', '').lower() == category.lower()]
+    # Apply both filters in one pass into the only list that gets built;
+    # the requested category is lowered once, not per bottle
+    cat_lower = category.lower() if category else None
+    bottles = [b for b in collection['bottles']
+               if (cat_lower is None or (b.get('category') or '').lower() == cat_lower)
+               and (tasted is None or bool(b.get('tasted', False)) == tasted)]
     
-    if tasted is not None:
-        bottles = [b for b in bottles if b.get('tasted', False) == tasted]
+    if as_json:
+        _write_json_lines(bottles)
+        return
     
-    print(f"\n{'='*80}")
-    print(f"Bottles in Collection" + (f" ({category})" if category else ""))
-    print(f"{'='*80}")
-    print(f"{'ID':<6} {'Name':<35} {'Category':<15} {'Tasted':<8} {'Rating':<8}")
-    print("-" * 80)
+    lines = [
+        f"\n{'='*80}",
+        f"Bottles in Collection" + (f" ({category})" if category else ""),
+        f"{'='*80}",
+        f"{'ID':<6} {'Name':<35} {'Category':<15} {'Tasted':<8} {'Rating':<8}",
+        "-" * 80,
+    ]
     
-    for bottle in sorted(bottles, key=lambda x: x['name']):
-        tasted_str = "✓" if bottle.get('tasted', False) else "✗"
-        rating = str(bottle.get('rating', 'N/A')) if bottle.get('rating') else 'N/A'
-        print(f"{bottle['id']:<6} {bottle['name']:<35} {bottle.get('category', 'other'):<15} "
-              f"{tasted_str:<8} {rating:<8}")
+    try:
+        bottles.sort(key=itemgetter('name'))
+    except (KeyError, TypeError):
+        # Slow path for bottles with a missing or non-string name
+        bottles.sort(key=lambda b: str(b.get('name') or ''))
+    
+    lines.extend(
+        f"{b['id']:<6} {b.get('name') or 'Unknown':<35} {b.get('category') or 'other':<15} "
+        f"{'✓' if b.get('tasted', False) else '✗':<8} {str(b['rating']) if b.get('rating') else 'N/A':<8}"
+        for b in bottles
+    )
+    
+    _write_lines(lines)
 
 
 def find_bottle(collection_file, search_term):
@@ -269,33 +463,63 @@ def find_bottle(collection_file, search_term):
         print(f"Collection file {collection_file} not found!")
         return
     
-    bottles = collection['bottles']
-    results = []
-    
-    try:
-        bottle_id = int(search_term)
-        results = [b for b in bottles if b['id'] == bottle_id]
-    except ValueError:
+    # Check for an integer ID up front rather than using int() failures as
+    # control flow; isdecimal() accepts exactly the digits int() does.
+    term = search_term.strip()
+    digits = term[1:] if term[:1] in ('-', '+') else term
+    if digits.isdecimal():
+        bottle_id = int(term)
+        index = _bottle_index(collection_file, collection)
+        results = [index[bottle_id]] if bottle_id in index else []
+    else:
         search_lower = search_term.lower()
-        results = [b for b in bottles if search_lower in b['name'].lower()]
+        results = [b for b in collection['bottles'] if search_lower in b['name'].lower()]
     
     if not results:
         print(f"No bottles found matching '{search_term}'")
         return
     
+    lines = []
     for bottle in results:
-        print(f"\n{'='*60}")
-        print(f"Bottle Details")
-        print(f"{'='*60}")
-        print(f"ID: {bottle['id']}")
-        print(f"Name: {bottle['name']}")
-        print(f"Category: {bottle.get('category', 'other')}")
-        print(f"ABV: {bottle.get('abv', 'N/A')}%")
-        print(f"Tasted: {'Yes' if bottle.get('tasted', False) else 'No'}")
+        lines.extend([
+            f"\n{'='*60}",
+            f"Bottle Details",
+            f"{'='*60}",
+            f"ID: {bottle['id']}",
+            f"Name: {bottle['name']}",
+            f"Category: {bottle.get('category', 'other')}",
+            f"ABV: {bottle.get('abv', 'N/A')}%",
+            f"Tasted: {'Yes' if bottle.get('tasted', False) else 'No'}",
+        ])
         if bottle.get('tasted', False):
-            print(f"Tasting Date: {bottle.get('tasting_date', 'N/A')}")
-            print(f"Rating: {bottle.get('rating', 'N/A')}/10")
-            print(f"Notes: {bottle.get('tasting_notes', 'N/A')}")
+            lines.append(f"Tasting Date: {bottle.get('tasting_date', 'N/A')}")
+            lines.append(f"Rating: {bottle.get('rating', 'N/A')}/10")
+            lines.append(f"Notes: {bottle.get('tasting_notes', 'N/A')}")
+    
+    _write_lines(lines)
+
+
+def _write_json_lines(rows):
+    """Write rows to stdout as newline-delimited JSON.
+    
+    Args:
+        rows (iterable): JSON-serializable records, one per output line.
+    """
+    sys.stdout.flush()
+    out = sys.stdout.buffer
+    for row in rows:
+        out.write(dump_json_line(row))
+        out.write(b'\n')
+    out.flush()
+
+
+def _write_lines(lines):
+    """Write report lines to stdout in a single call.
+    
+    Args:
+        lines (list): Lines of output, without trailing newlines.
+    """
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def show_config(config_file):
@@ -303,27 +527,32 @@ def show_config(config_file):
     config_data = config.load_config(config_file)
     prefs = config_data.get('user_preferences', {})
     
-    print(f"\n{'='*60}")
-    print(f"Current Configuration")
-    print(f"{'='*60}")
-    print(f"Tasting Frequency: {prefs.get('tasting_frequency', 'weekly')}")
+    avoid_dates = prefs.get('avoid_dates', [])
+    category_prefs = prefs.get('category_preferences', {})
+    
+    lines = [
+        f"\n{'='*60}",
+        f"Current Configuration",
+        f"{'='*60}",
+        f"Tasting Frequency: {prefs.get('tasting_frequency', 'weekly')}",
+    ]
     if prefs.get('tasting_frequency') == 'custom':
-        print(f"Custom Interval: {prefs.get('custom_interval_days', 7)} days")
-    print(f"Preferred Days: {', '.join(prefs.get('preferred_days', [])) or 'None'}")
-    print(f"Avoid Dates: {len(prefs.get('avoid_dates', []))} date(s) specified")
-    if prefs.get('avoid_dates'):
-        for date in prefs.get('avoid_dates', [])[:5]:
-            print(f"  - {date}")
-        if len(prefs.get('avoid_dates', [])) > 5:
-            print(f"  ... and {len(prefs.get('avoid_dates', [])) - 5} more")
-    print(f"Category Preferences: {len(prefs.get('category_preferences', {}))} category(ies) configured")
-    if prefs.get('category_preferences'):
-        for cat, weight in prefs.get('category_preferences', {}).items():
-            print(f"  - {cat}: {weight}x weight")
-    print(f"Seasonal Adjustments: {'Enabled' if prefs.get('seasonal_adjustments', False) else 'Disabled'}")
-    print(f"Min Days Between Category: {prefs.get('min_days_between_category', 0)}")
-    print(f"Default Schedule Weeks: {prefs.get('default_schedule_weeks', 104)}")
-    print(f"\nConfig file: {config_file}")
+        lines.append(f"Custom Interval: {prefs.get('custom_interval_days', 7)} days")
+    lines.append(f"Preferred Days: {', '.join(prefs.get('preferred_days', [])) or 'None'}")
+    lines.append(f"Avoid Dates: {len(avoid_dates)} date(s) specified")
+    lines.extend(f"  - {avoid_date}" for avoid_date in avoid_dates[:5])
+    if len(avoid_dates) > 5:
+        lines.append(f"  ... and {len(avoid_dates) - 5} more")
+    lines.append(f"Category Preferences: {len(category_prefs)} category(ies) configured")
+    lines.extend(f"  - {cat}: {weight}x weight" for cat, weight in category_prefs.items())
+    lines.extend([
+        f"Seasonal Adjustments: {'Enabled' if prefs.get('seasonal_adjustments', False) else 'Disabled'}",
+        f"Min Days Between Category: {prefs.get('min_days_between_category', 0)}",
+        f"Default Schedule Weeks: {prefs.get('default_schedule_weeks', 104)}",
+        f"\nConfig file: {config_file}",
+    ])
+    
+    _write_lines(lines)
 
 
 def set_config_value(config_file, key_path, value):
@@ -334,7 +563,7 @@ def set_config_value(config_file, key_path, value):
         key_path (str): Dot-separated path to config key (e.g., 'user_preferences.tasting_frequency').
         value: Value to set (will be parsed as appropriate type).
     """
-    config_data = config.load_config(config_file)
+    config_data = config.mutable_copy(config.load_config(config_file))
     
     # Parse key path
     keys = key_path.split('.')
@@ -423,7 +652,14 @@ def edit_config(config_file):
     
     print(f"Opening {config_file} in {editor}...")
     print("(Press Ctrl+X to exit nano, or close the editor window)")
-    os.system(f"{editor} {config_file}")
+    # Run the editor directly rather than through a shell: no extra process,
+    # and paths with spaces work. EDITOR may carry flags (e.g. "code -w").
+    command = [editor] if sys.platform == 'win32' else shlex.split(editor)
+    try:
+        subprocess.run(command + [config_file], check=False)
+    except OSError as e:
+        print(f"Error: Could not start editor '{editor}': {e}")
+        return
     print(f"\n✓ Configuration file edited")
 
 
@@ -443,10 +679,12 @@ def main():
     schedule_parser = subparsers.add_parser('schedule', help='View tasting schedule')
     schedule_parser.add_argument('--schedule', default='tasting_schedule.json')
     schedule_parser.add_argument('--weeks', type=int, default=10, help='Number of weeks to show')
+    schedule_parser.add_argument('--json', action='store_true', help='Output entries as JSON lines')
     
     # View progress
     progress_parser = subparsers.add_parser('progress', help='View tasting progress')
     progress_parser.add_argument('--collection', default='collection.json')
+    progress_parser.add_argument('--json', action='store_true', help='Output statistics as JSON')
     
     # List bottles
     list_parser = subparsers.add_parser('list', help='List bottles')
@@ -454,6 +692,7 @@ def main():
     list_parser.add_argument('--category', help='Filter by category')
     list_parser.add_argument('--tasted', action='store_true', help='Show only tasted bottles')
     list_parser.add_argument('--untasted', action='store_true', help='Show only untasted bottles')
+    list_parser.add_argument('--json', action='store_true', help='Output bottles as JSON lines')
     
     # Find bottle
     find_parser = subparsers.add_parser('find', help='Find a bottle by name or ID')
@@ -483,16 +722,16 @@ def main():
     if args.command == 'record':
         record_tasting(args.collection, args.bottle_id, args.rating, args.notes, args.date)
     elif args.command == 'schedule':
-        view_schedule(args.schedule, args.weeks)
+        view_schedule(args.schedule, args.weeks, args.json)
     elif args.command == 'progress':
-        view_progress(args.collection)
+        view_progress(args.collection, args.json)
     elif args.command == 'list':
         tasted = None
         if args.tasted:
             tasted = True
         elif args.untasted:
             tasted = False
-        list_bottles(args.collection, args.category, tasted)
+        list_bottles(args.collection, args.category, tasted, args.json)
     elif args.command == 'find':
         find_bottle(args.collection, args.search_term)
     elif args.command == 'config':
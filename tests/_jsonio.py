@@ -0,0 +1,36 @@
+"""
+JSON file helpers shared by the Dram Planner tests.
+
+Files are read and written as whole byte strings, encoded with orjson when
+it is installed and with the standard library otherwise.
+"""
+
+import tempfile
+from pathlib import Path
+
+from json_utils import dump_json_bytes, dump_json_line, parse_json_bytes
+
+
+def dumps_json(data, indent=False):
+    """Encode data as JSON bytes."""
+    return dump_json_bytes(data) if indent else dump_json_line(data)
+
+
+def read_json(path):
+    """Read and parse a JSON file."""
+    return parse_json_bytes(Path(path).read_bytes())
+
+
+def write_json(path, data, indent=False):
+    """Write data to path as JSON."""
+    Path(path).write_bytes(dumps_json(data, indent))
+
+
+def write_temp_json(data, suffix='.json'):
+    """Write data to a new temporary JSON file and return its path.
+    
+    The caller is responsible for deleting the file.
+    """
+    with tempfile.NamedTemporaryFile(mode='wb', suffix=suffix, delete=False) as f:
+        f.write(dumps_json(data))
+        return f.name
@@ -4,10 +4,37 @@ Shared pytest fixtures and configuration for Dram Planner tests.
 
 import pytest
 import tempfile
-import json
 import os
+import sys
 from pathlib import Path
 
+# Make the top-level modules importable from every test module, once per session
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tests._jsonio import write_json
+
+
+# RAM-backed scratch space for test files, where the platform has one
+_RAM_TMP_DIR = '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else None
+
+
+@pytest.fixture(scope='session', autouse=True)
+def ram_backed_tempdir():
+    """Create every temp file in the session under tmpfs when available.
+    
+    This covers temp_dir as well as the NamedTemporaryFile calls in the
+    unittest-style test classes, so test I/O never touches the disk.
+    """
+    if _RAM_TMP_DIR is None:
+        yield None
+        return
+    previous = tempfile.tempdir
+    tempfile.tempdir = _RAM_TMP_DIR
+    try:
+        yield _RAM_TMP_DIR
+    finally:
+        tempfile.tempdir = previous
+
 
 @pytest.fixture
 def temp_dir():
@@ -57,8 +84,7 @@ def sample_collection():
 def collection_file(temp_dir, sample_collection):
     """Create a temporary collection JSON file."""
     filepath = os.path.join(temp_dir, 'collection.json')
-    with open(filepath, 'w') as f:
-        json.dump(sample_collection, f)
+    write_json(filepath, sample_collection)
     return filepath
 
 
@@ -93,8 +119,7 @@ def default_config():
 def config_file(temp_dir, default_config):
     """Create a temporary config JSON file."""
     filepath = os.path.join(temp_dir, 'config.json')
-    with open(filepath, 'w') as f:
-        json.dump(default_config, f, indent=2)
+    write_json(filepath, default_config, indent=True)
     return filepath
 
 
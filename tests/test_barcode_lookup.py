@@ -4,15 +4,22 @@ Unit tests for barcode_lookup.py (ENH-002: Barcode Scanning)
 """
 
 import pytest
-import sys
-import os
-
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Mock requests module
 import unittest.mock as mock
 
+import barcode_lookup
+
+
+@pytest.fixture(autouse=True)
+def clear_lookup_cache():
+    """Keep memoized lookups from leaking between tests."""
+    barcode_lookup._lookup_impl.cache_clear()
+    barcode_lookup._not_found.clear()
+    yield
+    barcode_lookup._lookup_impl.cache_clear()
+    barcode_lookup._not_found.clear()
+
 
 class TestBarcodeLookup:
     """Test barcode lookup functionality."""
@@ -21,11 +28,12 @@ class TestBarcodeLookup:
         ("1234567890", "1234567890"),
         ("123 456 7890", "1234567890"),
         ("123-456-7890", "1234567890"),
+        (" 123 - 456\t7890\n", "1234567890"),
         ("", None),
         (None, None),
     ])
     @mock.patch('barcode_lookup.REQUESTS_AVAILABLE', True)
-    @mock.patch('barcode_lookup.requests.get')
+    @mock.patch('barcode_lookup._session.get')
     def test_lookup_barcode_normalization(self, mock_get, barcode_input, expected_output):
         """Test barcode normalization (removes spaces and dashes)."""
         import barcode_lookup
@@ -62,7 +70,7 @@ class TestBarcodeLookup:
         assert result is None
     
     @mock.patch('barcode_lookup.REQUESTS_AVAILABLE', True)
-    @mock.patch('barcode_lookup.requests.get')
+    @mock.patch('barcode_lookup._session.get')
     def test_lookup_barcode_success(self, mock_get):
         """Test successful barcode lookup."""
         import barcode_lookup
@@ -89,7 +97,35 @@ class TestBarcodeLookup:
         assert result['barcode'] == '1234567890'
     
     @mock.patch('barcode_lookup.REQUESTS_AVAILABLE', True)
-    @mock.patch('barcode_lookup.requests.get')
+    @mock.patch('barcode_lookup._session.get')
+    def test_lookup_barcode_cached(self, mock_get):
+        """Test repeat lookups of a barcode reuse the first API response."""
+        mock_response = mock.Mock()
+        mock_response.json.return_value = {
+            'status': 1,
+            'product': {'product_name': 'Test Whisky', 'brands': 'Test Brand'}
+        }
+        mock_response.raise_for_status = mock.Mock()
+        mock_get.return_value = mock_response
+        
+        first = barcode_lookup.lookup_barcode("123-456-7890")
+        first['name'] = 'Changed'
+        second = barcode_lookup.lookup_barcode("1234567890")
+        
+        assert mock_get.call_count == 1
+        assert second['name'] == 'Test Whisky'
+    
+    @mock.patch('barcode_lookup.REQUESTS_AVAILABLE', True)
+    @mock.patch('barcode_lookup._session.get')
+    def test_lookup_barcode_failure_not_cached(self, mock_get):
+        """Test failed lookups are retried rather than memoized."""
+        mock_get.side_effect = Exception("Connection error")
+        assert barcode_lookup.lookup_barcode("1234567890") is None
+        assert barcode_lookup.lookup_barcode("1234567890") is None
+        assert mock_get.call_count == 2
+    
+    @mock.patch('barcode_lookup.REQUESTS_AVAILABLE', True)
+    @mock.patch('barcode_lookup._session.get')
     def test_lookup_barcode_not_found(self, mock_get):
         """Test barcode not found in API."""
         import barcode_lookup
@@ -106,7 +142,26 @@ class TestBarcodeLookup:
         assert result is None
     
     @mock.patch('barcode_lookup.REQUESTS_AVAILABLE', True)
-    @mock.patch('barcode_lookup.requests.get')
+    @mock.patch('barcode_lookup._session.get')
+    def test_lookup_barcode_not_found_remembered(self, mock_get):
+        """Test a miss is not re-fetched until it expires."""
+        mock_response = mock.Mock()
+        mock_response.json.return_value = {'status': 0, 'product': None}
+        mock_response.raise_for_status = mock.Mock()
+        mock_get.return_value = mock_response
+        
+        with mock.patch('barcode_lookup.time.monotonic', return_value=1000.0):
+            assert barcode_lookup.lookup_barcode("1234567890") is None
+            assert barcode_lookup.lookup_barcode("123-456-7890") is None
+        assert mock_get.call_count == 1
+        
+        expired = 1000.0 + barcode_lookup._NOT_FOUND_TTL + 1
+        with mock.patch('barcode_lookup.time.monotonic', return_value=expired):
+            assert barcode_lookup.lookup_barcode("1234567890") is None
+        assert mock_get.call_count == 2
+    
+    @mock.patch('barcode_lookup.REQUESTS_AVAILABLE', True)
+    @mock.patch('barcode_lookup._session.get')
     def test_lookup_barcode_api_error(self, mock_get):
         """Test API connection error handling."""
         import barcode_lookup
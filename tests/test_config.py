@@ -4,13 +4,10 @@ Unit tests for config.py (ENH-001: User Preferences)
 """
 
 import pytest
-import json
 import os
-import sys
 from pathlib import Path
 
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests._jsonio import read_json, write_json
 
 import config
 
@@ -42,8 +39,7 @@ class TestConfigLoadSave:
         assert os.path.exists(config_path)
         
         # Verify content
-        with open(config_path, 'r') as f:
-            saved = json.load(f)
+        saved = read_json(config_path)
         assert saved == default_config
     
     def test_load_config_merges_with_defaults(self, temp_dir):
@@ -54,13 +50,32 @@ class TestConfigLoadSave:
             }
         }
         config_path = os.path.join(temp_dir, 'partial_config.json')
-        with open(config_path, 'w') as f:
-            json.dump(partial_config, f)
+        write_json(config_path, partial_config)
         
         result = config.load_config(config_path)
         assert result['user_preferences']['tasting_frequency'] == "bi-weekly"
         # Should have other defaults
         assert 'custom_interval_days' in result['user_preferences']
+    
+    def test_load_config_returns_shared_read_only_view(self, config_file):
+        """Test cached configs are shared, read-only, and copyable for edits."""
+        first = config.load_config(config_file)
+        assert config.load_config(config_file) is first
+        with pytest.raises(TypeError):
+            first['user_preferences']['tasting_frequency'] = 'monthly'
+        
+        editable = config.mutable_copy(first)
+        editable['user_preferences']['preferred_days'].append('Friday')
+        assert first['user_preferences']['preferred_days'] == ()
+        assert config.DEFAULT_CONFIG['user_preferences']['preferred_days'] == []
+    
+    def test_save_config_invalidates_cache(self, config_file):
+        """Test a saved config is seen by the next load."""
+        cfg = config.mutable_copy(config.load_config(config_file))
+        cfg['user_preferences']['tasting_frequency'] = 'monthly'
+        assert config.save_config(cfg, config_file) is True
+        
+        assert config.load_config(config_file)['user_preferences']['tasting_frequency'] == 'monthly'
 
 
 class TestTastingFrequency:
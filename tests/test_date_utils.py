@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Unit tests for date_utils.py
+"""
+
+from datetime import date
+
+import pytest
+
+from date_utils import parse_iso_date
+
+
+class TestDateUtils:
+    """Test strict ISO date parsing."""
+    
+    def test_parse_iso_date(self):
+        """Test a YYYY-MM-DD string is parsed into a date."""
+        assert parse_iso_date('2024-02-29') == date(2024, 2, 29)
+    
+    @pytest.mark.parametrize('value', ['2024-02-30', '20240229', '2024-W09-4', '2024-02-29T00:00'])
+    def test_parse_iso_date_rejects_other_forms(self, value):
+        """Test invalid dates and other ISO forms are rejected."""
+        with pytest.raises(ValueError):
+            parse_iso_date(value)
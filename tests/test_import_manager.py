@@ -4,15 +4,11 @@ Unit tests for import_manager.py (ENH-003: Enhanced External Import)
 """
 
 import pytest
-import json
 import csv
 import os
-import sys
-import tempfile
 from pathlib import Path
 
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests._jsonio import write_json
 
 import import_manager
 
@@ -90,6 +86,23 @@ class TestValidateBottleData:
         }
         is_valid, errors = import_manager.validate_bottle_data(bottle_data)
         assert is_valid is True
+    
+    @pytest.mark.parametrize("purchase_date,expected", [
+        ('2024-02-29', True),
+        ('2024-1-5', True),  # strptime accepts unpadded fields
+        ('2023-02-29', False),
+        ('20240101', False),
+        ('2024-W01-1', False),
+    ])
+    def test_validate_bottle_data_date_edge_cases(self, purchase_date, expected):
+        """Test date validation accepts exactly what strptime('%Y-%m-%d') does."""
+        bottle_data = {
+            'name': 'Test Bottle',
+            'category': 'bourbon',
+            'purchase_date': purchase_date
+        }
+        is_valid, errors = import_manager.validate_bottle_data(bottle_data)
+        assert is_valid is expected
 
 
 class TestNormalizeBottleData:
@@ -172,8 +185,7 @@ class TestImportFromJSON:
             {'name': 'Test Bourbon', 'category': 'bourbon'},
             {'name': 'Test Scotch', 'category': 'scotch'}
         ]
-        with open(json_file, 'w') as f:
-            json.dump(data, f)
+        write_json(json_file, data)
         
         bottles, errors, warnings = import_manager.import_from_json(json_file)
         assert len(bottles) == 2
@@ -187,8 +199,7 @@ class TestImportFromJSON:
                 {'name': 'Test Bourbon', 'category': 'bourbon'}
             ]
         }
-        with open(json_file, 'w') as f:
-            json.dump(data, f)
+        write_json(json_file, data)
         
         bottles, errors, warnings = import_manager.import_from_json(json_file)
         assert len(bottles) == 1
@@ -198,4 +209,22 @@ class TestImportFromJSON:
         bottles, errors, warnings = import_manager.import_from_json('nonexistent.json')
         assert len(bottles) == 0
         assert len(errors) > 0
+    
+    @pytest.mark.skipif(not import_manager.IJSON_AVAILABLE, reason="ijson not installed")
+    @pytest.mark.parametrize("as_object", [False, True])
+    def test_import_from_json_streamed(self, temp_dir, monkeypatch, as_object):
+        """Test large JSON files are streamed with the same results."""
+        monkeypatch.setattr(import_manager, '_JSON_STREAM_THRESHOLD', 0)
+        json_file = os.path.join(temp_dir, 'bottles.json')
+        data = [
+            {'name': 'Test Bourbon', 'category': 'bourbon', 'abv': 45.5},
+            {'name': '', 'category': 'scotch'},
+            'not a bottle'
+        ]
+        write_json(json_file, {'bottles': data} if as_object else data)
+        
+        bottles, errors, warnings = import_manager.import_from_json(json_file)
+        assert [b['name'] for b in bottles] == ['Test Bourbon']
+        assert bottles[0]['abv'] == 45.5
+        assert len(errors) == 2
 
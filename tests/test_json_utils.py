@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Unit tests for json_utils.py
+"""
+
+import math
+import os
+from unittest import mock
+
+import pytest
+
+from tests._jsonio import read_json
+
+import json_utils
+
+
+class TestJsonUtils:
+    """Test JSON encoding, decoding and atomic writes."""
+    
+    def test_parse_json_bytes_accepts_nan(self):
+        """Test literals orjson rejects fall back to the stdlib parser."""
+        data = json_utils.parse_json_bytes(b'{"abv": NaN}')
+        assert math.isnan(data['abv'])
+    
+    def test_dump_json_bytes_non_string_keys(self):
+        """Test data orjson cannot encode is written by the stdlib encoder."""
+        assert json_utils.parse_json_bytes(json_utils.dump_json_bytes({1: 'a'})) == {'1': 'a'}
+    
+    def test_write_json_atomic(self, temp_dir):
+        """Test the target is replaced and no temp file is left behind."""
+        path = os.path.join(temp_dir, 'data.json')
+        json_utils.write_json_atomic({'a': 1}, path)
+        json_utils.write_json_atomic({'a': 2}, path)
+        
+        assert read_json(path) == {'a': 2}
+        assert os.listdir(temp_dir) == ['data.json']
+    
+    def test_write_json_atomic_failure_keeps_target(self, temp_dir):
+        """Test a failed write leaves the previous file intact."""
+        path = os.path.join(temp_dir, 'data.json')
+        json_utils.write_json_atomic({'a': 1}, path)
+        
+        with mock.patch('json_utils.os.replace', side_effect=OSError('disk full')):
+            with pytest.raises(OSError):
+                json_utils.write_json_atomic({'a': 2}, path)
+        
+        assert read_json(path) == {'a': 1}
+        assert os.listdir(temp_dir) == ['data.json']
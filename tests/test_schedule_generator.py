@@ -2,14 +2,12 @@
 """Unit tests for schedule_generator.py"""
 
 import unittest
-import json
 import tempfile
 import os
 from datetime import datetime, timedelta
-import sys
 
-# Add parent directory to path to import modules
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from tests._jsonio import read_json, write_temp_json
 
 from schedule_generator import (
     load_collection,
@@ -36,9 +34,7 @@ class TestScheduleGenerator(unittest.TestCase):
     
     def test_load_collection_valid(self):
         """Test loading a valid collection file."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(self.test_collection, f)
-            temp_path = f.name
+        temp_path = write_temp_json(self.test_collection)
         
         try:
             result = load_collection(temp_path)
@@ -63,13 +59,25 @@ class TestScheduleGenerator(unittest.TestCase):
             self.assertTrue(os.path.exists(temp_path))
             
             # Verify content
-            with open(temp_path, 'r') as f:
-                saved = json.load(f)
+            saved = read_json(temp_path)
             self.assertEqual(len(saved['bottles']), 3)
         finally:
             if os.path.exists(temp_path):
                 os.unlink(temp_path)
     
+    def test_save_collection_failure_keeps_original(self):
+        """Test a failed save leaves the existing file intact with no temp files."""
+        temp_path = write_temp_json(self.test_collection)
+        
+        try:
+            self.assertFalse(save_collection({'bottles': [object()]}, temp_path))
+            self.assertEqual(read_json(temp_path), self.test_collection)
+            leftovers = [name for name in os.listdir(os.path.dirname(temp_path))
+                         if name.startswith(os.path.basename(temp_path) + '.tmp')]
+            self.assertEqual(leftovers, [])
+        finally:
+            os.unlink(temp_path)
+    
     def test_categorize_bottles(self):
         """Test categorizing bottles."""
         categories = categorize_bottles(self.test_collection['bottles'])
@@ -94,6 +102,18 @@ class TestScheduleGenerator(unittest.TestCase):
         first_bottles = [entry['bottle_id'] for entry in schedule[:2]]
         self.assertTrue(any(bid in untasted_ids for bid in first_bottles))
     
+    def test_generate_schedule_skips_avoid_dates(self):
+        """Test that no tasting is scheduled on an avoided date."""
+        start = datetime(2024, 1, 1)
+        config_data = config.mutable_copy(config.DEFAULT_CONFIG)
+        avoided = [(start + timedelta(weeks=week)).strftime('%Y-%m-%d') for week in range(3)]
+        config_data['user_preferences']['avoid_dates'] = avoided
+        
+        schedule = generate_schedule(self.test_collection, start_date=start, weeks=3,
+                                     config_data=config_data)
+        self.assertTrue(schedule)
+        self.assertFalse({entry['date'] for entry in schedule} & set(avoided))
+    
     def test_generate_schedule_invalid_collection(self):
         """Test schedule generation with invalid collection."""
         result = generate_schedule({}, weeks=10)
@@ -122,8 +142,7 @@ class TestScheduleGenerator(unittest.TestCase):
             self.assertTrue(os.path.exists(temp_path))
             
             # Verify content
-            with open(temp_path, 'r') as f:
-                saved = json.load(f)
+            saved = read_json(temp_path)
             self.assertEqual(saved['total_weeks'], 5)
             self.assertEqual(len(saved['schedule']), 5)
         finally:
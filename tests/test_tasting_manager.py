@@ -5,16 +5,21 @@ import unittest
 import json
 import tempfile
 import os
-from datetime import datetime
-import sys
+import io
+from unittest import mock
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
 
-# Add parent directory to path to import modules
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests._jsonio import read_json, write_json, write_temp_json
 
 from tasting_manager import (
     load_json,
     save_json,
-    record_tasting
+    record_tasting,
+    view_schedule,
+    view_progress,
+    list_bottles,
+    edit_config
 )
 
 
@@ -39,9 +44,7 @@ class TestTastingManager(unittest.TestCase):
     
     def test_load_json_valid(self):
         """Test loading a valid JSON file."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(self.test_collection, f)
-            temp_path = f.name
+        temp_path = write_temp_json(self.test_collection)
         
         try:
             result = load_json(temp_path)
@@ -55,6 +58,39 @@ class TestTastingManager(unittest.TestCase):
         result = load_json('nonexistent.json')
         self.assertIsNone(result)
     
+    def test_load_json_cached_until_saved(self):
+        """Test repeated loads are cached and save_json invalidates them."""
+        temp_path = write_temp_json(self.test_collection)
+
+        try:
+            first = load_json(temp_path)
+            self.assertIs(load_json(temp_path), first)
+
+            self.test_collection['bottles'][0]['name'] = 'Renamed Bourbon'
+            self.assertTrue(save_json(self.test_collection, temp_path))
+
+            reloaded = load_json(temp_path)
+            self.assertIsNot(reloaded, first)
+            self.assertEqual(reloaded['bottles'][0]['name'], 'Renamed Bourbon')
+        finally:
+            os.unlink(temp_path)
+
+    def test_load_json_detects_external_change(self):
+        """Test a rewrite that keeps the mtime but changes size is reloaded."""
+        temp_path = write_temp_json(self.test_collection)
+        
+        try:
+            st = os.stat(temp_path)
+            self.assertEqual(len(load_json(temp_path)['bottles']), 1)
+            
+            self.test_collection['bottles'].append({'id': 2, 'name': 'Test Rye'})
+            write_json(temp_path, self.test_collection)
+            os.utime(temp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+            
+            self.assertEqual(len(load_json(temp_path)['bottles']), 2)
+        finally:
+            os.unlink(temp_path)
+    
     def test_save_json(self):
         """Test saving JSON data."""
         with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
@@ -68,11 +104,25 @@ class TestTastingManager(unittest.TestCase):
             if os.path.exists(temp_path):
                 os.unlink(temp_path)
     
+    def test_save_json_failure_keeps_original(self):
+        """Test a failed save leaves the existing file and no temp file behind."""
+        temp_path = write_temp_json(self.test_collection)
+        
+        try:
+            self.assertFalse(save_json({'bottles': [object()]}, temp_path))
+            # A failed rename happens after the temp file is written
+            with mock.patch('json_utils.os.replace', side_effect=OSError('disk full')):
+                self.assertFalse(save_json({'bottles': []}, temp_path))
+            self.assertEqual(read_json(temp_path), self.test_collection)
+            leftovers = [name for name in os.listdir(os.path.dirname(temp_path))
+                         if name.startswith(os.path.basename(temp_path) + '.tmp')]
+            self.assertEqual(leftovers, [])
+        finally:
+            os.unlink(temp_path)
+    
     def test_record_tasting_valid(self):
         """Test recording a valid tasting."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(self.test_collection, f)
-            temp_path = f.name
+        temp_path = write_temp_json(self.test_collection)
         
         try:
             result = record_tasting(temp_path, 1, 7.5, "Great taste!")
@@ -87,11 +137,22 @@ class TestTastingManager(unittest.TestCase):
         finally:
             os.unlink(temp_path)
     
+    def test_record_tasting_failed_save_keeps_cache(self):
+        """Test a failed save leaves the cached collection unmodified."""
+        temp_path = write_temp_json(self.test_collection)
+        
+        try:
+            cached = load_json(temp_path)
+            with mock.patch('tasting_manager.save_json', return_value=False):
+                self.assertFalse(record_tasting(temp_path, 1, 7.5, "Notes"))
+            self.assertFalse(cached['bottles'][0]['tasted'])
+            self.assertIsNone(cached['bottles'][0]['rating'])
+        finally:
+            os.unlink(temp_path)
+    
     def test_record_tasting_invalid_id(self):
         """Test recording tasting with invalid bottle ID."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(self.test_collection, f)
-            temp_path = f.name
+        temp_path = write_temp_json(self.test_collection)
         
         try:
             result = record_tasting(temp_path, 999, 7.5, "Notes")
@@ -101,9 +162,7 @@ class TestTastingManager(unittest.TestCase):
     
     def test_record_tasting_invalid_rating(self):
         """Test recording tasting with invalid rating."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(self.test_collection, f)
-            temp_path = f.name
+        temp_path = write_temp_json(self.test_collection)
         
         try:
             result = record_tasting(temp_path, 1, 15, "Notes")  # Rating > 10
@@ -111,8 +170,191 @@ class TestTastingManager(unittest.TestCase):
             
             result = record_tasting(temp_path, 1, -1, "Notes")  # Rating < 0
             self.assertFalse(result)
+            
+            result = record_tasting(temp_path, 1, float('nan'), "Notes")
+            self.assertFalse(result)
+        finally:
+            os.unlink(temp_path)
+    
+    def test_record_tasting_invalid_date(self):
+        """Test recording tasting rejects dates that are not YYYY-MM-DD."""
+        temp_path = write_temp_json(self.test_collection)
+        
+        try:
+            for bad_date in ('20240101', '2024-02-30', '01/02/2024'):
+                self.assertFalse(record_tasting(temp_path, 1, 7.5, "Notes", bad_date))
+            self.assertTrue(record_tasting(temp_path, 1, 7.5, "Notes", '2024-02-29'))
         finally:
             os.unlink(temp_path)
+    
+    def test_view_schedule_skips_past_entries(self):
+        """Test view_schedule shows only upcoming entries, even if unsorted."""
+        today = datetime.now().date()
+        schedule = {'schedule': [
+            {'week': 3, 'date': (today + timedelta(days=14)).isoformat(),
+             'bottle_name': 'Later Bottle', 'category': 'rye', 'abv': 45},
+            {'week': 1, 'date': (today - timedelta(days=7)).isoformat(),
+             'bottle_name': 'Past Bottle', 'category': 'bourbon', 'abv': 40},
+            {'week': 2, 'date': (today + timedelta(days=7)).isoformat(),
+             'bottle_name': 'Next Bottle', 'category': 'scotch', 'abv': 43},
+        ]}
+        temp_path = write_temp_json(schedule)
+        
+        try:
+            output = io.StringIO()
+            with redirect_stdout(output):
+                view_schedule(temp_path, weeks=1)
+            text = output.getvalue()
+            self.assertIn('Next Bottle', text)
+            self.assertNotIn('Past Bottle', text)
+            self.assertNotIn('Later Bottle', text)
+        finally:
+            os.unlink(temp_path)
+    
+    def test_view_schedule_warns_on_invalid_dates(self):
+        """Test view_schedule skips impossible dates and keeps filling the window."""
+        today = datetime.now().date()
+        schedule = {'schedule': [
+            {'week': 1, 'date': '2999-02-30', 'bottle_name': 'Bad Date'},
+            {'week': 2, 'date': (today + timedelta(days=7)).isoformat(),
+             'bottle_name': 'Good Bottle', 'category': 'rye', 'abv': 45},
+        ]}
+        temp_path = write_temp_json(schedule)
+        
+        try:
+            output = io.StringIO()
+            with redirect_stdout(output):
+                view_schedule(temp_path, weeks=2)
+            text = output.getvalue()
+            self.assertIn('Warning: Skipping invalid schedule entry', text)
+            self.assertIn('Good Bottle', text)
+            self.assertNotIn('Bad Date', text)
+        finally:
+            os.unlink(temp_path)
+    
+    def test_view_schedule_warns_on_every_malformed_entry(self):
+        """Test missing and non-ISO dates are reported however they sort."""
+        today = datetime.now().date()
+        schedule = {'schedule': [
+            {'week': 1, 'bottle_name': 'No Date'},
+            {'week': 2, 'date': '01/05/2099', 'bottle_name': 'Slash Date'},
+            {'week': 3, 'date': (today + timedelta(days=7)).isoformat(),
+             'bottle_name': 'Good Bottle', 'category': 'rye', 'abv': 45},
+            {'week': 4, 'date': 'not-a-date', 'bottle_name': 'Word Date'},
+        ]}
+        temp_path = write_temp_json(schedule)
+        
+        try:
+            output = io.StringIO()
+            with redirect_stdout(output):
+                view_schedule(temp_path, weeks=1)
+            text = output.getvalue()
+            self.assertEqual(text.count('Warning: Skipping invalid schedule entry'), 3)
+            self.assertIn('Good Bottle', text)
+        finally:
+            os.unlink(temp_path)
+    
+    def test_list_bottles_tolerates_missing_name(self):
+        """Test list_bottles sorts and prints bottles that lack a name."""
+        self.test_collection['bottles'].append({'id': 2, 'category': 'rye'})
+        temp_path = write_temp_json(self.test_collection)
+        
+        try:
+            output = io.StringIO()
+            with redirect_stdout(output):
+                list_bottles(temp_path)
+            rows = output.getvalue().splitlines()[-2:]
+            self.assertTrue(rows[0].startswith('2 '))
+            self.assertIn('Unknown', rows[0])
+            self.assertIn('Test Bourbon', rows[1])
+        finally:
+            os.unlink(temp_path)
+    
+    def test_list_bottles_category_filter(self):
+        """Test category filtering is case-insensitive and skips null categories."""
+        self.test_collection['bottles'].append({'id': 2, 'name': 'Mystery', 'category': None})
+        temp_path = write_temp_json(self.test_collection)
+        
+        try:
+            output = io.StringIO()
+            with redirect_stdout(output):
+                list_bottles(temp_path, category='BOURBON')
+            text = output.getvalue()
+            self.assertIn('Test Bourbon', text)
+            self.assertNotIn('Mystery', text)
+        finally:
+            os.unlink(temp_path)
+    
+    def test_list_bottles_null_category(self):
+        """Test an unfiltered listing prints a null category as 'other'."""
+        self.test_collection['bottles'].append({'id': 2, 'name': 'Mystery', 'category': None})
+        temp_path = write_temp_json(self.test_collection)
+        
+        try:
+            output = io.StringIO()
+            with redirect_stdout(output):
+                list_bottles(temp_path)
+            row = next(line for line in output.getvalue().splitlines() if 'Mystery' in line)
+            self.assertIn('other', row)
+        finally:
+            os.unlink(temp_path)
+    
+    def test_list_bottles_json(self):
+        """Test list_bottles emits one JSON object per matching bottle."""
+        self.test_collection['bottles'].append({
+            'id': 2, 'name': 'Test Rye', 'category': 'rye', 'tasted': True, 'rating': 8.0
+        })
+        temp_path = write_temp_json(self.test_collection)
+        
+        try:
+            output = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+            with redirect_stdout(output):
+                list_bottles(temp_path, tasted=True, as_json=True)
+            rows = [json.loads(line) for line in output.buffer.getvalue().splitlines()]
+            self.assertEqual([row['id'] for row in rows], [2])
+        finally:
+            os.unlink(temp_path)
+    
+    def test_view_progress_json(self):
+        """Test view_progress aggregates totals, ratings and categories."""
+        self.test_collection['bottles'].extend([
+            {'id': 2, 'name': 'Test Rye', 'category': 'rye', 'tasted': True, 'rating': 8.0},
+            {'id': 3, 'name': 'Other Bourbon', 'category': 'bourbon', 'tasted': True, 'rating': '6'},
+            {'id': 4, 'name': 'Unrated Rye', 'category': 'rye', 'tasted': True, 'rating': 'n/a'},
+        ])
+        temp_path = write_temp_json(self.test_collection)
+        
+        try:
+            output = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+            with redirect_stdout(output):
+                view_progress(temp_path, as_json=True)
+            stats = json.loads(output.buffer.getvalue())
+            self.assertEqual(stats['total'], 4)
+            self.assertEqual(stats['tasted'], 3)
+            self.assertEqual(stats['untasted'], 1)
+            self.assertEqual(stats['average_rating'], 7.0)
+            self.assertEqual(stats['highest_rating'], 8.0)
+            self.assertEqual(stats['lowest_rating'], 6.0)
+            self.assertEqual(stats['categories'], {
+                'bourbon': {'total': 2, 'tasted': 1},
+                'rye': {'total': 2, 'tasted': 2},
+            })
+        finally:
+            os.unlink(temp_path)
+    
+    @mock.patch.dict(os.environ, {'EDITOR': 'code -w'})
+    @mock.patch('tasting_manager.sys.platform', 'linux')
+    @mock.patch('tasting_manager.subprocess.run')
+    def test_edit_config_runs_editor_without_shell(self, mock_run):
+        """Test the editor is exec'd directly with EDITOR flags and the path intact."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_path = os.path.join(tmpdir, 'my config.json')
+            with open(config_path, 'w') as f:
+                f.write('{}')
+            with redirect_stdout(io.StringIO()):
+                edit_config(config_path)
+        
+        mock_run.assert_called_once_with(['code', '-w', config_path], check=False)
 
 
 if __name__ == '__main__':
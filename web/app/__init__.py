@@ -25,6 +25,12 @@ def create_app(config_class=Config):
     """Create and configure the Flask application."""
     app = Flask(__name__)
     app.config.from_object(config_class)
+    # Resolved once here so photo requests can join paths onto it directly
+    app.config['UPLOAD_FOLDER'] = os.path.abspath(app.config['UPLOAD_FOLDER'])
+    
+    # Encode jsonify() responses with orjson when it is installed
+    from app.json_provider import OrjsonProvider
+    app.json = OrjsonProvider(app)
     
     # Initialize extensions
     db.init_app(app)
@@ -32,7 +38,8 @@ def create_app(config_class=Config):
     login_manager.init_app(app)
     
     # Register blueprints
-    from app.api import bp as api_bp
+    from app.api import bp as api_bp, load_routes
+    load_routes()
     app.register_blueprint(api_bp, url_prefix='/api')
     
     from app.auth import bp as auth_bp
@@ -54,10 +61,13 @@ def create_app(config_class=Config):
     
     # User loader for Flask-Login
     from app.models import User
+    from sqlalchemy.orm import joinedload
     
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        # The config row is one-to-one and read by several views, so fetch it
+        # in the same query as the user rather than with a later lazy load
+        return db.session.get(User, int(user_id), options=[joinedload(User.config)])
     
     return app
 
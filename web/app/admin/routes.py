@@ -2,52 +2,77 @@
 Admin routes for user management
 """
 
-from flask import render_template, redirect, url_for, flash, request, jsonify
-from flask_login import login_required, current_user
+from datetime import datetime
+from flask import current_app, render_template, redirect, url_for, flash, request, jsonify
+from flask_login import current_user
 from app.admin import bp
 from app.models import User, db
-from functools import wraps
+from sqlalchemy import func, tuple_, update
+from sqlalchemy.orm import load_only
 
 
-def admin_required(f):
-    """Decorator to require admin role."""
-    @wraps(f)
-    @login_required
-    def decorated_function(*args, **kwargs):
-        if not current_user.is_admin:
-            flash('Admin access required.', 'error')
-            return redirect(url_for('main.index'))
-        return f(*args, **kwargs)
-    return decorated_function
+BULK_USER_ACTIONS = ('promote', 'demote', 'delete')
+
+
+@bp.before_request
+def require_admin():
+    """Require a logged-in admin for every view in this blueprint.
+    
+    Runs once per request instead of wrapping each view, with the same
+    outcomes login_required plus the role check gave per view.
+    """
+    if not current_user.is_authenticated:
+        return current_app.login_manager.unauthorized()
+    if not current_user.is_admin:
+        flash('Admin access required.', 'error')
+        return redirect(url_for('main.index'))
 
 
 @bp.route('/users')
-@admin_required
 def users():
-    """Admin user management page."""
-    page = request.args.get('page', 1, type=int)
+    """Admin user management page.
+    
+    Pages are addressed by a keyset cursor (the created_at and id of the
+    last user shown) rather than a page number, so each page is a range
+    scan on the created_at index and no COUNT over the filtered set is run.
+    """
     search = request.args.get('search', '', type=str)
+    after_created_at = request.args.get('after_created_at', type=datetime.fromisoformat)
+    after_id = request.args.get('after_id', type=int)
     per_page = 20
     
-    query = User.query
+    # Listing never needs password hashes, so only load the listed columns
+    query = User.query.options(load_only(
+        User.id, User.username, User.email, User.is_admin, User.created_at, User.last_login
+    ))
     
     if search:
+        # Lower-case the term once here; lower(col) LIKE avoids ILIKE's per-row case folding
+        pattern = f'%{search.lower()}%'
         query = query.filter(
             db.or_(
-                User.username.ilike(f'%{search}%'),
-                User.email.ilike(f'%{search}%')
+                func.lower(User.username).like(pattern),
+                func.lower(User.email).like(pattern)
             )
         )
     
-    users = query.order_by(User.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    if after_created_at is not None and after_id is not None:
+        query = query.filter(tuple_(User.created_at, User.id) < (after_created_at, after_id))
+    
+    # Fetch one extra row to learn whether a next page exists
+    rows = query.order_by(User.created_at.desc(), User.id.desc()).limit(per_page + 1).all()
+    users = rows[:per_page]
     
-    return render_template('admin/users.html', users=users, search=search)
+    next_cursor = None
+    if len(rows) > per_page:
+        last = users[-1]
+        next_cursor = {'after_created_at': last.created_at.isoformat(), 'after_id': last.id}
+    
+    return render_template('admin/users.html', users=users, next_cursor=next_cursor,
+                           search=search)
 
 
 @bp.route('/users/<int:user_id>')
-@admin_required
 def user_detail(user_id):
     """View user details."""
     user = User.query.get_or_404(user_id)
@@ -55,18 +80,11 @@ def user_detail(user_id):
 
 
 @bp.route('/users/<int:user_id>/promote', methods=['POST'])
-@admin_required
 def promote_user(user_id):
     """Promote user to admin."""
     user = User.query.get_or_404(user_id)
     
-    # Prevent self-demotion if this is the last admin
-    if current_user.id == user_id:
-        admin_count = User.query.filter_by(is_admin=True).count()
-        if admin_count <= 1:
-            flash('Cannot remove admin status: you are the last admin.', 'error')
-            return redirect(url_for('admin.user_detail', user_id=user_id))
-    
+    # Promotion never removes admin status, so no last-admin check is needed
     user.is_admin = True
     db.session.commit()
     flash(f'{user.username} has been promoted to admin.', 'success')
@@ -74,17 +92,14 @@ def promote_user(user_id):
 
 
 @bp.route('/users/<int:user_id>/demote', methods=['POST'])
-@admin_required
 def demote_user(user_id):
     """Remove admin status from user."""
     user = User.query.get_or_404(user_id)
     
     # Prevent self-demotion if this is the last admin
-    if current_user.id == user_id:
-        admin_count = User.query.filter_by(is_admin=True).count()
-        if admin_count <= 1:
-            flash('Cannot remove admin status: you are the last admin.', 'error')
-            return redirect(url_for('admin.user_detail', user_id=user_id))
+    if current_user.id == user_id and not User.other_admin_exists(user_id):
+        flash('Cannot remove admin status: you are the last admin.', 'error')
+        return redirect(url_for('admin.user_detail', user_id=user_id))
     
     user.is_admin = False
     db.session.commit()
@@ -93,7 +108,6 @@ def demote_user(user_id):
 
 
 @bp.route('/users/<int:user_id>/delete', methods=['POST'])
-@admin_required
 def delete_user(user_id):
     """Delete a user account."""
     user = User.query.get_or_404(user_id)
@@ -110,13 +124,55 @@ def delete_user(user_id):
     return redirect(url_for('admin.users'))
 
 
+@bp.route('/users/bulk', methods=['POST'])
+def bulk_user_action():
+    """Promote, demote or delete many users in one transaction.
+    
+    Expects JSON ``{"action": "promote" | "demote" | "delete", "user_ids": [...]}``.
+    Promote and demote are a single UPDATE ... WHERE id IN (...). Deletes go
+    through the ORM so each user's bottles, schedules and config cascade, but
+    still share one SELECT and one commit. The single-user routes' guards
+    apply: no self-deletion, and no demoting yourself as the last admin.
+    """
+    data = request.get_json(silent=True) or {}
+    action = data.get('action')
+    user_ids = data.get('user_ids')
+    
+    if action not in BULK_USER_ACTIONS:
+        return jsonify({'error': f"action must be one of: {', '.join(BULK_USER_ACTIONS)}"}), 400
+    if (not isinstance(user_ids, list) or not user_ids
+            or not all(isinstance(i, int) and not isinstance(i, bool) for i in user_ids)):
+        return jsonify({'error': 'user_ids must be a non-empty list of integers'}), 400
+    user_ids = set(user_ids)
+    
+    if action == 'delete':
+        if current_user.id in user_ids:
+            return jsonify({'error': 'Cannot delete your own account'}), 400
+        users = User.query.filter(User.id.in_(user_ids)).all()
+        for user in users:
+            db.session.delete(user)
+        affected = len(users)
+    else:
+        if action == 'demote' and current_user.id in user_ids:
+            remaining = User.query.filter(User.is_admin.is_(True), User.id.notin_(user_ids))
+            if not db.session.query(remaining.exists()).scalar():
+                return jsonify({'error': 'Cannot remove admin status: you are the last admin'}), 400
+        result = db.session.execute(
+            update(User).where(User.id.in_(user_ids)).values(is_admin=(action == 'promote'))
+        )
+        affected = result.rowcount
+    
+    db.session.commit()
+    return jsonify({'action': action, 'affected': affected})
+
+
 @bp.route('/dashboard')
-@admin_required
 def dashboard():
     """Admin dashboard."""
-    total_users = User.query.count()
-    admin_users = User.query.filter_by(is_admin=True).count()
-    recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
+    total_users, admin_users = User.user_counts()
+    recent_users = User.query.options(load_only(
+        User.id, User.username, User.email, User.created_at
+    )).order_by(User.created_at.desc()).limit(5).all()
     
     return render_template('admin/dashboard.html',
                          total_users=total_users,
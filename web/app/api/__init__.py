@@ -2,9 +2,26 @@
 API Blueprint for Dram Planner Web Application
 """
 
+import importlib
+
 from flask import Blueprint
 
 bp = Blueprint('api', __name__)
 
-from app.api import bottles, schedules, config, auth, export, barcode, catalog, catalog_admin, groups, whisky_sources, admin, health, reviews, advanced_tasting
+# Route modules attached to bp. They are imported by load_routes() from the
+# app factory, not whenever this package is imported.
+_API_MODULES = (
+    'bottles', 'schedules', 'config', 'auth', 'export', 'barcode', 'catalog',
+    'catalog_admin', 'groups', 'whisky_sources', 'admin', 'health', 'reviews',
+    'advanced_tasting',
+)
+
 
+def load_routes():
+    """Import every API route module so its routes are registered on bp.
+    
+    Flask needs all routes on a blueprint before it is first registered, so
+    this must run before app.register_blueprint(bp). Repeat calls are cheap.
+    """
+    for name in _API_MODULES:
+        importlib.import_module(f'{__name__}.{name}')
@@ -2,10 +2,14 @@
 Admin API endpoints
 """
 
+from datetime import datetime
 from flask import request, jsonify
 from flask_login import login_required, current_user
 from app.api import bp
-from app.models import User, db
+from app.api.utils import MISSING, clamp_per_page, paginate_without_count
+from app.models import Bottle, Schedule, User, db
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import load_only
 from functools import wraps
 
 
@@ -20,43 +24,89 @@ def admin_required_api(f):
     return decorated_function
 
 
+def _user_summary(user):
+    """Serialize the listed columns of a user."""
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'is_admin': user.is_admin,
+        'created_at': user.created_at.isoformat(),
+        'last_login': user.last_login.isoformat() if user.last_login else None
+    }
+
+
 @bp.route('/admin/users', methods=['GET'])
 @admin_required_api
 def list_users():
-    """List all users (admin only)."""
-    page = request.args.get('page', 1, type=int)
+    """List all users (admin only).
+    
+    Pages are addressed by a keyset cursor (after_created_at and after_id,
+    taken from next_cursor) so deep pages are an index range scan and no
+    COUNT is run. The old ?page= numbering still works but is deprecated.
+    """
+    page = request.args.get('page', type=int)
     per_page = request.args.get('per_page', 20, type=int)
     search = request.args.get('search', '', type=str)
+    after_created_at = request.args.get('after_created_at', type=datetime.fromisoformat)
+    after_id = request.args.get('after_id', type=int)
     
-    query = User.query
+    # Listing never needs password hashes, so only load the listed columns
+    query = User.query.options(load_only(
+        User.id, User.username, User.email, User.is_admin, User.created_at, User.last_login
+    ))
     
     if search:
+        # Lower-case the term once here; lower(col) LIKE avoids ILIKE's per-row case folding
+        pattern = f'%{search.lower()}%'
         query = query.filter(
             db.or_(
-                User.username.ilike(f'%{search}%'),
-                User.email.ilike(f'%{search}%')
+                func.lower(User.username).like(pattern),
+                func.lower(User.email).like(pattern)
             )
         )
     
-    pagination = query.order_by(User.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
-    
-    users = [{
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'is_admin': user.is_admin,
-        'created_at': user.created_at.isoformat(),
-        'last_login': user.last_login.isoformat() if user.last_login else None
-    } for user in pagination.items]
+    if page is not None:
+        ordered = query.order_by(User.created_at.desc())
+        if request.args.get('total', 'true').lower() == 'false':
+            # Skip the COUNT(*) when the caller only needs to know if more follow
+            items, has_next = paginate_without_count(ordered, page, per_page)
+            body = {
+                'users': [_user_summary(user) for user in items],
+                'page': page,
+                'per_page': per_page,
+                'has_next': has_next
+            }
+        else:
+            pagination = ordered.paginate(page=page, per_page=per_page, error_out=False)
+            body = {
+                'users': [_user_summary(user) for user in pagination.items],
+                'total': pagination.total,
+                'page': page,
+                'per_page': per_page,
+                'pages': pagination.pages
+            }
+        response = jsonify(body)
+        response.headers['Deprecation'] = 'true'
+        return response
+    
+    if after_created_at is not None and after_id is not None:
+        query = query.filter(tuple_(User.created_at, User.id) < (after_created_at, after_id))
+    
+    # Fetch one extra row to learn whether a next page exists
+    per_page = clamp_per_page(per_page)
+    rows = query.order_by(User.created_at.desc(), User.id.desc()).limit(per_page + 1).all()
+    users = rows[:per_page]
+    
+    next_cursor = None
+    if len(rows) > per_page and users:
+        last = users[-1]
+        next_cursor = {'after_created_at': last.created_at.isoformat(), 'after_id': last.id}
     
     return jsonify({
-        'users': users,
-        'total': pagination.total,
-        'page': page,
+        'users': [_user_summary(user) for user in users],
         'per_page': per_page,
-        'pages': pagination.pages
+        'next_cursor': next_cursor
     })
 
 
@@ -64,51 +114,59 @@ def list_users():
 @admin_required_api
 def get_user(user_id):
     """Get user details (admin only)."""
-    user = User.query.get_or_404(user_id)
+    # Count bottles and schedules in correlated subqueries so the user row and
+    # both counts arrive in one round-trip (joins would multiply the rows)
+    bottle_count = db.select(func.count(Bottle.id)).where(
+        Bottle.user_id == User.id
+    ).correlate(User).scalar_subquery()
+    schedule_count = db.select(func.count(Schedule.id)).where(
+        Schedule.user_id == User.id
+    ).correlate(User).scalar_subquery()
+    
+    user, bottles, schedules = db.session.query(User, bottle_count, schedule_count).options(load_only(
+        User.id, User.username, User.email, User.is_admin, User.created_at, User.last_login
+    )).filter(User.id == user_id).first_or_404()
     
     return jsonify({
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'is_admin': user.is_admin,
-        'created_at': user.created_at.isoformat(),
-        'last_login': user.last_login.isoformat() if user.last_login else None,
-        'bottle_count': user.bottles.count(),
-        'schedule_count': user.schedules.count()
+        **_user_summary(user),
+        'bottle_count': bottles,
+        'schedule_count': schedules
     })
 
 
 @bp.route('/admin/users/<int:user_id>', methods=['PUT'])
 @admin_required_api
 def update_user(user_id):
-    """Update user (admin only)."""
+    """Update user (admin only).
+    
+    Nothing is committed when the request leaves the user unchanged.
+    """
     user = User.query.get_or_404(user_id)
     data = request.get_json() or {}
+    username = data.get('username', MISSING)
+    email = data.get('email', MISSING)
+    is_admin = data.get('is_admin', MISSING)
     
     # Prevent modifying own admin status if last admin
-    if current_user.id == user_id and 'is_admin' in data:
-        admin_count = User.query.filter_by(is_admin=True).count()
-        if admin_count <= 1 and not data.get('is_admin', False):
+    if current_user.id == user_id and is_admin is not MISSING and not is_admin:
+        if not User.other_admin_exists(user_id):
             return jsonify({'error': 'Cannot remove admin status: you are the last admin'}), 400
     
-    if 'username' in data:
-        # Check if username already exists
-        existing = User.query.filter_by(username=data['username']).first()
-        if existing and existing.id != user_id:
-            return jsonify({'error': 'Username already exists'}), 400
-        user.username = data['username']
+    taken = User.taken_field(data.get('username'), data.get('email'), exclude_id=user_id)
+    if taken:
+        return jsonify({'error': f'{taken.capitalize()} already exists'}), 400
     
-    if 'email' in data:
-        # Check if email already exists
-        existing = User.query.filter_by(email=data['email']).first()
-        if existing and existing.id != user_id:
-            return jsonify({'error': 'Email already exists'}), 400
-        user.email = data['email']
+    if username is not MISSING:
+        user.username = username
     
-    if 'is_admin' in data:
-        user.is_admin = bool(data['is_admin'])
+    if email is not MISSING:
+        user.email = email
     
-    db.session.commit()
+    if is_admin is not MISSING:
+        user.is_admin = bool(is_admin)
+    
+    if db.session.is_modified(user):
+        db.session.commit()
     
     return jsonify({
         'id': user.id,
@@ -142,10 +200,8 @@ def demote_user(user_id):
     user = User.query.get_or_404(user_id)
     
     # Prevent self-demotion if last admin
-    if current_user.id == user_id:
-        admin_count = User.query.filter_by(is_admin=True).count()
-        if admin_count <= 1:
-            return jsonify({'error': 'Cannot remove admin status: you are the last admin'}), 400
+    if current_user.id == user_id and not User.other_admin_exists(user_id):
+        return jsonify({'error': 'Cannot remove admin status: you are the last admin'}), 400
     
     user.is_admin = False
     db.session.commit()
@@ -179,19 +235,5 @@ def delete_user(user_id):
 @admin_required_api
 def admin_stats():
     """Get admin statistics."""
-    total_users = User.query.count()
-    admin_users = User.query.filter_by(is_admin=True).count()
-    recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
-    
-    return jsonify({
-        'total_users': total_users,
-        'admin_users': admin_users,
-        'regular_users': total_users - admin_users,
-        'recent_users': [{
-            'id': u.id,
-            'username': u.username,
-            'email': u.email,
-            'created_at': u.created_at.isoformat()
-        } for u in recent_users]
-    })
+    return jsonify(User.admin_stats())
 
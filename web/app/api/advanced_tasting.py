@@ -3,24 +3,83 @@ Advanced Tasting Customization API endpoints
 Part of ENH-011: Advanced Tasting Customization Options
 """
 
+from collections.abc import Hashable
 from flask import request, jsonify
 from flask_login import login_required, current_user
 from app.api import bp
+from app.api.utils import MISSING, encode_static_json, static_json_response
 from app.models import UserConfig, db
 import json
 
+TASTING_TEMPLATES = {
+    'whiskey': {
+        'name': 'Whiskey/Whisky',
+        'fields': ['nose', 'palate', 'finish', 'overall', 'notes']
+    },
+    'wine': {
+        'name': 'Wine',
+        'fields': ['appearance', 'nose', 'palate', 'finish', 'overall']
+    },
+    'beer': {
+        'name': 'Beer',
+        'fields': ['appearance', 'aroma', 'taste', 'mouthfeel', 'overall']
+    },
+    'cocktail': {
+        'name': 'Cocktail',
+        'fields': ['appearance', 'aroma', 'taste', 'balance', 'overall']
+    },
+    'custom': {
+        'name': 'Custom',
+        'fields': []
+    }
+}
+
+RATING_SCALES = {
+    '0-10': {
+        'name': '0-10 Scale',
+        'min': 0,
+        'max': 10,
+        'description': 'Decimal scale from 0 to 10'
+    },
+    '1-5': {
+        'name': '1-5 Stars',
+        'min': 1,
+        'max': 5,
+        'description': 'Integer star rating from 1 to 5'
+    },
+    'A-F': {
+        'name': 'Letter Grade',
+        'min': 'F',
+        'max': 'A',
+        'description': 'Letter grade from F to A'
+    }
+}
+
+# These responses never change, so they are encoded once at import
+_TEMPLATES_JSON = encode_static_json({'templates': TASTING_TEMPLATES})
+_RATING_SCALES_JSON = encode_static_json({'scales': RATING_SCALES})
+
+# Accepted values for update_tasting_config, built from the lists served above
+VALID_RATING_SCALES = frozenset(RATING_SCALES)
+RATING_SCALE_ERROR = f'Rating scale must be one of: {", ".join(RATING_SCALES)}'
+VALID_TEMPLATES = frozenset(TASTING_TEMPLATES) | {None}
+VALID_SORTS = frozenset({'category', 'abv', 'age', 'region', 'price', 'name', None})
+
+
+def _is_choice(value, choices):
+    """Check a JSON value is one of choices (lists and objects never are)."""
+    return isinstance(value, Hashable) and value in choices
+
 
 @bp.route('/config/tasting', methods=['GET'])
 @login_required
 def get_tasting_config():
     """Get user's advanced tasting configuration."""
     
-    config = current_user.config
-    if not config:
-        # Create default config
-        config = UserConfig(user_id=current_user.id)
-        db.session.add(config)
-        db.session.commit()
+    # Users without a config row get the defaults from an unsaved instance;
+    # the row is only written when they update their settings, so this read
+    # never opens a write transaction
+    config = current_user.config or UserConfig()
     
     return jsonify({
         'bottles_per_session': config.bottles_per_session or 1,
@@ -37,58 +96,68 @@ def get_tasting_config():
 @bp.route('/config/tasting', methods=['PUT'])
 @login_required
 def update_tasting_config():
-    """Update user's advanced tasting configuration."""
+    """Update user's advanced tasting configuration.
     
-    config = current_user.config
-    if not config:
-        config = UserConfig(user_id=current_user.id)
-        db.session.add(config)
+    An existing config that the request leaves unchanged is not committed.
+    """
+    
+    # A new row is only added to the session once every field validates, so a
+    # rejected update leaves nothing pending
+    config = current_user.config or UserConfig(user_id=current_user.id)
     
     data = request.get_json() or {}
     
-    if 'bottles_per_session' in data:
-        bottles = int(data['bottles_per_session'])
+    bottles = data.get('bottles_per_session', MISSING)
+    if bottles is not MISSING:
+        bottles = int(bottles)
         if bottles < 1:
             return jsonify({'error': 'Bottles per session must be at least 1'}), 400
         config.bottles_per_session = bottles
     
-    if 'rating_scale' in data:
-        valid_scales = ['0-10', '1-5', 'A-F']
-        if data['rating_scale'] not in valid_scales:
-            return jsonify({'error': f'Rating scale must be one of: {", ".join(valid_scales)}'}), 400
-        config.rating_scale = data['rating_scale']
+    rating_scale = data.get('rating_scale', MISSING)
+    if rating_scale is not MISSING:
+        if not _is_choice(rating_scale, VALID_RATING_SCALES):
+            return jsonify({'error': RATING_SCALE_ERROR}), 400
+        config.rating_scale = rating_scale
     
-    if 'tasting_note_template' in data:
-        valid_templates = ['whiskey', 'wine', 'beer', 'cocktail', 'custom', None]
-        if data['tasting_note_template'] not in valid_templates:
+    template = data.get('tasting_note_template', MISSING)
+    if template is not MISSING:
+        if not _is_choice(template, VALID_TEMPLATES):
             return jsonify({'error': 'Invalid tasting note template'}), 400
-        config.tasting_note_template = data['tasting_note_template']
+        config.tasting_note_template = template
     
-    if 'blind_tasting_mode' in data:
-        config.blind_tasting_mode = bool(data['blind_tasting_mode'])
+    blind = data.get('blind_tasting_mode', MISSING)
+    if blind is not MISSING:
+        config.blind_tasting_mode = bool(blind)
     
-    if 'sort_preference' in data:
-        valid_sorts = ['category', 'abv', 'age', 'region', 'price', 'name', None]
-        if data['sort_preference'] not in valid_sorts:
+    sort_preference = data.get('sort_preference', MISSING)
+    if sort_preference is not MISSING:
+        if not _is_choice(sort_preference, VALID_SORTS):
             return jsonify({'error': 'Invalid sort preference'}), 400
-        config.sort_preference = data['sort_preference']
+        config.sort_preference = sort_preference
     
-    if 'exclude_recent_categories_days' in data:
-        days = int(data['exclude_recent_categories_days'])
+    days = data.get('exclude_recent_categories_days', MISSING)
+    if days is not MISSING:
+        days = int(days)
         if days < 0:
             return jsonify({'error': 'Days must be non-negative'}), 400
         config.exclude_recent_categories_days = days
     
-    if 'notification_enabled' in data:
-        config.notification_enabled = bool(data['notification_enabled'])
+    notification_enabled = data.get('notification_enabled', MISSING)
+    if notification_enabled is not MISSING:
+        config.notification_enabled = bool(notification_enabled)
     
-    if 'notification_timing_hours' in data:
-        hours = int(data['notification_timing_hours'])
+    hours = data.get('notification_timing_hours', MISSING)
+    if hours is not MISSING:
+        hours = int(hours)
         if hours < 0:
             return jsonify({'error': 'Hours must be non-negative'}), 400
         config.notification_timing_hours = hours
     
-    db.session.commit()
+    # A new config is always written so the response carries its column defaults
+    if config.id is None or db.session.is_modified(config):
+        db.session.add(config)
+        db.session.commit()
     
     return jsonify({
         'message': 'Tasting configuration updated',
@@ -109,58 +178,12 @@ def update_tasting_config():
 @login_required
 def get_tasting_templates():
     """Get available tasting note templates."""
-    
-    templates = {
-        'whiskey': {
-            'name': 'Whiskey/Whisky',
-            'fields': ['nose', 'palate', 'finish', 'overall', 'notes']
-        },
-        'wine': {
-            'name': 'Wine',
-            'fields': ['appearance', 'nose', 'palate', 'finish', 'overall']
-        },
-        'beer': {
-            'name': 'Beer',
-            'fields': ['appearance', 'aroma', 'taste', 'mouthfeel', 'overall']
-        },
-        'cocktail': {
-            'name': 'Cocktail',
-            'fields': ['appearance', 'aroma', 'taste', 'balance', 'overall']
-        },
-        'custom': {
-            'name': 'Custom',
-            'fields': []
-        }
-    }
-    
-    return jsonify({'templates': templates})
+    return static_json_response(_TEMPLATES_JSON)
 
 
 @bp.route('/config/tasting/rating-scales', methods=['GET'])
 @login_required
 def get_rating_scales():
     """Get available rating scales."""
-    
-    scales = {
-        '0-10': {
-            'name': '0-10 Scale',
-            'min': 0,
-            'max': 10,
-            'description': 'Decimal scale from 0 to 10'
-        },
-        '1-5': {
-            'name': '1-5 Stars',
-            'min': 1,
-            'max': 5,
-            'description': 'Integer star rating from 1 to 5'
-        },
-        'A-F': {
-            'name': 'Letter Grade',
-            'min': 'F',
-            'max': 'A',
-            'description': 'Letter grade from F to A'
-        }
-    }
-    
-    return jsonify({'scales': scales})
+    return static_json_response(_RATING_SCALES_JSON)
 
@@ -2,10 +2,14 @@
 Authentication API endpoints
 """
 
+import hashlib
+
 from flask import request, jsonify
 from app.api import bp
-from app.models import User
+from app.api.utils import json_or_not_modified
+from app.models import User, UserConfig
 from app import db
+from sqlalchemy.exc import IntegrityError
 from flask_login import login_user, logout_user, login_required, current_user
 
 
@@ -17,26 +21,25 @@ def register():
     if not data.get('username') or not data.get('email') or not data.get('password'):
         return jsonify({'error': 'Username, email, and password are required'}), 400
     
-    if User.query.filter_by(username=data['username']).first():
-        return jsonify({'error': 'Username already exists'}), 400
-    
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({'error': 'Email already exists'}), 400
-    
     user = User(
         username=data['username'],
         email=data['email']
     )
     user.set_password(data['password'])
+    # Create default config in the same transaction as the user
+    user.config = UserConfig()
     
+    # The unique constraints catch duplicates, so a successful signup costs
+    # no lookups; the clashing field is only looked up when the insert fails
     db.session.add(user)
-    db.session.commit()
-    
-    # Create default config
-    from app.models import UserConfig
-    config = UserConfig(user_id=user.id)
-    db.session.add(config)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        taken = User.taken_field(data['username'], data['email'])
+        if taken is None:
+            raise
+        return jsonify({'error': f'{taken.capitalize()} already exists'}), 400
     
     login_user(user)
     
@@ -84,10 +87,11 @@ def logout():
 @bp.route('/auth/me', methods=['GET'])
 @login_required
 def get_current_user():
-    """Get current user information."""
-    return jsonify({
-        'id': current_user.id,
-        'username': current_user.username,
-        'email': current_user.email
-    })
+    """Get current user information.
+    
+    Polling clients that send back the ETag get 304 until a field changes.
+    """
+    fields = (current_user.id, current_user.username, current_user.email)
+    etag = hashlib.sha1('\0'.join(map(str, fields)).encode()).hexdigest()
+    return json_or_not_modified(etag, lambda: dict(zip(('id', 'username', 'email'), fields)))
 
@@ -4,22 +4,19 @@ Barcode API endpoints for Dram Planner Web
 
 from flask import request, jsonify
 from app.api import bp
+from app.api.utils import encode_static_json, import_cli_module, static_json_response
 from flask_login import login_required, current_user
 import requests
 import json
-import sys
-import os
-
-# Add parent directory to path to import CLI modules
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
 
 # Try to import barcode_lookup module
-try:
-    import barcode_lookup
-    BARCODE_AVAILABLE = True
-except ImportError:
-    BARCODE_AVAILABLE = False
-    barcode_lookup = None
+barcode_lookup = import_cli_module('barcode_lookup')
+BARCODE_AVAILABLE = barcode_lookup is not None
+
+# The supported categories never change, so the response is encoded once
+_CATEGORIES_JSON = encode_static_json({
+    'categories': ['bourbon', 'scotch', 'irish', 'clear', 'liqueur', 'other']
+})
 
 
 @bp.route('/barcode/lookup/<barcode>', methods=['GET'])
@@ -80,11 +77,4 @@ def lookup_barcode(barcode):
 @login_required
 def get_barcode_categories():
     """Get list of supported barcode categories."""
-
-    categories = [
-        'bourbon', 'scotch', 'irish', 'clear', 'liqueur', 'other'
-    ]
-
-    return jsonify({
-        'categories': categories
-    })
+    return static_json_response(_CATEGORIES_JSON)
@@ -2,46 +2,111 @@
 Bottles API endpoints
 """
 
-from flask import request, jsonify, current_app, send_from_directory
+from flask import request, jsonify, current_app, send_from_directory, abort
 from app.api import bp
-from app.models import Bottle
+from app.api.utils import MISSING, clamp_per_page, fetch_with_total, json_or_not_modified, paginate_without_count
+from app.models import Bottle, ScheduleItem
 from app import db
 from flask_login import login_required, current_user
 from datetime import datetime
+from sqlalchemy import delete, exists, func, tuple_
+import hashlib
+import math
+import mimetypes
 import os
+import tempfile
+from urllib.parse import quote
+from werkzeug.exceptions import NotFound
 from werkzeug.utils import secure_filename
 
+from date_utils import parse_iso_date
+
+# The columns Bottle.row_to_dict() serializes, selected for list pages
+BOTTLE_LIST_COLUMNS = (
+    Bottle.id, Bottle.name, Bottle.category, Bottle.abv, Bottle.price_paid,
+    Bottle.purchase_date, Bottle.opened_date, Bottle.notes, Bottle.barcode,
+    Bottle.photo_path, Bottle.tasted, Bottle.tasting_date, Bottle.rating,
+    Bottle.tasting_notes, Bottle.created_at, Bottle.updated_at,
+)
+
 
 @bp.route('/bottles', methods=['GET'])
 @login_required
 def get_bottles():
-    """Get all bottles for current user."""
-    page = request.args.get('page', 1, type=int)
+    """Get all bottles for current user.
+    
+    Pages are addressed by a keyset cursor (after_name and after_id, taken
+    from next_cursor) so deep pages are an index range scan and no COUNT is
+    run. The old ?page= numbering still works but is deprecated.
+    
+    Only the serialized columns are selected, as rows rather than Bottle
+    instances, so a page is built without ORM identity-map work per row.
+    """
+    page = request.args.get('page', type=int)
     per_page = request.args.get('per_page', 20, type=int)
     category = request.args.get('category')
     tasted = request.args.get('tasted')
     search = request.args.get('search')
+    after_name = request.args.get('after_name')
+    after_id = request.args.get('after_id', type=int)
     
-    query = Bottle.query.filter_by(user_id=current_user.id)
+    query = db.session.query(*BOTTLE_LIST_COLUMNS).filter(Bottle.user_id == current_user.id)
     
     if category:
-        query = query.filter_by(category=category.lower())
+        query = query.filter(Bottle.category == category.lower())
     if tasted is not None:
-        query = query.filter_by(tasted=tasted.lower() == 'true')
+        query = query.filter(Bottle.tasted.is_(tasted.lower() == 'true'))
     if search:
-        query = query.filter(Bottle.name.ilike(f'%{search}%'))
-    
-    pagination = query.order_by(Bottle.name).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+        query = query.filter(func.lower(Bottle.name).like(f'%{search.lower()}%'))
+    
+    if page is not None:
+        ordered = query.order_by(Bottle.name)
+        if request.args.get('total', 'true').lower() == 'false':
+            # Skip the COUNT(*) when the caller only needs to know if more follow
+            items, has_next = paginate_without_count(ordered, page, per_page)
+            body = {
+                'bottles': [Bottle.row_to_dict(row) for row in items],
+                'pagination': {
+                    'page': page,
+                    'per_page': per_page,
+                    'has_next': has_next
+                }
+            }
+        else:
+            # Same clamping as paginate(error_out=False); page and total in one query
+            size = per_page if per_page > 0 else 20
+            items, total = fetch_with_total(ordered, (max(page, 1) - 1) * size, size)
+            body = {
+                'bottles': [Bottle.row_to_dict(row) for row in items],
+                'pagination': {
+                    'page': page,
+                    'pages': math.ceil(total / size),
+                    'per_page': per_page,
+                    'total': total
+                }
+            }
+        response = jsonify(body)
+        response.headers['Deprecation'] = 'true'
+        return response
+    
+    if after_name is not None and after_id is not None:
+        query = query.filter(tuple_(Bottle.name, Bottle.id) > (after_name, after_id))
+    
+    # Fetch one extra row to learn whether a next page exists
+    per_page = clamp_per_page(per_page)
+    rows = query.order_by(Bottle.name, Bottle.id).limit(per_page + 1).all()
+    bottles = rows[:per_page]
+    
+    next_cursor = None
+    if len(rows) > per_page and bottles:
+        last = bottles[-1]
+        next_cursor = {'after_name': last.name, 'after_id': last.id}
     
     return jsonify({
-        'bottles': [bottle.to_dict() for bottle in pagination.items],
+        'bottles': [Bottle.row_to_dict(row) for row in bottles],
         'pagination': {
-            'page': page,
-            'pages': pagination.pages,
             'per_page': per_page,
-            'total': pagination.total
+            'next_cursor': next_cursor
         }
     })
 
@@ -49,9 +114,12 @@ def get_bottles():
 @bp.route('/bottles/<int:id>', methods=['GET'])
 @login_required
 def get_bottle(id):
-    """Get a specific bottle."""
+    """Get a specific bottle.
+    
+    Every change to a bottle bumps updated_at, so it versions the ETag.
+    """
     bottle = Bottle.query.filter_by(id=id, user_id=current_user.id).first_or_404()
-    return jsonify(bottle.to_dict())
+    return json_or_not_modified(f'{bottle.id}-{bottle.updated_at.isoformat()}', bottle.to_dict)
 
 
 @bp.route('/bottles', methods=['POST'])
@@ -60,13 +128,18 @@ def create_bottle():
     """Create a new bottle."""
     data = request.get_json() or {}
     
+    try:
+        purchase_date = parse_iso_date(data['purchase_date']) if data.get('purchase_date') else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'purchase_date must be YYYY-MM-DD'}), 400
+    
     bottle = Bottle(
         user_id=current_user.id,
         name=data.get('name', '').strip(),
         category=data.get('category', 'other').lower(),
         abv=float(data.get('abv', 0)) if data.get('abv') else 0.0,
         price_paid=float(data.get('price_paid', 0)) if data.get('price_paid') else 0.0,
-        purchase_date=datetime.strptime(data['purchase_date'], '%Y-%m-%d').date() if data.get('purchase_date') else None,
+        purchase_date=purchase_date,
         notes=data.get('notes', ''),
         barcode=data.get('barcode', '')
     )
@@ -83,27 +156,43 @@ def create_bottle():
 @bp.route('/bottles/<int:id>', methods=['PUT'])
 @login_required
 def update_bottle(id):
-    """Update a bottle."""
+    """Update a bottle.
+    
+    A PUT that changes nothing is answered without a commit and keeps
+    updated_at (and so the bottle's ETag) as it was.
+    """
     bottle = Bottle.query.filter_by(id=id, user_id=current_user.id).first_or_404()
     data = request.get_json() or {}
     
-    if 'name' in data:
-        bottle.name = data['name'].strip()
-    if 'category' in data:
-        bottle.category = data['category'].lower()
-    if 'abv' in data:
-        bottle.abv = float(data['abv']) if data['abv'] else 0.0
-    if 'price_paid' in data:
-        bottle.price_paid = float(data['price_paid']) if data['price_paid'] else 0.0
-    if 'purchase_date' in data:
-        bottle.purchase_date = datetime.strptime(data['purchase_date'], '%Y-%m-%d').date() if data['purchase_date'] else None
-    if 'notes' in data:
-        bottle.notes = data['notes']
-    if 'barcode' in data:
-        bottle.barcode = data['barcode']
-    
-    bottle.updated_at = datetime.utcnow()
-    db.session.commit()
+    purchase_date = data.get('purchase_date', MISSING)
+    if purchase_date is not MISSING:
+        try:
+            purchase_date = parse_iso_date(purchase_date) if purchase_date else None
+        except (TypeError, ValueError):
+            return jsonify({'error': 'purchase_date must be YYYY-MM-DD'}), 400
+        bottle.purchase_date = purchase_date
+    name = data.get('name', MISSING)
+    if name is not MISSING:
+        bottle.name = name.strip()
+    category = data.get('category', MISSING)
+    if category is not MISSING:
+        bottle.category = category.lower()
+    abv = data.get('abv', MISSING)
+    if abv is not MISSING:
+        bottle.abv = float(abv) if abv else 0.0
+    price_paid = data.get('price_paid', MISSING)
+    if price_paid is not MISSING:
+        bottle.price_paid = float(price_paid) if price_paid else 0.0
+    notes = data.get('notes', MISSING)
+    if notes is not MISSING:
+        bottle.notes = notes
+    barcode = data.get('barcode', MISSING)
+    if barcode is not MISSING:
+        bottle.barcode = barcode
+    
+    if db.session.is_modified(bottle):
+        bottle.updated_at = datetime.utcnow()
+        db.session.commit()
     
     return jsonify(bottle.to_dict())
 
@@ -111,9 +200,22 @@ def update_bottle(id):
 @bp.route('/bottles/<int:id>', methods=['DELETE'])
 @login_required
 def delete_bottle(id):
-    """Delete a bottle."""
-    bottle = Bottle.query.filter_by(id=id, user_id=current_user.id).first_or_404()
-    db.session.delete(bottle)
+    """Delete a bottle.
+    
+    A single DELETE checks ownership and removes the row. Bottles that are
+    still on a schedule are kept, since schedule items need their bottle;
+    only a failed delete pays for a second query to tell 409 from 404.
+    """
+    scheduled = exists().where(ScheduleItem.bottle_id == Bottle.id)
+    result = db.session.execute(
+        delete(Bottle).where(Bottle.id == id, Bottle.user_id == current_user.id, ~scheduled)
+    )
+    if result.rowcount == 0:
+        db.session.rollback()
+        if db.session.query(Bottle.query.filter_by(id=id, user_id=current_user.id).exists()).scalar():
+            return jsonify({'error': 'Bottle is part of a schedule'}), 409
+        abort(404)
+    
     db.session.commit()
     return '', 204
 
@@ -125,8 +227,13 @@ def record_tasting(id):
     bottle = Bottle.query.filter_by(id=id, user_id=current_user.id).first_or_404()
     data = request.get_json() or {}
     
+    try:
+        tasting_date = parse_iso_date(data['tasting_date']) if data.get('tasting_date') else datetime.utcnow().date()
+    except (TypeError, ValueError):
+        return jsonify({'error': 'tasting_date must be YYYY-MM-DD'}), 400
+    
     bottle.tasted = True
-    bottle.tasting_date = datetime.strptime(data['tasting_date'], '%Y-%m-%d').date() if data.get('tasting_date') else datetime.utcnow().date()
+    bottle.tasting_date = tasting_date
     bottle.rating = float(data['rating']) if data.get('rating') else None
     bottle.tasting_notes = data.get('tasting_notes', '')
     
@@ -142,26 +249,29 @@ def record_tasting(id):
 @bp.route('/bottles/stats', methods=['GET'])
 @login_required
 def get_stats():
-    """Get collection statistics."""
-    total = Bottle.query.filter_by(user_id=current_user.id).count()
-    tasted = Bottle.query.filter_by(user_id=current_user.id, tasted=True).count()
-    untasted = total - tasted
+    """Get collection statistics.
     
-    # By category
-    from sqlalchemy import func
+    Everything comes from one grouped pass over the user's bottles: the
+    overall totals and the tasted-bottle average rating are summed up from
+    the per-category rows.
+    """
     category_stats = db.session.query(
         Bottle.category,
-        func.count(Bottle.id).label('count'),
-        func.sum(func.cast(Bottle.tasted, db.Integer)).label('tasted')
+        func.count(Bottle.id),
+        func.count(Bottle.id).filter(Bottle.tasted.is_(True)),
+        func.sum(Bottle.rating).filter(Bottle.tasted.is_(True)),
+        func.count(Bottle.rating).filter(Bottle.tasted.is_(True))
     ).filter_by(user_id=current_user.id).group_by(Bottle.category).all()
     
-    categories = {cat: {'total': count, 'tasted': tasted_count} 
-                  for cat, count, tasted_count in category_stats}
+    categories = {cat: {'total': count, 'tasted': tasted_count}
+                  for cat, count, tasted_count, _, _ in category_stats}
+    total = sum(row[1] for row in category_stats)
+    tasted = sum(row[2] for row in category_stats)
+    untasted = total - tasted
     
-    # Average rating
-    avg_rating = db.session.query(func.avg(Bottle.rating)).filter_by(
-        user_id=current_user.id, tasted=True
-    ).scalar() or 0
+    # Average rating of tasted bottles, ignoring unrated ones like AVG() does
+    rated = sum(row[4] for row in category_stats)
+    avg_rating = sum(row[3] or 0 for row in category_stats) / rated if rated else 0
     
     return jsonify({
         'total': total,
@@ -178,6 +288,13 @@ def allowed_file(filename):
            filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
 
 
+# Image types accepted as a raw PUT body, with the extension they are saved as
+PHOTO_CONTENT_TYPES = {'image/png': 'png', 'image/jpeg': 'jpg', 'image/gif': 'gif'}
+
+# Read size when copying a raw upload body to disk
+PHOTO_CHUNK_SIZE = 64 * 1024
+
+
 @bp.route('/bottles/<int:id>/photo', methods=['POST'])
 @login_required
 def upload_bottle_photo(id):
@@ -194,41 +311,101 @@ def upload_bottle_photo(id):
     if not allowed_file(file.filename):
         return jsonify({'error': 'Invalid file type. Allowed: PNG, JPG, JPEG, GIF'}), 400
     
-    # Create uploads directory if it doesn't exist
-    upload_folder = current_app.config['UPLOAD_FOLDER']
-    if isinstance(upload_folder, str):
-        upload_folder = os.path.abspath(upload_folder)
-    else:
-        upload_folder = str(upload_folder)
+    filename = secure_filename(file.filename)
+    return _store_bottle_photo(bottle, filename.rsplit('.', 1)[1].lower(), file.stream)
+
+
+@bp.route('/bottles/<int:id>/photo', methods=['PUT'])
+@login_required
+def put_bottle_photo(id):
+    """Upload a photo for a bottle as the raw request body.
     
-    os.makedirs(upload_folder, exist_ok=True)
+    The image type comes from the Content-Type header. The body is copied to
+    disk in chunks as it arrives, without the multipart parser's spooled
+    copy, which is cheaper for large photos.
+    """
+    bottle = Bottle.query.filter_by(id=id, user_id=current_user.id).first_or_404()
     
-    # Create user-specific subdirectory
+    file_ext = PHOTO_CONTENT_TYPES.get(request.mimetype)
+    if file_ext is None or file_ext not in current_app.config['ALLOWED_EXTENSIONS']:
+        return jsonify({'error': 'Invalid file type. Allowed: PNG, JPG, JPEG, GIF'}), 400
+    if not request.content_length:
+        return jsonify({'error': 'No file provided'}), 400
+    
+    return _store_bottle_photo(bottle, file_ext, request.stream)
+
+
+def _store_bottle_photo(bottle, file_ext, stream):
+    """Save a bottle's new photo, record its path and release the old one.
+    
+    Photos are stored per user under the hash of their content, so bottles
+    with the same image share one file. The file is renamed into place only
+    after the new path is committed, so it is restored even if a concurrent
+    release removed it before the commit. If the rename fails, the bottle is
+    pointed back at its old photo.
+    
+    Args:
+        bottle (Bottle): Bottle the photo belongs to.
+        file_ext (str): Extension to save the photo with.
+        stream: Binary stream the photo is read from.
+        
+    Returns:
+        Response: JSON with the new photo's path and URL.
+    """
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    
+    # Photos are kept in a subdirectory per user
     user_upload_dir = os.path.join(upload_folder, str(current_user.id))
-    os.makedirs(user_upload_dir, exist_ok=True)
     
-    # Generate unique filename
-    filename = secure_filename(file.filename)
-    file_ext = filename.rsplit('.', 1)[1].lower()
-    unique_filename = f"bottle_{bottle.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{file_ext}"
-    filepath = os.path.join(user_upload_dir, unique_filename)
-    
-    # Save file
-    file.save(filepath)
-    
-    # Delete old photo if exists
-    if bottle.photo_path:
-        old_path = os.path.join(upload_folder, bottle.photo_path)
-        if os.path.exists(old_path):
-            try:
-                os.remove(old_path)
-            except:
-                pass  # Ignore errors deleting old file
+    # Write to a temporary file, creating the directory only the first time it is missing
+    try:
+        tmp = tempfile.NamedTemporaryFile(dir=user_upload_dir, suffix='.part', delete=False)
+    except FileNotFoundError:
+        os.makedirs(user_upload_dir, exist_ok=True)
+        tmp = tempfile.NamedTemporaryFile(dir=user_upload_dir, suffix='.part', delete=False)
+    
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with tmp:
+            for chunk in iter(lambda: stream.read(PHOTO_CHUNK_SIZE), b''):
+                digest.update(chunk)
+                tmp.write(chunk)
+    except Exception:
+        # Don't leave a truncated file behind (e.g. a body over the size limit)
+        os.remove(tmp.name)
+        raise
+    
+    filename = f'{digest.hexdigest()}.{file_ext}'
+    filepath = os.path.join(user_upload_dir, filename)
     
     # Update bottle with new photo path (relative to upload folder)
-    bottle.photo_path = os.path.join(str(current_user.id), unique_filename)
-    bottle.updated_at = datetime.utcnow()
-    db.session.commit()
+    old_path = bottle.photo_path
+    new_path = os.path.join(str(current_user.id), filename)
+    changed = new_path != old_path
+    try:
+        if changed:
+            bottle.photo_path = new_path
+            bottle.updated_at = datetime.utcnow()
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        os.remove(tmp.name)
+        raise
+    
+    try:
+        os.replace(tmp.name, filepath)
+    except Exception:
+        os.remove(tmp.name)
+        # The new path is already committed, so point the bottle back at its
+        # old photo, which has not been released yet
+        if changed:
+            bottle.photo_path = old_path
+            bottle.updated_at = datetime.utcnow()
+            db.session.commit()
+        raise
+    
+    if old_path and changed:
+        _release_photo_file(old_path)
     
     return jsonify({
         'success': True,
@@ -246,21 +423,26 @@ def get_bottle_photo(id):
     if not bottle.photo_path:
         return jsonify({'error': 'No photo for this bottle'}), 404
     
+    # Behind Nginx, hand the file transfer to the internal location
+    accel_prefix = current_app.config.get('PHOTO_ACCEL_REDIRECT')
+    if accel_prefix:
+        response = current_app.response_class(status=200)
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{quote(bottle.photo_path)}"
+        response.content_type = mimetypes.guess_type(bottle.photo_path)[0] or 'application/octet-stream'
+        return response
+    
     upload_folder = current_app.config['UPLOAD_FOLDER']
-    if isinstance(upload_folder, str):
-        upload_folder = os.path.abspath(upload_folder)
-    else:
-        upload_folder = str(upload_folder)
     
     photo_path = os.path.join(upload_folder, bottle.photo_path)
     
-    if not os.path.exists(photo_path):
-        return jsonify({'error': 'Photo file not found'}), 404
-    
     directory = os.path.dirname(photo_path)
     filename = os.path.basename(photo_path)
     
-    return send_from_directory(directory, filename)
+    # send_from_directory checks the file exists as it opens it
+    try:
+        return send_from_directory(directory, filename)
+    except NotFound:
+        return jsonify({'error': 'Photo file not found'}), 404
 
 
 @bp.route('/bottles/<int:id>/photo', methods=['DELETE'])
@@ -272,23 +454,39 @@ def delete_bottle_photo(id):
     if not bottle.photo_path:
         return jsonify({'error': 'No photo to delete'}), 404
     
-    upload_folder = current_app.config['UPLOAD_FOLDER']
-    if isinstance(upload_folder, str):
-        upload_folder = os.path.abspath(upload_folder)
-    else:
-        upload_folder = str(upload_folder)
-    
-    photo_path = os.path.join(upload_folder, bottle.photo_path)
-    
-    if os.path.exists(photo_path):
-        try:
-            os.remove(photo_path)
-        except:
-            pass  # Ignore errors
-    
+    photo_path = bottle.photo_path
     bottle.photo_path = None
     bottle.updated_at = datetime.utcnow()
     db.session.commit()
     
+    _release_photo_file(photo_path)
+    
     return jsonify({'success': True})
 
+
+def _release_photo_file(photo_path):
+    """Delete a photo file once no bottle refers to it any more.
+    
+    Bottles with the same image share one file, so it is only removed when
+    the last of them lets it go.
+    
+    Args:
+        photo_path (str): Photo path relative to the upload folder.
+    """
+    if db.session.query(exists().where(Bottle.photo_path == photo_path)).scalar():
+        return
+    _remove_photo_file(os.path.join(current_app.config['UPLOAD_FOLDER'], photo_path))
+
+
+def _remove_photo_file(path):
+    """Delete a stored photo file, ignoring one that is already gone.
+    
+    Args:
+        path (str): Absolute path of the photo file.
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        current_app.logger.warning('Could not delete photo %s: %s', path, e)
@@ -4,24 +4,68 @@ Master Beverage Catalog API endpoints
 
 from flask import request, jsonify
 from app.api import bp
+from app.api.utils import encode_static_json, fetch_with_total, static_json_response
 from app.models import MasterBeverage, db
 from flask_login import login_required, current_user
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, insert, tuple_
 import json
 import csv
 import io
 
+# Names per existence query when deduplicating imports, well under the bound
+# parameter limits of SQLite and Postgres
+_CATALOG_LOOKUP_BATCH = 500
+
+# Rows inserted and committed together by an import, keeping each
+# transaction small on large files
+_IMPORT_BATCH = 1000
+
+# Row errors listed in an import response; the rest are only counted
+_IMPORT_MAX_ERRORS = 100
+
+# Import column names (lowercased) mapped to the catalog field they fill
+_CSV_FIELD_ALIASES = {
+    'name': 'name', 'product_name': 'name', 'beverage_name': 'name',
+    'brand': 'brand', 'brand_name': 'brand', 'manufacturer': 'brand',
+    'category': 'category', 'type': 'category', 'spirit_type': 'category',
+    'subcategory': 'subcategory',
+    'abv': 'abv', 'alcohol': 'abv', 'alcohol_content': 'abv',
+    'region': 'region', 'origin_region': 'region',
+    'country': 'country', 'origin_country': 'country',
+    'description': 'description', 'desc': 'description', 'notes': 'description',
+    'tasting_notes': 'tasting_notes', 'tasting': 'tasting_notes',
+    'image_url': 'image_url', 'image': 'image_url', 'photo': 'image_url',
+    'external_id': 'external_id',
+    'source': 'source',
+    'verified': 'verified',
+}
+
+# JSON keys are also matched with underscores and spaces removed
+_JSON_FIELD_ALIASES = {alias.replace('_', ''): field for alias, field in _CSV_FIELD_ALIASES.items()}
+
+# Encoded category and brand list responses, as (list, (body, etag)). A body
+# is reused while the model still serves the very list it was encoded from.
+_catalog_list_bodies = {}
+
 
 @bp.route('/catalog/search', methods=['GET'])
 @login_required
 def search_catalog():
-    """Search the master beverage catalog."""
+    """Search the master beverage catalog.
+
+    Pages may be addressed by offset, or by a keyset cursor (after_name and
+    after_id, taken from next_cursor) so deep pages are an index range scan.
+    An unfiltered browse reads its total from the cached catalog size
+    instead of counting the table on every page.
+    """
 
     query = request.args.get('q', '').strip()
     category = request.args.get('category', '').strip()
     brand = request.args.get('brand', '').strip()
     limit = int(request.args.get('limit', 50))
     offset = int(request.args.get('offset', 0))
+    after_name = request.args.get('after_name')
+    after_id = request.args.get('after_id', type=int)
 
     # Build the query
     q = MasterBeverage.query
@@ -41,47 +85,86 @@ def search_catalog():
     if brand:
         q = q.filter(MasterBeverage.brand.ilike(f'%{brand}%'))
 
-    # Order by name
-    q = q.order_by(MasterBeverage.name)
+    browsing = not (query or category or brand)
+    keyset = after_name is not None and after_id is not None
 
-    # Get total count
-    total = q.count()
+    if keyset:
+        q = q.filter(tuple_(MasterBeverage.name, MasterBeverage.id) > (after_name, after_id))
+        offset = 0
 
-    # Apply pagination
-    beverages = q.offset(offset).limit(limit).all()
+    # Order by name, with id as the tiebreak the cursor relies on
+    q = q.order_by(MasterBeverage.name, MasterBeverage.id)
 
-    return jsonify({
+    if browsing:
+        beverages = q.offset(offset).limit(limit + 1).all()
+        total = MasterBeverage.total_count()
+    elif keyset:
+        beverages = q.limit(limit + 1).all()
+        total = None
+    else:
+        # Fetch the page and the total count in one query
+        beverages, total = fetch_with_total(q, offset, limit + 1)
+
+    # The extra row only tells whether a next page exists
+    has_next = len(beverages) > limit
+    beverages = beverages[:limit]
+    next_cursor = None
+    if has_next and beverages:
+        next_cursor = {'after_name': beverages[-1].name, 'after_id': beverages[-1].id}
+
+    body = {
         'beverages': [b.to_dict() for b in beverages],
-        'total': total,
         'limit': limit,
-        'offset': offset
-    })
+        'offset': offset,
+        'next_cursor': next_cursor
+    }
+    if total is not None:
+        body['total'] = total
+    return jsonify(body)
 
 
 @bp.route('/catalog/categories', methods=['GET'])
 @login_required
 def get_catalog_categories():
-    """Get all unique categories in the catalog."""
-
-    categories = db.session.query(MasterBeverage.category).distinct().order_by(MasterBeverage.category).all()
+    """Get all unique categories in the catalog.
 
-    return jsonify({
-        'categories': [cat[0] for cat in categories]
-    })
+    The list is cached in memory, and clients revalidate it by ETag.
+    """
+    return static_json_response(
+        _encoded_catalog_list('categories', MasterBeverage.distinct_categories()), max_age=0
+    )
 
 
 @bp.route('/catalog/brands', methods=['GET'])
 @login_required
 def get_catalog_brands():
-    """Get all unique brands in the catalog."""
+    """Get all unique brands in the catalog.
 
-    brands = db.session.query(MasterBeverage.brand).distinct().filter(
-        MasterBeverage.brand.isnot(None)
-    ).order_by(MasterBeverage.brand).all()
+    The list is cached in memory, and clients revalidate it by ETag.
+    """
+    return static_json_response(
+        _encoded_catalog_list('brands', MasterBeverage.distinct_brands()), max_age=0
+    )
 
-    return jsonify({
-        'brands': [brand[0] for brand in brands if brand[0]]
-    })
+
+def _encoded_catalog_list(field, values):
+    """Encode a cached catalog list once, rather than on every request.
+
+    The model returns the same list object until its cache is refreshed, so
+    a new object means the list changed and is encoded again.
+
+    Args:
+        field (str): Response key for the list.
+        values (list): The list from the model's cache.
+
+    Returns:
+        tuple: (body bytes, ETag) for static_json_response().
+    """
+    cached = _catalog_list_bodies.get(field)
+    if cached is None or cached[0] is not values:
+        cached = (values, encode_static_json({field: values}))
+        _catalog_list_bodies[field] = cached
+    return cached[1]
 
 
 @bp.route('/catalog/<int:id>', methods=['GET'])
@@ -244,20 +327,7 @@ def populate_sample_catalog():
         }
     ]
 
-    added_count = 0
-    for bev_data in sample_beverages:
-        # Check if it already exists
-        existing = MasterBeverage.query.filter_by(
-            name=bev_data['name'],
-            brand=bev_data['brand']
-        ).first()
-
-        if not existing:
-            beverage = MasterBeverage(**bev_data)
-            db.session.add(beverage)
-            added_count += 1
-
-    db.session.commit()
+    added_count = _insert_catalog_batch(sample_beverages)
 
     return jsonify({
         'message': f'Added {added_count} sample beverages to catalog',
@@ -288,6 +358,7 @@ def import_catalog():
         else:
             return jsonify({'error': 'Unsupported file format. Use CSV or JSON.'}), 400
 
+    imported_count = 0
     try:
         if format_type == 'csv':
             beverages_data = _parse_csv_import(file)
@@ -296,50 +367,45 @@ def import_catalog():
         else:
             return jsonify({'error': 'Unsupported format'}), 400
 
-        # Validate and import
-        imported_count = 0
+        # Validate, deduplicate and insert a batch at a time, so memory holds
+        # one batch of rows rather than the whole file
+        batch = []
         errors = []
+        error_count = 0
 
         for i, bev_data in enumerate(beverages_data):
             try:
                 # Validate required fields
                 if not bev_data.get('name'):
-                    errors.append(f'Row {i+1}: Missing name')
-                    continue
-
-                # Check if it already exists
-                existing = MasterBeverage.query.filter_by(
-                    name=bev_data['name'],
-                    brand=bev_data.get('brand')
-                ).first()
-
-                if existing:
-                    continue  # Skip duplicates
-
-                # Create new beverage
-                beverage = MasterBeverage(
-                    name=bev_data['name'].strip(),
-                    brand=bev_data.get('brand', '').strip() or None,
-                    category=bev_data.get('category', 'other'),
-                    subcategory=bev_data.get('subcategory', '').strip() or None,
-                    abv=float(bev_data['abv']) if bev_data.get('abv') else None,
-                    region=bev_data.get('region', '').strip() or None,
-                    country=bev_data.get('country', '').strip() or None,
-                    description=bev_data.get('description', '').strip() or None,
-                    tasting_notes=bev_data.get('tasting_notes', '').strip() or None,
-                    image_url=bev_data.get('image_url', '').strip() or None,
-                    external_id=bev_data.get('external_id', '').strip() or None,
-                    source=bev_data.get('source', 'imported'),
-                    verified=bev_data.get('verified', False)
-                )
-
-                db.session.add(beverage)
-                imported_count += 1
+                    raise ValueError('Missing name')
+
+                batch.append({
+                    'name': bev_data['name'].strip(),
+                    'brand': (bev_data.get('brand') or '').strip() or None,
+                    'category': bev_data.get('category', 'other'),
+                    'subcategory': (bev_data.get('subcategory') or '').strip() or None,
+                    'abv': float(bev_data['abv']) if bev_data.get('abv') else None,
+                    'region': (bev_data.get('region') or '').strip() or None,
+                    'country': (bev_data.get('country') or '').strip() or None,
+                    'description': (bev_data.get('description') or '').strip() or None,
+                    'tasting_notes': (bev_data.get('tasting_notes') or '').strip() or None,
+                    'image_url': (bev_data.get('image_url') or '').strip() or None,
+                    'external_id': (bev_data.get('external_id') or '').strip() or None,
+                    'source': bev_data.get('source', 'imported'),
+                    'verified': bev_data.get('verified', False)
+                })
 
             except Exception as e:
-                errors.append(f'Row {i+1}: {str(e)}')
+                error_count += 1
+                if len(errors) < _IMPORT_MAX_ERRORS:
+                    errors.append(f'Row {i+1}: {str(e)}')
+
+            if len(batch) >= _IMPORT_BATCH:
+                imported_count += _insert_catalog_batch(batch)
+                batch = []
 
-        db.session.commit()
+        if batch:
+            imported_count += _insert_catalog_batch(batch)
 
         result = {
             'message': f'Successfully imported {imported_count} beverages',
@@ -348,66 +414,112 @@ def import_catalog():
 
         if errors:
             result['errors'] = errors
-            result['message'] += f', {len(errors)} errors'
+            result['error_count'] = error_count
+            result['message'] += f', {error_count} errors'
 
         return jsonify(result), 200 if not errors else 207  # 207 = Multi-Status
 
     except Exception as e:
-        return jsonify({'error': f'Import failed: {str(e)}'}), 500
+        # Batches committed before the failure stay imported; a retry skips them
+        db.session.rollback()
+        return jsonify({'error': f'Import failed: {str(e)}', 'imported': imported_count}), 500
+
+
+def _insert_catalog_batch(rows):
+    """Insert the rows not already in the catalog and commit them.
+
+    Batches committed earlier in the same import are in the catalog by the
+    time the next batch is checked, so a row repeated across batches is
+    still only inserted once.
+
+    Args:
+        rows (list): Beverage column dicts.
+
+    Returns:
+        int: Number of rows inserted.
+    """
+    new_rows = _new_catalog_rows(rows)
+    if new_rows:
+        db.session.execute(insert(MasterBeverage), new_rows)
+    db.session.commit()
+    return len(new_rows)
+
+
+def _new_catalog_rows(rows):
+    """Drop rows whose name and brand are already in the catalog.
+
+    Existing entries are looked up with one query per batch of names rather
+    than one per row, and a name/brand repeated within rows is kept once.
+    Brands are compared as stored, so a missing brand matches NULL.
+
+    Args:
+        rows (list): Beverage column dicts with 'name' and 'brand'.
+
+    Returns:
+        list: The rows to insert, in their original order.
+    """
+    names = list({row['name'] for row in rows})
+    seen = set()
+    for start in range(0, len(names), _CATALOG_LOOKUP_BATCH):
+        batch = names[start:start + _CATALOG_LOOKUP_BATCH]
+        seen.update(db.session.query(MasterBeverage.name, MasterBeverage.brand)
+                    .filter(MasterBeverage.name.in_(batch)).all())
+
+    new_rows = []
+    for row in rows:
+        key = (row['name'], row['brand'])
+        if key not in seen:
+            seen.add(key)
+            new_rows.append(row)
+    return new_rows
 
 
 def _parse_csv_import(file):
-    """Parse CSV file for beverage import."""
-    content = file.read().decode('utf-8')
-    reader = csv.DictReader(io.StringIO(content))
+    """Parse CSV file for beverage import.
+
+    The upload is decoded as the reader consumes it, and beverages are
+    yielded one row at a time, so the file is never held in memory whole.
+    """
+    # Rows are read as plain lists; building a dict per row, as DictReader
+    # does, is wasted work when only the mapped columns are used
+    reader = csv.reader(io.TextIOWrapper(file.stream, encoding='utf-8', newline=''))
+    header = next(reader, [])
+
+    # Map catalog fields to column positions once, not for every row. A field
+    # named by several columns takes the last of them.
+    positions = {}
+    for index, column in enumerate(header):
+        field = _CSV_FIELD_ALIASES.get(column.lower().strip())
+        if field:
+            positions[field] = index
+    columns = list(positions.items())
 
-    beverages = []
     for row in reader:
         # Clean up the data
         beverage = {}
-        for key, value in row.items():
-            key = key.lower().strip()
+        for field, index in columns:
+            value = row[index] if index < len(row) else None
             value = value.strip() if value else None
 
-            # Map common column names
-            if key in ['name', 'product_name', 'beverage_name']:
-                beverage['name'] = value
-            elif key in ['brand', 'brand_name', 'manufacturer']:
-                beverage['brand'] = value
-            elif key in ['category', 'type', 'spirit_type']:
-                beverage['category'] = value
-            elif key == 'subcategory':
-                beverage['subcategory'] = value
-            elif key in ['abv', 'alcohol', 'alcohol_content']:
+            if field == 'abv':
                 try:
-                    beverage['abv'] = float(value) if value else None
+                    value = float(value) if value else None
                 except ValueError:
-                    beverage['abv'] = None
-            elif key in ['region', 'origin_region']:
-                beverage['region'] = value
-            elif key in ['country', 'origin_country']:
-                beverage['country'] = value
-            elif key in ['description', 'desc', 'notes']:
-                beverage['description'] = value
-            elif key in ['tasting_notes', 'tasting']:
-                beverage['tasting_notes'] = value
-            elif key in ['image_url', 'image', 'photo']:
-                beverage['image_url'] = value
-            elif key == 'external_id':
-                beverage['external_id'] = value
-            elif key == 'source':
-                beverage['source'] = value
-            elif key == 'verified':
-                beverage['verified'] = value.lower() in ['true', '1', 'yes'] if value else False
+                    value = None
+            elif field == 'verified':
+                value = value.lower() in ['true', '1', 'yes'] if value else False
+            beverage[field] = value
 
         if beverage.get('name'):  # Only add if name exists
-            beverages.append(beverage)
-
-    return beverages
+            yield beverage
 
 
 def _parse_json_import(file):
-    """Parse JSON file for beverage import."""
+    """Parse JSON file for beverage import.
+
+    The document is parsed whole, but beverages are normalized and yielded
+    one at a time rather than copied into a second list.
+    """
     content = file.read().decode('utf-8')
     data = json.loads(content)
 
@@ -422,39 +534,12 @@ def _parse_json_import(file):
         beverages = [data]
 
     # Normalize field names
-    normalized_beverages = []
     for bev in beverages:
         normalized = {}
         for key, value in bev.items():
-            key = key.lower().replace('_', '').replace(' ', '')
-            if key in ['name', 'productname', 'beveragename']:
-                normalized['name'] = value
-            elif key in ['brand', 'brandname', 'manufacturer']:
-                normalized['brand'] = value
-            elif key in ['category', 'type', 'spirittype']:
-                normalized['category'] = value
-            elif key == 'subcategory':
-                normalized['subcategory'] = value
-            elif key in ['abv', 'alcohol', 'alcoholcontent']:
-                normalized['abv'] = value
-            elif key in ['region', 'originregion']:
-                normalized['region'] = value
-            elif key in ['country', 'origincountry']:
-                normalized['country'] = value
-            elif key in ['description', 'desc', 'notes']:
-                normalized['description'] = value
-            elif key in ['tastingnotes', 'tasting']:
-                normalized['tasting_notes'] = value
-            elif key in ['imageurl', 'image', 'photo']:
-                normalized['image_url'] = value
-            elif key == 'externalid':
-                normalized['external_id'] = value
-            elif key == 'source':
-                normalized['source'] = value
-            elif key == 'verified':
-                normalized['verified'] = value
+            field = _JSON_FIELD_ALIASES.get(key.lower().replace('_', '').replace(' ', ''))
+            if field:
+                normalized[field] = value
 
         if normalized.get('name'):
-            normalized_beverages.append(normalized)
-
-    return normalized_beverages
+            yield normalized
@@ -6,9 +6,11 @@ Part of ENH-015: Catalog Management & Administration
 from flask import request, jsonify
 from flask_login import login_required, current_user
 from app.api import bp
+from app.api.utils import csv_stream_response, json_stream_response
 from app.models import MasterBeverage, db
 from sqlalchemy import func, or_, and_
 from functools import wraps
+from datetime import datetime
 
 
 def admin_required_api(f):
@@ -25,30 +27,39 @@ def admin_required_api(f):
 @bp.route('/admin/catalog/duplicates', methods=['GET'])
 @admin_required_api
 def find_duplicates():
-    """Find duplicate catalog entries based on name and brand."""
+    """Find duplicate catalog entries based on name and brand.
+    
+    The entries of every duplicate group are fetched in one query, joined
+    to the duplicated (name, brand) pairs, and grouped here.
+    """
     
     # Group by name and brand, find duplicates (database-agnostic)
-    duplicates_query = db.session.query(
+    duplicate_keys = db.session.query(
         MasterBeverage.name,
-        MasterBeverage.brand,
-        func.count(MasterBeverage.id).label('count')
+        MasterBeverage.brand
     ).group_by(
         MasterBeverage.name,
         MasterBeverage.brand
     ).having(
         func.count(MasterBeverage.id) > 1
-    ).all()
-    
-    duplicates = []
-    for name, brand, count in duplicates_query:
-        # Get all entries with this name and brand
-        entries = MasterBeverage.query.filter_by(name=name, brand=brand).all()
-        duplicates.append({
-            'name': name,
-            'brand': brand,
-            'count': count,
-            'entries': [e.to_dict() for e in entries]
-        })
+    ).subquery()
+    
+    # A NULL brand groups with other NULL brands, so match it the same way
+    entries = MasterBeverage.query.join(duplicate_keys, and_(
+        MasterBeverage.name == duplicate_keys.c.name,
+        MasterBeverage.brand.is_not_distinct_from(duplicate_keys.c.brand)
+    )).order_by(MasterBeverage.name, MasterBeverage.brand, MasterBeverage.id).all()
+    
+    groups = {}
+    for entry in entries:
+        groups.setdefault((entry.name, entry.brand), []).append(entry)
+    
+    duplicates = [{
+        'name': name,
+        'brand': brand,
+        'count': len(group),
+        'entries': [e.to_dict() for e in group]
+    } for (name, brand), group in groups.items()]
     
     return jsonify({
         'duplicates': duplicates,
@@ -150,47 +161,33 @@ def export_catalog():
     
     format_type = request.args.get('format', 'json').lower()
     
-    all_beverages = MasterBeverage.query.order_by(MasterBeverage.name).all()
+    beverages = MasterBeverage.query.order_by(MasterBeverage.name)
     
     if format_type == 'csv':
-        import csv
-        import io
-        from flask import Response
+        rows = ({
+            'id': bev.id,
+            'name': bev.name,
+            'brand': bev.brand or '',
+            'category': bev.category,
+            'subcategory': bev.subcategory or '',
+            'abv': bev.abv or '',
+            'region': bev.region or '',
+            'country': bev.country or '',
+            'description': bev.description or '',
+            'source': bev.source or '',
+            'verified': bev.verified
+        } for bev in beverages.yield_per(1000))
         
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=[
+        return csv_stream_response([
             'id', 'name', 'brand', 'category', 'subcategory', 'abv',
             'region', 'country', 'description', 'source', 'verified'
-        ])
-        writer.writeheader()
-        
-        for bev in all_beverages:
-            writer.writerow({
-                'id': bev.id,
-                'name': bev.name,
-                'brand': bev.brand or '',
-                'category': bev.category,
-                'subcategory': bev.subcategory or '',
-                'abv': bev.abv or '',
-                'region': bev.region or '',
-                'country': bev.country or '',
-                'description': bev.description or '',
-                'source': bev.source or '',
-                'verified': bev.verified
-            })
-        
-        return Response(
-            output.getvalue(),
-            mimetype='text/csv',
-            headers={'Content-Disposition': 'attachment; filename=catalog_export.csv'}
-        )
+        ], rows, 'catalog_export.csv')
     else:
         # JSON export
-        return jsonify({
-            'export_date': db.session.execute(db.text('SELECT NOW()')).scalar().isoformat(),
-            'total_entries': len(all_beverages),
-            'beverages': [b.to_dict() for b in all_beverages]
-        })
+        return json_stream_response(
+            {'export_date': datetime.utcnow().isoformat()}, 'beverages',
+            (b.to_dict() for b in beverages.yield_per(1000)), 'total_entries'
+        )
 
 
 @bp.route('/admin/catalog/bulk-verify', methods=['POST'])
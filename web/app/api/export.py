@@ -4,13 +4,15 @@ Export/Import API endpoints
 
 from flask import request, jsonify, send_file, Response
 from app.api import bp
+from app.api.utils import csv_stream_response, json_stream_response
 from app.models import Bottle, Schedule, ScheduleItem
 from app import db
 from flask_login import login_required, current_user
 from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
 import json
 import csv
-import io
 import sys
 import os
 
@@ -153,55 +155,35 @@ def export_bottles():
     """Export bottles to CSV or JSON."""
     format_type = request.args.get('format', 'json').lower()
     
-    bottles = Bottle.query.filter_by(user_id=current_user.id).order_by(Bottle.name).all()
+    bottles = Bottle.query.filter_by(user_id=current_user.id).order_by(Bottle.name)
     
     if format_type == 'csv':
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=[
+        rows = ({
+            'name': bottle.name,
+            'category': bottle.category,
+            'abv': bottle.abv or '',
+            'price_paid': bottle.price_paid or '',
+            'purchase_date': bottle.purchase_date.isoformat() if bottle.purchase_date else '',
+            'opened_date': bottle.opened_date.isoformat() if bottle.opened_date else '',
+            'notes': bottle.notes or '',
+            'barcode': bottle.barcode or '',
+            'tasted': 'true' if bottle.tasted else 'false',
+            'tasting_date': bottle.tasting_date.isoformat() if bottle.tasting_date else '',
+            'rating': bottle.rating or '',
+            'tasting_notes': bottle.tasting_notes or ''
+        } for bottle in bottles.yield_per(1000))
+        
+        return csv_stream_response([
             'name', 'category', 'abv', 'price_paid', 'purchase_date', 
             'opened_date', 'notes', 'barcode', 'tasted', 'tasting_date', 
             'rating', 'tasting_notes'
-        ])
-        writer.writeheader()
-        
-        for bottle in bottles:
-            writer.writerow({
-                'name': bottle.name,
-                'category': bottle.category,
-                'abv': bottle.abv or '',
-                'price_paid': bottle.price_paid or '',
-                'purchase_date': bottle.purchase_date.isoformat() if bottle.purchase_date else '',
-                'opened_date': bottle.opened_date.isoformat() if bottle.opened_date else '',
-                'notes': bottle.notes or '',
-                'barcode': bottle.barcode or '',
-                'tasted': 'true' if bottle.tasted else 'false',
-                'tasting_date': bottle.tasting_date.isoformat() if bottle.tasting_date else '',
-                'rating': bottle.rating or '',
-                'tasting_notes': bottle.tasting_notes or ''
-            })
-        
-        output.seek(0)
-        return Response(
-            output.getvalue(),
-            mimetype='text/csv',
-            headers={'Content-Disposition': f'attachment; filename=dram-planner-collection-{datetime.now().strftime("%Y%m%d")}.csv'}
-        )
+        ], rows, f'dram-planner-collection-{datetime.now().strftime("%Y%m%d")}.csv')
     
     else:  # JSON
-        bottles_data = {
-            'bottles': [bottle.to_dict() for bottle in bottles],
-            'exported_at': datetime.utcnow().isoformat(),
-            'total': len(bottles)
-        }
-        
-        output = io.StringIO()
-        json.dump(bottles_data, output, indent=2, default=str)
-        output.seek(0)
-        
-        return Response(
-            output.getvalue(),
-            mimetype='application/json',
-            headers={'Content-Disposition': f'attachment; filename=dram-planner-collection-{datetime.now().strftime("%Y%m%d")}.json'}
+        return json_stream_response(
+            {'exported_at': datetime.utcnow().isoformat()}, 'bottles',
+            (bottle.to_dict() for bottle in bottles.yield_per(1000)), 'total', indent=2,
+            filename=f'dram-planner-collection-{datetime.now().strftime("%Y%m%d")}.json'
         )
 
 
@@ -222,8 +204,9 @@ def export_schedule_ical(schedule_id):
         'X-WR-TIMEZONE:UTC',
     ]
     
-    # Add each schedule item as an event
-    for item in schedule.items.order_by(ScheduleItem.date):
+    # Add each schedule item as an event, loading the bottles in the same query
+    items = schedule.items.options(joinedload(ScheduleItem.bottle, innerjoin=True)).order_by(ScheduleItem.date)
+    for item in items:
         if item.bottle:
             summary = f"Taste: {item.bottle.name}"
             description = f"Category: {item.bottle.category}"
@@ -319,32 +302,34 @@ def import_bottles():
                 'warnings': warnings
             }), 400
         
-        imported_count = 0
+        # One lookup for the names already in the collection; names repeated
+        # in the file are skipped after their first row as well
+        seen_names = {name for (name,) in db.session.query(Bottle.name).filter(
+            Bottle.user_id == current_user.id
+        )}
+        
+        rows = []
         for bottle_data in bottles:
-            # Check if bottle already exists (by name)
-            existing = Bottle.query.filter_by(
-                user_id=current_user.id,
-                name=bottle_data['name']
-            ).first()
-            
-            if existing:
+            if bottle_data['name'] in seen_names:
                 continue  # Skip duplicates
+            seen_names.add(bottle_data['name'])
             
-            bottle = Bottle(
-                user_id=current_user.id,
-                name=bottle_data['name'],
-                category=bottle_data.get('category', 'other').lower(),
-                abv=float(bottle_data.get('abv', 0)) if bottle_data.get('abv') else 0.0,
-                price_paid=float(bottle_data.get('price_paid', 0)) if bottle_data.get('price_paid') else 0.0,
-                purchase_date=datetime.strptime(bottle_data['purchase_date'], '%Y-%m-%d').date() if bottle_data.get('purchase_date') else None,
-                notes=bottle_data.get('notes', ''),
-                barcode=bottle_data.get('barcode', '')
-            )
-            
-            db.session.add(bottle)
-            imported_count += 1
+            rows.append({
+                'user_id': current_user.id,
+                'name': bottle_data['name'],
+                'category': bottle_data.get('category', 'other').lower(),
+                'abv': float(bottle_data.get('abv', 0)) if bottle_data.get('abv') else 0.0,
+                'price_paid': float(bottle_data.get('price_paid', 0)) if bottle_data.get('price_paid') else 0.0,
+                'purchase_date': datetime.strptime(bottle_data['purchase_date'], '%Y-%m-%d').date() if bottle_data.get('purchase_date') else None,
+                'notes': bottle_data.get('notes', ''),
+                'barcode': bottle_data.get('barcode', '')
+            })
         
+        # A single executemany, batched into multi-row INSERTs by SQLAlchemy
+        if rows:
+            db.session.execute(insert(Bottle), rows)
         db.session.commit()
+        imported_count = len(rows)
         
         return jsonify({
             'success': True,
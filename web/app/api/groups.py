@@ -4,20 +4,13 @@ Groups API endpoints for Dram Planner Web
 
 from flask import request, jsonify
 from app.api import bp
+from app.api.utils import import_cli_module
 from app.models import UserGroup, GroupMembership, GroupSchedule, GroupScheduleItem, User, Bottle, MasterBeverage, db
 from flask_login import login_required, current_user
 from datetime import datetime
-import sys
-import os
-
-# Add parent directory to path to import CLI modules
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
 
 # Try to import schedule generator
-try:
-    import schedule_generator
-except ImportError:
-    schedule_generator = None
+schedule_generator = import_cli_module('schedule_generator')
 
 
 @bp.route('/groups', methods=['GET'])
@@ -4,21 +4,14 @@ Schedules API endpoints
 
 from flask import request, jsonify
 from app.api import bp
+from app.api.utils import import_cli_module
 from app.models import Schedule, ScheduleItem, Bottle
 from app import db
 from flask_login import login_required, current_user
 from datetime import datetime, timedelta
-import sys
-import os
 
-# Add parent directory to path to import CLI modules
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
-try:
-    import schedule_generator
-    import config as cli_config
-except ImportError:
-    schedule_generator = None
-    cli_config = None
+schedule_generator = import_cli_module('schedule_generator')
+cli_config = import_cli_module('config')
 
 
 @bp.route('/schedules', methods=['GET'])
@@ -0,0 +1,259 @@
+"""
+Shared helpers for the API route modules
+"""
+
+import csv
+import hashlib
+import importlib
+import json
+import os
+import sys
+import textwrap
+
+from flask import current_app, jsonify, request, stream_with_context
+from sqlalchemy import func
+
+# Default for data.get() in update handlers, so each optional field is looked
+# up once and an explicit null is still told apart from an absent key
+MISSING = object()
+
+# Page size for cursor-paged listings when per_page is missing or not
+# positive, and the most rows one page may hold
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+# Rows written to the response together by the streaming export responses
+EXPORT_STREAM_BATCH = 500
+
+# Route modules use the CLI modules (schedule_generator, barcode_lookup),
+# through import_cli_module(), and the shared date_utils helpers from the
+# repository root. Put it on the import path once, here, instead of in each
+# route module.
+_CLI_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+if _CLI_DIR not in sys.path:
+    sys.path.insert(0, _CLI_DIR)
+
+
+def import_cli_module(name):
+    """Import a CLI module from the repository root.
+    
+    Args:
+        name (str): Module name.
+        
+    Returns:
+        module: The module, or None if it cannot be imported.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def clamp_per_page(per_page):
+    """Bound a requested page size for a cursor-paged listing.
+    
+    Args:
+        per_page (int): Requested rows per page.
+        
+    Returns:
+        int: DEFAULT_PER_PAGE for a non-positive size, else at most MAX_PER_PAGE.
+    """
+    if per_page <= 0:
+        return DEFAULT_PER_PAGE
+    return min(per_page, MAX_PER_PAGE)
+
+
+def paginate_without_count(query, page, per_page):
+    """Fetch one page of an ordered query without counting the full result.
+    
+    One extra row is fetched to tell whether another page follows, which
+    replaces the COUNT(*) over the filtered set that paginate() runs.
+    
+    Page numbers and sizes are clamped as paginate(error_out=False) does.
+    
+    Args:
+        query: Ordered query to page through.
+        page (int): 1-based page number.
+        per_page (int): Rows per page; non-positive sizes use DEFAULT_PER_PAGE.
+        
+    Returns:
+        tuple: (items, has_next)
+    """
+    page = max(page, 1)
+    if per_page <= 0:
+        per_page = DEFAULT_PER_PAGE
+    rows = query.limit(per_page + 1).offset((page - 1) * per_page).all()
+    return rows[:per_page], len(rows) > per_page
+
+
+def fetch_with_total(query, offset, limit):
+    """Fetch a slice of an ordered query along with the full result count.
+    
+    The count is read from COUNT(*) OVER () on the returned rows, so rows
+    and total come from one query instead of a COUNT(*) followed by the
+    page. Only a slice past the end, which has no rows to carry the count,
+    runs a separate COUNT.
+    
+    Args:
+        query: Ordered query to slice.
+        offset (int): Rows to skip.
+        limit (int): Maximum rows to return.
+        
+    Returns:
+        tuple: (items, total). Items are entities for a single-entity query,
+            otherwise rows with an extra total_rows column.
+    """
+    rows = query.add_columns(func.count().over().label('total_rows')).offset(offset).limit(limit).all()
+    if not rows:
+        return [], (query.order_by(None).count() if offset > 0 else 0)
+    
+    items = [row[0] for row in rows] if len(query.column_descriptions) == 1 else rows
+    return items, rows[0].total_rows
+
+
+def encode_static_json(payload):
+    """Encode a payload that never changes once, for static_json_response().
+    
+    The body matches jsonify()'s compact output (sorted keys, trailing
+    newline).
+    
+    Args:
+        payload: JSON-serializable value.
+        
+    Returns:
+        tuple: (body bytes, ETag for the body)
+    """
+    body = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode() + b'\n'
+    return body, hashlib.sha1(body).hexdigest()
+
+
+def static_json_response(encoded, max_age=86400):
+    """Serve a body from encode_static_json() with an ETag and Cache-Control.
+    
+    Clients may reuse the response for max_age seconds and revalidate it
+    afterwards with If-None-Match, which is answered with 304 Not Modified.
+    The responses are marked private because these routes require a login.
+    
+    Args:
+        encoded (tuple): (body, etag) from encode_static_json().
+        max_age (int): Seconds clients may reuse the response.
+        
+    Returns:
+        Response: 200 with the body, or 304 when the client's copy is current.
+    """
+    body, etag = encoded
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    return response.make_conditional(request)
+
+
+def json_or_not_modified(etag, make_payload):
+    """Serve per-user JSON with a weak ETag, or 304 if the client's copy matches.
+    
+    make_payload is only called when the client's copy is stale, so a
+    revalidation skips building and encoding the body. Responses are private
+    and must be revalidated on every use.
+    
+    Args:
+        etag (str): Weak ETag value (unquoted) for the current representation.
+        make_payload (callable): Returns the JSON-serializable body.
+        
+    Returns:
+        Response: 200 with the body, or 304 Not Modified.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(make_payload())
+    response.set_etag(etag, weak=True)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+class _CSVLine:
+    """File-like target for csv writers that returns each line instead of storing it."""
+    
+    def write(self, line):
+        return line
+
+
+def csv_stream_response(fieldnames, rows, filename):
+    """Stream rows as a CSV attachment instead of building the file in memory.
+    
+    rows is consumed lazily while the response is sent, within the request
+    context, so it can be a query iterated with yield_per(). Lines are sent
+    in batches of EXPORT_STREAM_BATCH rows.
+    
+    Args:
+        fieldnames (list): Column names, written as the header row.
+        rows (iterable): Dicts keyed by fieldnames.
+        filename (str): Download name for the Content-Disposition header.
+        
+    Returns:
+        Response: Streaming text/csv response.
+    """
+    def generate():
+        writer = csv.DictWriter(_CSVLine(), fieldnames=fieldnames)
+        lines = [writer.writeheader()]
+        for row in rows:
+            lines.append(writer.writerow(row))
+            if len(lines) >= EXPORT_STREAM_BATCH:
+                yield ''.join(lines)
+                lines = []
+        yield ''.join(lines)
+    
+    return current_app.response_class(
+        stream_with_context(generate()),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+def json_stream_response(fields, key, items, count_key, indent=None, filename=None):
+    """Stream a JSON object whose list member is encoded one item at a time.
+    
+    The object holds fields, then items as a list under key, then the number
+    of items under count_key, written once the list is done. items is
+    consumed lazily within the request context, like csv_stream_response(),
+    so the full list is never held in memory.
+    
+    Args:
+        fields (dict): Members written before the list.
+        key (str): Name of the list member.
+        items (iterable): JSON-serializable dicts for the list.
+        count_key (str): Name of the item count member.
+        indent (int): Pretty-print indent, or None for compact output.
+        filename (str): Download name, sent as an attachment when given.
+        
+    Returns:
+        Response: Streaming application/json response.
+    """
+    nl, pad = ('\n', ' ' * indent) if indent else ('', '')
+    sep = ': ' if indent else ':'
+    
+    def member(name, value):
+        return f'{nl}{pad}{json.dumps(name)}{sep}{value}'
+    
+    def generate():
+        parts = ['{' + ''.join(member(name, json.dumps(value, default=str)) + ','
+                               for name, value in fields.items()) + member(key, '[')]
+        count = 0
+        for item in items:
+            text = json.dumps(item, default=str, indent=indent)
+            if indent:
+                text = textwrap.indent(text, pad * 2)
+            parts.append((',' if count else '') + nl + text)
+            count += 1
+            if len(parts) >= EXPORT_STREAM_BATCH:
+                yield ''.join(parts)
+                parts = []
+        parts.append((nl + pad if count else '') + '],' + member(count_key, count) + nl + '}')
+        yield ''.join(parts)
+    
+    headers = {'Content-Disposition': f'attachment; filename={filename}'} if filename else None
+    return current_app.response_class(
+        stream_with_context(generate()), mimetype='application/json', headers=headers
+    )
@@ -38,13 +38,10 @@ def register():
     if form.validate_on_submit():
         user = User(username=form.username.data, email=form.email.data)
         user.set_password(form.password.data)
-        db.session.add(user)
-        db.session.commit()
-        
-        # Create default config
+        # Create default config in the same transaction as the user
         from app.models import UserConfig
-        config = UserConfig(user_id=user.id)
-        db.session.add(config)
+        user.config = UserConfig()
+        db.session.add(user)
         db.session.commit()
         
         flash('Registration successful! Please log in.')
@@ -0,0 +1,38 @@
+"""
+JSON response encoding for Dram Planner
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes jsonify() responses with orjson when installed.
+    
+    Output matches the default provider's compact responses: keys sorted,
+    dates passed to the default hook (HTTP dates), trailing newline. Debug
+    pretty-printing, and any value orjson rejects, use the stdlib encoder.
+    Non-ASCII text is written as UTF-8 rather than \\u escapes.
+    """
+    
+    def response(self, *args, **kwargs):
+        """Serialize the arguments as JSON and return a Response."""
+        if not ORJSON_AVAILABLE or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        
+        obj = self._prepare_response_obj(args, kwargs)
+        option = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                  | orjson.OPT_PASSTHROUGH_DATACLASS)
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            body = orjson.dumps(obj, default=self.default, option=option)
+        except orjson.JSONEncodeError:
+            return super().response(*args, **kwargs)
+        
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
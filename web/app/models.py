@@ -2,11 +2,33 @@
 Database Models for Dram Planner Web Application
 """
 
+import time
 from datetime import datetime
+from itertools import chain
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import DDL, event, func, true
+from sqlalchemy.orm import Session, load_only
 from app import db
 
+# Seconds the admin stats payload is served from memory. Any committed change
+# to a user row clears it sooner; this only bounds staleness across processes.
+ADMIN_STATS_TTL = 30
+_admin_stats_cache = {}
+
+# Seconds the catalog's distinct category and brand lists are served from
+# memory. Committed catalog changes clear them sooner.
+CATALOG_LISTS_TTL = 300
+_catalog_lists_cache = {}
+
+# Name and catalog searches are '%term%' substring matches, which only a
+# trigram index can serve. The trigram indexes below are created on Postgres
+# only, and need its pg_trgm extension.
+event.listen(
+    db.metadata, 'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql'),
+)
+
 
 class User(UserMixin, db.Model):
     """User model for authentication."""
@@ -16,10 +38,17 @@ class User(UserMixin, db.Model):
     username = db.Column(db.String(80), unique=True, nullable=False, index=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(255), nullable=False)
-    is_admin = db.Column(db.Boolean, default=False, nullable=False, index=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    is_admin = db.Column(db.Boolean, default=False, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     last_login = db.Column(db.DateTime)
     
+    # Admins are a handful of rows, so only they are indexed. The predicate
+    # matches the is_(True) filters used for admin lookups.
+    __table_args__ = (
+        db.Index('ix_users_admin', 'id',
+                 postgresql_where=is_admin.is_(True), sqlite_where=is_admin.is_(True)),
+    )
+    
     # Relationships
     bottles = db.relationship('Bottle', backref='owner', lazy='dynamic', cascade='all, delete-orphan')
     schedules = db.relationship('Schedule', backref='owner', lazy='dynamic', cascade='all, delete-orphan')
@@ -33,16 +62,146 @@ class User(UserMixin, db.Model):
         """Check password."""
         return check_password_hash(self.password_hash, password)
     
+    @staticmethod
+    def other_admin_exists(user_id):
+        """Check whether any admin other than the given user exists.
+        
+        Uses EXISTS, which stops at the first matching row, instead of
+        counting every admin just to compare the total with one.
+        """
+        query = User.query.filter(User.is_admin.is_(True), User.id != user_id)
+        return db.session.query(query.exists()).scalar()
+    
+    @staticmethod
+    def taken_field(username=None, email=None, exclude_id=None):
+        """Find whether a username or email already belongs to another user.
+        
+        Both columns are checked in a single query.
+        
+        Args:
+            username (str): Username to check, or None to skip.
+            email (str): Email to check, or None to skip.
+            exclude_id (int): User whose own values do not count as taken.
+            
+        Returns:
+            str: 'username' or 'email' for the first clash found, or None.
+        """
+        conditions = []
+        if username is not None:
+            conditions.append(User.username == username)
+        if email is not None:
+            conditions.append(User.email == email)
+        if not conditions:
+            return None
+        
+        query = db.session.query(User.username, User.email).filter(db.or_(*conditions))
+        if exclude_id is not None:
+            query = query.filter(User.id != exclude_id)
+        # Both columns are unique, so at most two rows can clash
+        clashes = query.limit(2).all()
+        if username is not None and any(row.username == username for row in clashes):
+            return 'username'
+        return 'email' if clashes else None
+    
+    @staticmethod
+    def user_counts():
+        """Count all users and admin users in a single query.
+        
+        Returns:
+            tuple: (total_users, admin_users)
+        """
+        total, admins = db.session.query(
+            func.count(User.id),
+            func.count(User.id).filter(User.is_admin.is_(True))
+        ).one()
+        return total, admins
+    
+    @staticmethod
+    def admin_stats():
+        """Get the admin statistics payload, cached for ADMIN_STATS_TTL seconds.
+        
+        Returns:
+            dict: User totals and the five most recently created users.
+        """
+        cached = _admin_stats_cache.get('admin_stats')
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        
+        # Both totals come from one filtered aggregate over users, joined onto
+        # the recent-users query, so the whole payload is one round-trip
+        counts = db.select(
+            func.count(User.id).label('total'),
+            func.count(User.id).filter(User.is_admin.is_(True)).label('admins')
+        ).subquery()
+        rows = db.session.query(User, counts.c.total, counts.c.admins).join(
+            counts, true()
+        ).options(load_only(
+            User.id, User.username, User.email, User.created_at
+        )).order_by(User.created_at.desc()).limit(5).all()
+        
+        recent_users = [row[0] for row in rows]
+        total_users, admin_users = (rows[0][1], rows[0][2]) if rows else (0, 0)
+        
+        payload = {
+            'total_users': total_users,
+            'admin_users': admin_users,
+            'regular_users': total_users - admin_users,
+            'recent_users': [{
+                'id': u.id,
+                'username': u.username,
+                'email': u.email,
+                'created_at': u.created_at.isoformat()
+            } for u in recent_users]
+        }
+        _admin_stats_cache['admin_stats'] = (time.monotonic() + ADMIN_STATS_TTL, payload)
+        return payload
+    
     def __repr__(self):
         return f'<User {self.username}>'
 
 
+def invalidate_admin_stats():
+    """Drop the cached admin statistics payload."""
+    _admin_stats_cache.clear()
+
+
+@event.listens_for(Session, 'before_flush')
+def _note_cached_model_changes(session, flush_context, instances):
+    """Note which cached models the session is about to write rows for."""
+    changed = {type(obj) for obj in chain(session.new, session.dirty, session.deleted)}
+    changed &= _CACHE_INVALIDATORS.keys()
+    if changed:
+        session.info.setdefault('changed_models', set()).update(changed)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _note_bulk_cached_model_changes(orm_execute_state):
+    """Note bulk INSERT/UPDATE/DELETE statements against cached models."""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ in _CACHE_INVALIDATORS:
+            orm_execute_state.session.info.setdefault('changed_models', set()).add(mapper.class_)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_caches_on_commit(session):
+    """Clear the caches built from models whose changes were just committed."""
+    for model in session.info.pop('changed_models', ()):
+        _CACHE_INVALIDATORS[model]()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_cached_model_changes(session):
+    """Discard the noted changes when they are rolled back."""
+    session.info.pop('changed_models', None)
+
+
 class Bottle(db.Model):
     """Bottle model."""
     __tablename__ = 'bottles'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     name = db.Column(db.String(200), nullable=False, index=True)
     category = db.Column(db.String(50), nullable=False, index=True)
     abv = db.Column(db.Float, default=0.0)
@@ -54,7 +213,7 @@ class Bottle(db.Model):
     photo_path = db.Column(db.String(255))
     
     # Tasting information
-    tasted = db.Column(db.Boolean, default=False, index=True)
+    tasted = db.Column(db.Boolean, default=False)
     tasting_date = db.Column(db.Date)
     rating = db.Column(db.Float)
     tasting_notes = db.Column(db.Text)
@@ -63,26 +222,54 @@ class Bottle(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Collections are always read per user: listed in (name, id) keyset
+    # order, filtered or grouped by category, and filtered on tasted.
+    # ix_bottles_user_name also serves lookups by user_id alone.
+    __table_args__ = (
+        db.Index('ix_bottles_user_name', 'user_id', 'name', 'id'),
+        db.Index('ix_bottles_user_category_tasted', 'user_id', 'category', 'tasted'),
+        db.Index('ix_bottles_user_tasted', 'user_id',
+                 postgresql_where=tasted.is_(True), sqlite_where=tasted.is_(True)),
+        # For the lower(name) LIKE search in get_bottles
+        db.Index('ix_bottles_name_trgm', func.lower(name).label('lower_name'),
+                 postgresql_using='gin', postgresql_ops={'lower_name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
+    
     def to_dict(self):
         """Convert to dictionary for API responses."""
+        return Bottle.row_to_dict(self)
+    
+    @staticmethod
+    def row_to_dict(row):
+        """Convert a bottle's column values to the API dictionary.
+        
+        Accepts a Bottle or a plain row of the bottles columns, so list
+        endpoints can skip building ORM instances for every row.
+        
+        Args:
+            row: Bottle instance or row with the bottles table's columns.
+            
+        Returns:
+            dict: The same dictionary as Bottle.to_dict().
+        """
         return {
-            'id': self.id,
-            'name': self.name,
-            'category': self.category,
-            'abv': self.abv,
-            'price_paid': self.price_paid,
-            'purchase_date': self.purchase_date.isoformat() if self.purchase_date else None,
-            'opened_date': self.opened_date.isoformat() if self.opened_date else None,
-            'notes': self.notes,
-            'barcode': self.barcode,
-            'photo_path': self.photo_path,
-            'photo_url': f'/api/bottles/{self.id}/photo' if self.photo_path else None,
-            'tasted': self.tasted,
-            'tasting_date': self.tasting_date.isoformat() if self.tasting_date else None,
-            'rating': self.rating,
-            'tasting_notes': self.tasting_notes,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'id': row.id,
+            'name': row.name,
+            'category': row.category,
+            'abv': row.abv,
+            'price_paid': row.price_paid,
+            'purchase_date': row.purchase_date.isoformat() if row.purchase_date else None,
+            'opened_date': row.opened_date.isoformat() if row.opened_date else None,
+            'notes': row.notes,
+            'barcode': row.barcode,
+            'photo_path': row.photo_path,
+            'photo_url': f'/api/bottles/{row.id}/photo' if row.photo_path else None,
+            'tasted': row.tasted,
+            'tasting_date': row.tasting_date.isoformat() if row.tasting_date else None,
+            'rating': row.rating,
+            'tasting_notes': row.tasting_notes,
+            'created_at': row.created_at.isoformat(),
+            'updated_at': row.updated_at.isoformat()
         }
     
     def __repr__(self):
@@ -204,7 +391,7 @@ class MasterBeverage(db.Model):
     __tablename__ = 'master_beverages'
 
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(255), nullable=False, index=True)
+    name = db.Column(db.String(255), nullable=False)
     brand = db.Column(db.String(255), index=True)
     category = db.Column(db.String(50), nullable=False, index=True)
     subcategory = db.Column(db.String(100))
@@ -220,6 +407,15 @@ class MasterBeverage(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # (name, id) serves search_catalog's keyset pages and import name lookups;
+    # the trigram index serves its name/brand/description ILIKE search
+    __table_args__ = (
+        db.Index('ix_master_beverages_name_id', name, id),
+        db.Index('ix_master_beverages_search_trgm', name, brand, description, postgresql_using='gin',
+                 postgresql_ops={'name': 'gin_trgm_ops', 'brand': 'gin_trgm_ops',
+                                 'description': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -240,10 +436,58 @@ class MasterBeverage(db.Model):
             'updated_at': self.updated_at.isoformat()
         }
 
+    @staticmethod
+    def distinct_categories():
+        """Get every category in the catalog, cached for CATALOG_LISTS_TTL seconds.
+
+        Returns:
+            list: Category names in sorted order.
+        """
+        return _cached_catalog_list('categories', lambda: [
+            row[0] for row in db.session.query(MasterBeverage.category).distinct().order_by(MasterBeverage.category)
+        ])
+
+    @staticmethod
+    def distinct_brands():
+        """Get every non-empty brand in the catalog, cached for CATALOG_LISTS_TTL seconds.
+
+        Returns:
+            list: Brand names in sorted order.
+        """
+        return _cached_catalog_list('brands', lambda: [
+            row[0] for row in db.session.query(MasterBeverage.brand).distinct().filter(
+                MasterBeverage.brand.isnot(None)
+            ).order_by(MasterBeverage.brand) if row[0]
+        ])
+
+    @staticmethod
+    def total_count():
+        """Get the number of catalog entries, cached for CATALOG_LISTS_TTL seconds.
+
+        Returns:
+            int: Row count of the catalog.
+        """
+        return _cached_catalog_list('total', lambda: db.session.query(func.count(MasterBeverage.id)).scalar())
+
     def __repr__(self):
         return f'<MasterBeverage {self.name}>'
 
 
+def _cached_catalog_list(key, load):
+    """Return a cached catalog list, calling load() when it is missing or stale."""
+    cached = _catalog_lists_cache.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    values = load()
+    _catalog_lists_cache[key] = (time.monotonic() + CATALOG_LISTS_TTL, values)
+    return values
+
+
+def invalidate_catalog_lists():
+    """Drop the cached catalog category and brand lists and catalog size."""
+    _catalog_lists_cache.clear()
+
+
 class UserGroup(db.Model):
     """User groups for shared tasting experiences."""
     __tablename__ = 'user_groups'
@@ -410,3 +654,10 @@ class BeverageReview(db.Model):
     
     def __repr__(self):
         return f'<BeverageReview {self.beverage_name} - {self.rating}/10>'
+
+
+# Caches built from model rows, cleared when changes to those rows commit
+_CACHE_INVALIDATORS = {
+    User: invalidate_admin_stats,
+    MasterBeverage: invalidate_catalog_lists,
+}
@@ -23,6 +23,9 @@ class Config:
     UPLOAD_FOLDER = basedir / 'uploads'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+    # Internal Nginx location aliased to UPLOAD_FOLDER; when set, photos are
+    # served by Nginx through X-Accel-Redirect instead of by the app
+    PHOTO_ACCEL_REDIRECT = os.environ.get('PHOTO_ACCEL_REDIRECT')
     
     # Barcode scanning
     BARCODE_SCANNING_ENABLED = True
@@ -5,14 +5,19 @@ Pytest configuration and fixtures for web application tests.
 import pytest
 import sys
 import os
+from contextlib import contextmanager
 from pathlib import Path
 
+from sqlalchemy import event
+
 # Add web directory to path
 web_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(web_dir))
 
 from app import create_app, db
-from app.models import User, Bottle, Schedule, ScheduleItem, UserConfig
+from app.models import (
+    User, Bottle, Schedule, ScheduleItem, UserConfig, invalidate_admin_stats, invalidate_catalog_lists,
+)
 from config import TestingConfig
 
 
@@ -20,6 +25,9 @@ from config import TestingConfig
 def app():
     """Create application for testing."""
     app = create_app(TestingConfig)
+    # Every test starts from an empty database, so nothing cached by a prior test applies
+    invalidate_admin_stats()
+    invalidate_catalog_lists()
     
     with app.app_context():
         db.create_all()
@@ -150,3 +158,25 @@ def sample_schedule(app, db_session, user):
     db_session.commit()
     return schedule
 
+
+@pytest.fixture
+def count_statements(app):
+    """Record the SQL statements run inside a with block.
+    
+    Usage: ``with count_statements() as statements: ...`` leaves the
+    statement strings in the statements list.
+    """
+    @contextmanager
+    def recorder():
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    
+    return recorder
@@ -0,0 +1,128 @@
+"""
+Tests for admin page routes.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest import mock
+from app.models import User, Bottle, db
+
+
+class TestAdminAccess:
+    """Test the admin blueprint's access check."""
+    
+    def test_anonymous_redirected_to_login(self, client, db_session):
+        """Test anonymous users are sent to the login page."""
+        response = client.get('/admin/dashboard')
+        assert response.status_code == 302
+        assert '/auth/login' in response.headers['Location']
+    
+    def test_non_admin_redirected_to_index(self, client, logged_in_user):
+        """Test logged-in non-admins are turned away from every admin view."""
+        for method, path in (('get', '/admin/dashboard'),
+                             ('post', f'/admin/users/{logged_in_user.id}/promote')):
+            response = getattr(client, method)(path)
+            assert response.status_code == 302
+            assert '/admin' not in response.headers['Location']
+        assert not User.query.get(logged_in_user.id).is_admin
+    
+    def test_admin_allowed(self, client, logged_in_admin):
+        """Test admins reach the admin views."""
+        with mock.patch('app.admin.routes.render_template', return_value=''):
+            assert client.get('/admin/dashboard').status_code == 200
+
+
+class TestAdminUsersPage:
+    """Test the admin user management page."""
+    
+    def test_users_keyset_pagination(self, client, app, logged_in_admin):
+        """Test users are paged newest first by cursor without overlap."""
+        with app.app_context():
+            base = datetime(2025, 1, 1)
+            for i in range(25):
+                user = User(username=f'user{i}', email=f'user{i}@example.com',
+                            created_at=base + timedelta(days=i))
+                user.set_password('pass123')
+                db.session.add(user)
+            db.session.commit()
+            
+            with mock.patch('app.admin.routes.render_template', return_value='') as render:
+                assert client.get('/admin/users').status_code == 200
+                first = render.call_args.kwargs
+                
+                cursor = first['next_cursor']
+                assert cursor is not None
+                assert client.get('/admin/users', query_string=cursor).status_code == 200
+                second = render.call_args.kwargs
+            
+            first_ids = [u.id for u in first['users']]
+            second_ids = [u.id for u in second['users']]
+            assert len(first_ids) == 20
+            assert len(second_ids) == 6  # 25 users plus the admin
+            assert not set(first_ids) & set(second_ids)
+            assert second['next_cursor'] is None
+            
+            dates = [u.created_at for u in first['users'] + second['users']]
+            assert dates == sorted(dates, reverse=True)
+
+
+class TestAdminBulkUserAction:
+    """Test the bulk user action endpoint."""
+    
+    def _make_users(self, count):
+        users = []
+        for i in range(count):
+            user = User(username=f'bulk{i}', email=f'bulk{i}@example.com')
+            user.set_password('pass123')
+            db.session.add(user)
+            users.append(user)
+        db.session.commit()
+        return [user.id for user in users]
+    
+    def test_bulk_promote_and_demote(self, client, app, logged_in_admin):
+        """Test promoting and demoting several users at once."""
+        with app.app_context():
+            ids = self._make_users(3)
+            
+            response = client.post('/admin/users/bulk', json={'action': 'promote', 'user_ids': ids})
+            assert response.status_code == 200
+            assert response.get_json() == {'action': 'promote', 'affected': 3}
+            db.session.expire_all()
+            assert all(User.query.get(i).is_admin for i in ids)
+            
+            response = client.post('/admin/users/bulk', json={'action': 'demote', 'user_ids': ids[:2]})
+            assert response.get_json()['affected'] == 2
+            db.session.expire_all()
+            assert [User.query.get(i).is_admin for i in ids] == [False, False, True]
+    
+    def test_bulk_delete_cascades(self, client, app, logged_in_admin):
+        """Test bulk deletion removes the users and their bottles."""
+        with app.app_context():
+            ids = self._make_users(2)
+            db.session.add(Bottle(user_id=ids[0], name='Test Bourbon', category='bourbon'))
+            db.session.commit()
+            
+            response = client.post('/admin/users/bulk', json={'action': 'delete', 'user_ids': ids})
+            assert response.get_json() == {'action': 'delete', 'affected': 2}
+            assert User.query.filter(User.id.in_(ids)).count() == 0
+            assert Bottle.query.filter_by(user_id=ids[0]).count() == 0
+    
+    def test_bulk_guards(self, client, app, logged_in_admin):
+        """Test self-deletion and last-admin self-demotion are refused."""
+        with app.app_context():
+            ids = self._make_users(1) + [logged_in_admin.id]
+            
+            response = client.post('/admin/users/bulk', json={'action': 'delete', 'user_ids': ids})
+            assert response.status_code == 400
+            response = client.post('/admin/users/bulk', json={'action': 'demote', 'user_ids': ids})
+            assert response.status_code == 400
+            assert User.query.get(logged_in_admin.id).is_admin
+    
+    def test_bulk_invalid_request(self, client, logged_in_admin):
+        """Test unknown actions and malformed ids are rejected."""
+        assert client.post('/admin/users/bulk',
+                           json={'action': 'archive', 'user_ids': [1]}).status_code == 400
+        assert client.post('/admin/users/bulk',
+                           json={'action': 'promote', 'user_ids': []}).status_code == 400
+        assert client.post('/admin/users/bulk',
+                           json={'action': 'promote', 'user_ids': ['1']}).status_code == 400
@@ -3,7 +3,8 @@ Tests for admin API endpoints.
 """
 
 import pytest
-from app.models import User, db
+from sqlalchemy import text
+from app.models import Bottle, User, db
 
 
 class TestAdminAPI:
@@ -30,6 +31,50 @@ class TestAdminAPI:
             assert 'users' in data
             assert len(data['users']) >= 2
     
+    def test_list_users_search_ignores_case(self, client, app, logged_in_admin, user):
+        """Test user search matches username or email regardless of case."""
+        with app.app_context():
+            data = client.get(f'/api/admin/users?search={user.username.upper()}').get_json()
+            assert [u['id'] for u in data['users']] == [user.id]
+            data = client.get('/api/admin/users?search=EXAMPLE.COM').get_json()
+            assert len(data['users']) == 2
+    
+    def test_list_users_keyset_pagination(self, client, app, logged_in_admin):
+        """Test users are paged by cursor, and ?page= is flagged deprecated."""
+        with app.app_context():
+            for i in range(4):
+                user = User(username=f'user{i}', email=f'user{i}@example.com')
+                user.set_password('pass123')
+                db.session.add(user)
+            db.session.commit()
+            
+            first = client.get('/api/admin/users?per_page=3').get_json()
+            assert len(first['users']) == 3
+            second = client.get('/api/admin/users',
+                                query_string={'per_page': 3, **first['next_cursor']}).get_json()
+            assert len(second['users']) == 2  # 4 users plus the admin
+            assert second['next_cursor'] is None
+            assert not {u['id'] for u in first['users']} & {u['id'] for u in second['users']}
+            
+            legacy = client.get('/api/admin/users?page=1&per_page=3')
+            assert legacy.headers['Deprecation'] == 'true'
+            assert legacy.get_json()['total'] == 5
+            
+            uncounted = client.get('/api/admin/users?page=2&per_page=3&total=false').get_json()
+            assert len(uncounted['users']) == 2
+            assert uncounted['has_next'] is False
+            assert 'total' not in uncounted
+    
+    def test_list_users_per_page_clamped(self, client, app, logged_in_admin):
+        """Test a non-positive page size falls back to the default."""
+        for per_page in (0, -1):
+            response = client.get('/api/admin/users', query_string={'per_page': per_page})
+            assert response.status_code == 200
+            data = response.get_json()
+            assert data['per_page'] == 20
+            assert len(data['users']) == 1
+            assert data['next_cursor'] is None
+    
     def test_get_user_details(self, client, app, logged_in_admin, user):
         """Test getting user details as admin."""
         with app.app_context():
@@ -39,6 +84,22 @@ class TestAdminAPI:
             assert data['id'] == user.id
             assert data['username'] == user.username
     
+    def test_get_user_details_counts(self, client, app, logged_in_admin, user, sample_schedule):
+        """Test user details count bottles and schedules independently."""
+        with app.app_context():
+            for name in ('Bourbon 1', 'Bourbon 2'):
+                db.session.add(Bottle(user_id=user.id, name=name, category='bourbon'))
+            db.session.commit()
+            
+            data = client.get(f'/api/admin/users/{user.id}').get_json()
+            assert data['bottle_count'] == 2
+            assert data['schedule_count'] == 1
+            
+            data = client.get(f'/api/admin/users/{logged_in_admin.id}').get_json()
+            assert data['bottle_count'] == 0
+            assert data['schedule_count'] == 0
+            assert client.get('/api/admin/users/99999').status_code == 404
+    
     def test_promote_user_to_admin(self, client, app, logged_in_admin, user):
         """Test promoting user to admin."""
         with app.app_context():
@@ -67,6 +128,22 @@ class TestAdminAPI:
             admin2 = User.query.get(admin2.id)
             assert admin2.is_admin is False
     
+    def test_demote_self_blocked_for_last_admin(self, client, app, logged_in_admin):
+        """Test the last admin cannot demote themselves, but can once another exists."""
+        with app.app_context():
+            response = client.post(f'/api/admin/users/{logged_in_admin.id}/demote')
+            assert response.status_code == 400
+            assert User.other_admin_exists(logged_in_admin.id) is False
+            
+            admin2 = User(username='admin2', email='admin2@example.com', is_admin=True)
+            admin2.set_password('pass123')
+            db.session.add(admin2)
+            db.session.commit()
+            assert User.other_admin_exists(logged_in_admin.id) is True
+            
+            response = client.post(f'/api/admin/users/{logged_in_admin.id}/demote')
+            assert response.status_code == 200
+    
     def test_update_user(self, client, app, logged_in_admin, user):
         """Test updating user as admin."""
         with app.app_context():
@@ -83,6 +160,22 @@ class TestAdminAPI:
             user = User.query.get(user.id)
             assert user.username == 'updated_username'
     
+    def test_update_user_conflicts(self, client, app, logged_in_admin, user):
+        """Test updates clashing with another user are rejected, own values are not."""
+        with app.app_context():
+            response = client.put(f'/api/admin/users/{user.id}',
+                                  json={'username': logged_in_admin.username})
+            assert response.status_code == 400
+            assert response.get_json()['error'] == 'Username already exists'
+            
+            response = client.put(f'/api/admin/users/{user.id}',
+                                  json={'username': 'fresh', 'email': logged_in_admin.email})
+            assert response.get_json()['error'] == 'Email already exists'
+            
+            response = client.put(f'/api/admin/users/{user.id}',
+                                  json={'username': user.username, 'email': user.email})
+            assert response.status_code == 200
+    
     def test_delete_user(self, client, app, logged_in_admin):
         """Test deleting user as admin."""
         with app.app_context():
@@ -109,4 +202,31 @@ class TestAdminAPI:
             assert 'total_users' in data
             assert 'admin_users' in data
             assert data['total_users'] >= 1
+    
+    def test_admin_stats_counts(self, client, app, logged_in_admin, user):
+        """Test admin statistics count admins and regular users separately."""
+        with app.app_context():
+            data = client.get('/api/admin/stats').get_json()
+            assert data['total_users'] == 2
+            assert data['admin_users'] == 1
+            assert data['regular_users'] == 1
+    
+    def test_admin_stats_served_from_cache(self, client, app, logged_in_admin, user):
+        """Test stats are cached until a user change is committed through the ORM."""
+        with app.app_context():
+            assert client.get('/api/admin/stats').get_json()['admin_users'] == 1
+            
+            # A raw SQL write is invisible to the cache, so the cached payload is served
+            db.session.execute(text('UPDATE users SET is_admin = 1'))
+            db.session.commit()
+            assert client.get('/api/admin/stats').get_json()['admin_users'] == 1
+            
+            # Committing a new User through the ORM clears the cache
+            new_user = User(username='newuser', email='new@example.com')
+            new_user.set_password('pass123')
+            db.session.add(new_user)
+            db.session.commit()
+            data = client.get('/api/admin/stats').get_json()
+            assert data['total_users'] == 3
+            assert data['admin_users'] == 2
 
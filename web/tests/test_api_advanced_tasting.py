@@ -18,6 +18,23 @@ def test_get_tasting_config(client, logged_in_user):
     assert 'tasting_note_template' in data
 
 
+def test_get_tasting_config_defaults_without_writing(client, logged_in_user, db_session):
+    """Test a user without a config row gets defaults and no row is created."""
+    response = client.get('/api/config/tasting')
+    
+    assert response.get_json() == {
+        'bottles_per_session': 1,
+        'rating_scale': '0-10',
+        'tasting_note_template': None,
+        'blind_tasting_mode': False,
+        'sort_preference': None,
+        'exclude_recent_categories_days': 0,
+        'notification_enabled': False,
+        'notification_timing_hours': 24
+    }
+    assert UserConfig.query.count() == 0
+
+
 def test_update_tasting_config(client, logged_in_user, db_session):
     """Test updating tasting configuration."""
     response = client.put('/api/config/tasting', json={
@@ -42,6 +59,24 @@ def test_update_invalid_rating_scale(client, logged_in_user):
     assert response.status_code == 400
 
 
+def test_update_invalid_choice_values(client, logged_in_user):
+    """Test choice fields reject unknown and non-string values."""
+    response = client.put('/api/config/tasting', json={'rating_scale': ['0-10']})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Rating scale must be one of: 0-10, 1-5, A-F'
+    
+    response = client.put('/api/config/tasting', json={'tasting_note_template': {'a': 1}})
+    assert response.status_code == 400
+    
+    response = client.put('/api/config/tasting', json={'sort_preference': 'colour'})
+    assert response.status_code == 400
+    
+    response = client.put('/api/config/tasting', json={
+        'tasting_note_template': None, 'sort_preference': 'abv'
+    })
+    assert response.status_code == 200
+
+
 def test_update_invalid_bottles_per_session(client, logged_in_user):
     """Test updating with invalid bottles per session."""
     response = client.put('/api/config/tasting', json={
@@ -73,3 +108,18 @@ def test_get_rating_scales(client, logged_in_user):
     assert '1-5' in data['scales']
     assert 'A-F' in data['scales']
 
+
+def test_static_config_responses_are_cacheable(client, logged_in_user):
+    """Test constant responses carry an ETag and revalidate with 304."""
+    for path in ('/api/config/tasting/templates', '/api/config/tasting/rating-scales',
+                 '/api/barcode/categories'):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert response.headers['ETag']
+        assert response.cache_control.private
+        assert response.cache_control.max_age == 86400
+        
+        revalidated = client.get(path, headers={'If-None-Match': response.headers['ETag']})
+        assert revalidated.status_code == 304
+        assert revalidated.get_data() == b''
+
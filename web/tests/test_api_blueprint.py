@@ -0,0 +1,24 @@
+"""
+Tests for API blueprint route registration.
+"""
+
+import pytest
+from app.api import _API_MODULES
+
+
+class TestAPIBlueprint:
+    """Test that every API route module is registered."""
+    
+    def test_all_route_modules_registered(self, app):
+        """Test each module in _API_MODULES contributes endpoints to the app."""
+        registered = {
+            view.__module__
+            for endpoint, view in app.view_functions.items()
+            if endpoint.startswith('api.')
+        }
+        expected = {f'app.api.{name}' for name in _API_MODULES}
+        assert expected <= registered
+    
+    def test_route_modules_listed_once(self):
+        """Test no module is listed twice."""
+        assert len(_API_MODULES) == len(set(_API_MODULES))
@@ -2,8 +2,11 @@
 Tests for bottles API endpoints.
 """
 
+import io
+from unittest import mock
+
 import pytest
-from app.models import Bottle, db
+from app.models import Bottle, ScheduleItem, db
 
 
 class TestBottlesAPI:
@@ -43,6 +46,27 @@ class TestBottlesAPI:
             assert bottle is not None
             assert bottle.user_id == logged_in_user.id
     
+    def test_bottle_dates(self, client, app, logged_in_user, sample_bottle):
+        """Test dates must be YYYY-MM-DD and malformed ones get 400."""
+        with app.app_context():
+            response = client.post('/api/bottles', json={'name': 'Dated', 'purchase_date': '2024-03-05'})
+            assert response.status_code == 201
+            assert response.get_json()['purchase_date'] == '2024-03-05'
+            
+            for bad in ('2024-3-5', '20240305', '2024-02-30', 20240305):
+                response = client.post('/api/bottles', json={'name': 'Bad', 'purchase_date': bad})
+                assert response.status_code == 400
+            assert Bottle.query.filter_by(name='Bad').count() == 0
+            
+            response = client.put(f'/api/bottles/{sample_bottle.id}', json={'name': 'Renamed', 'purchase_date': 'soon'})
+            assert response.status_code == 400
+            response = client.post(f'/api/bottles/{sample_bottle.id}/tasting', json={'rating': 8, 'tasting_date': '2024-13-01'})
+            assert response.status_code == 400
+            
+            response = client.post(f'/api/bottles/{sample_bottle.id}/tasting', json={'rating': 8, 'tasting_date': '2024-04-01'})
+            assert response.status_code == 200
+            assert response.get_json()['tasting_date'] == '2024-04-01'
+    
     def test_get_bottle_by_id(self, client, app, logged_in_user, sample_bottle):
         """Test getting a specific bottle."""
         with app.app_context():
@@ -69,6 +93,40 @@ class TestBottlesAPI:
             bottle = Bottle.query.get(sample_bottle.id)
             assert bottle.name == 'Updated Bottle'
     
+    def test_get_bottle_not_modified(self, client, app, logged_in_user, sample_bottle):
+        """Test a matching ETag gets 304 until the bottle is updated."""
+        with app.app_context():
+            response = client.get(f'/api/bottles/{sample_bottle.id}')
+            assert response.status_code == 200
+            etag = response.headers['ETag']
+            assert etag.startswith('W/')
+            assert 'private' in response.headers['Cache-Control']
+            
+            response = client.get(f'/api/bottles/{sample_bottle.id}', headers={'If-None-Match': etag})
+            assert response.status_code == 304
+            assert response.data == b''
+            
+            client.put(f'/api/bottles/{sample_bottle.id}', json={'name': 'Renamed Bottle'})
+            response = client.get(f'/api/bottles/{sample_bottle.id}', headers={'If-None-Match': etag})
+            assert response.status_code == 200
+            assert response.get_json()['name'] == 'Renamed Bottle'
+            assert response.headers['ETag'] != etag
+    
+    def test_update_bottle_unchanged(self, client, app, logged_in_user, sample_bottle):
+        """Test a PUT that changes nothing keeps updated_at and the ETag."""
+        with app.app_context():
+            etag = client.get(f'/api/bottles/{sample_bottle.id}').headers['ETag']
+            updated_at = sample_bottle.updated_at
+            
+            for body in ({}, {'name': sample_bottle.name, 'category': sample_bottle.category}):
+                response = client.put(f'/api/bottles/{sample_bottle.id}', json=body)
+                assert response.status_code == 200
+                assert response.get_json()['name'] == sample_bottle.name
+            
+            assert db.session.get(Bottle, sample_bottle.id).updated_at == updated_at
+            response = client.get(f'/api/bottles/{sample_bottle.id}', headers={'If-None-Match': etag})
+            assert response.status_code == 304
+    
     def test_delete_bottle(self, client, app, logged_in_user, sample_bottle):
         """Test deleting a bottle."""
         with app.app_context():
@@ -80,6 +138,300 @@ class TestBottlesAPI:
             bottle = Bottle.query.get(bottle_id)
             assert bottle is None
     
+    def test_delete_bottle_refused(self, client, app, logged_in_user, sample_bottle, sample_schedule, admin_user):
+        """Test deleting another user's or a scheduled bottle leaves it in place."""
+        with app.app_context():
+            other = Bottle(user_id=admin_user.id, name='Not Mine', category='rum')
+            db.session.add(other)
+            db.session.add(ScheduleItem(schedule_id=sample_schedule.id, bottle_id=sample_bottle.id, week=1,
+                                        date=sample_schedule.start_date))
+            db.session.commit()
+            other_id, bottle_id = other.id, sample_bottle.id
+            
+            assert client.delete(f'/api/bottles/{other_id}').status_code == 404
+            assert client.delete('/api/bottles/999999').status_code == 404
+            response = client.delete(f'/api/bottles/{bottle_id}')
+            assert response.status_code == 409
+            assert db.session.get(Bottle, other_id) is not None
+            assert db.session.get(Bottle, bottle_id) is not None
+    
+    def test_put_bottle_photo(self, client, app, logged_in_user, sample_bottle, tmp_path):
+        """Test a raw image body is stored as the bottle's photo."""
+        app.config['UPLOAD_FOLDER'] = str(tmp_path)
+        with app.app_context():
+            image = b'\x89PNG\r\n\x1a\n' + b'x' * 200000
+            response = client.put(f'/api/bottles/{sample_bottle.id}/photo', data=image,
+                                  content_type='image/png')
+            assert response.status_code == 200
+            photo_path = response.get_json()['photo_path']
+            assert photo_path.endswith('.png')
+            assert (tmp_path / photo_path).read_bytes() == image
+            
+            response = client.get(f'/api/bottles/{sample_bottle.id}/photo')
+            assert response.data == image
+            response.close()
+            
+            # Replacing the photo removes the old file
+            gif = b'GIF89a' + b'y' * 10
+            response = client.put(f'/api/bottles/{sample_bottle.id}/photo', data=gif,
+                                  content_type='image/gif')
+            new_path = response.get_json()['photo_path']
+            assert (tmp_path / new_path).read_bytes() == gif
+            assert not (tmp_path / photo_path).exists()
+            
+            (tmp_path / new_path).unlink()
+            response = client.get(f'/api/bottles/{sample_bottle.id}/photo')
+            assert response.status_code == 404
+            assert response.get_json() == {'error': 'Photo file not found'}
+            assert client.delete(f'/api/bottles/{sample_bottle.id}/photo').status_code == 200
+            
+            response = client.put(f'/api/bottles/{sample_bottle.id}/photo', data=b'GIF89a',
+                                  content_type='application/octet-stream')
+            assert response.status_code == 400
+            response = client.put(f'/api/bottles/{sample_bottle.id}/photo', data=b'',
+                                  content_type='image/gif')
+            assert response.status_code == 400
+    
+    def test_bottle_photos_share_identical_files(self, client, app, logged_in_user, sample_bottle, tmp_path):
+        """Test identical photos are stored once and removed with their last bottle."""
+        app.config['UPLOAD_FOLDER'] = str(tmp_path)
+        with app.app_context():
+            other = Bottle(user_id=logged_in_user.id, name='Second Bottle', category='rum')
+            db.session.add(other)
+            db.session.commit()
+            
+            image = b'\x89PNG\r\n\x1a\n' + b'z' * 1000
+            paths = []
+            for bottle_id in (sample_bottle.id, other.id, sample_bottle.id):
+                response = client.put(f'/api/bottles/{bottle_id}/photo', data=image,
+                                      content_type='image/png')
+                assert response.status_code == 200
+                paths.append(response.get_json()['photo_path'])
+            assert len(set(paths)) == 1
+            assert [p.name for p in (tmp_path / str(logged_in_user.id)).iterdir()] == [paths[0].split('/')[-1]]
+            
+            # A file removed by a concurrent release is put back by the next upload
+            (tmp_path / paths[0]).unlink()
+            client.put(f'/api/bottles/{other.id}/photo', data=image, content_type='image/png')
+            assert (tmp_path / paths[0]).read_bytes() == image
+            
+            client.delete(f'/api/bottles/{sample_bottle.id}/photo')
+            assert (tmp_path / paths[0]).read_bytes() == image
+            client.delete(f'/api/bottles/{other.id}/photo')
+            assert not (tmp_path / paths[0]).exists()
+    
+    def test_put_bottle_photo_rename_failure(self, client, app, logged_in_user, sample_bottle,
+                                             tmp_path, monkeypatch):
+        """Test a failed rename keeps the bottle's previous photo and leaves no temp file."""
+        app.config['UPLOAD_FOLDER'] = str(tmp_path)
+        with app.app_context():
+            image = b'\x89PNG\r\n\x1a\n' + b'a' * 100
+            photo_path = client.put(f'/api/bottles/{sample_bottle.id}/photo', data=image,
+                                    content_type='image/png').get_json()['photo_path']
+            
+            monkeypatch.setattr('app.api.bottles.os.replace', mock.Mock(side_effect=OSError('disk full')))
+            with pytest.raises(OSError):
+                client.put(f'/api/bottles/{sample_bottle.id}/photo', data=b'GIF89a' + b'b' * 10,
+                           content_type='image/gif')
+            
+            db.session.expire_all()
+            assert db.session.get(Bottle, sample_bottle.id).photo_path == photo_path
+            assert (tmp_path / photo_path).read_bytes() == image
+            assert [p.name for p in (tmp_path / str(logged_in_user.id)).iterdir()] == [photo_path.split('/')[-1]]
+    
+    def test_get_bottle_photo_accel_redirect(self, client, app, logged_in_user, sample_bottle):
+        """Test photos are handed to Nginx when X-Accel-Redirect is configured."""
+        app.config['PHOTO_ACCEL_REDIRECT'] = '/_protected_uploads/'
+        with app.app_context():
+            bottle = db.session.get(Bottle, sample_bottle.id)
+            bottle.photo_path = f'bottle_{bottle.id}_label.jpg'
+            db.session.commit()
+            
+            response = client.get(f'/api/bottles/{bottle.id}/photo')
+            assert response.status_code == 200
+            assert response.headers['X-Accel-Redirect'] == f'/_protected_uploads/bottle_{bottle.id}_label.jpg'
+            assert response.content_type == 'image/jpeg'
+            assert response.data == b''
+    
+    def test_get_bottles_keyset_pagination(self, client, app, logged_in_user):
+        """Test bottles are paged by name then id, and ?page= is flagged deprecated."""
+        with app.app_context():
+            for name in ('Cask', 'Barrel', 'Cask', 'Anchor', 'Dram'):
+                db.session.add(Bottle(user_id=logged_in_user.id, name=name, category='bourbon'))
+            db.session.commit()
+            
+            names = []
+            cursor = {}
+            while True:
+                data = client.get('/api/bottles',
+                                  query_string={'per_page': 2, **cursor}).get_json()
+                names.extend(b['name'] for b in data['bottles'])
+                cursor = data['pagination']['next_cursor']
+                if cursor is None:
+                    break
+            assert names == ['Anchor', 'Barrel', 'Cask', 'Cask', 'Dram']
+            
+            legacy = client.get('/api/bottles?page=2&per_page=2')
+            assert legacy.headers['Deprecation'] == 'true'
+            assert legacy.get_json()['pagination']['total'] == 5
+    
+    def test_get_bottles_per_page_clamped(self, client, app, logged_in_user):
+        """Test out-of-range page sizes fall back to the default or the maximum."""
+        with app.app_context():
+            for i in range(25):
+                db.session.add(Bottle(user_id=logged_in_user.id, name=f'Bottle {i:02}', category='rum'))
+            db.session.commit()
+            
+            for per_page, expected in ((0, 20), (-1, 20), (1000, 25)):
+                response = client.get('/api/bottles', query_string={'per_page': per_page})
+                assert response.status_code == 200
+                data = response.get_json()
+                assert len(data['bottles']) == expected
+                assert (data['pagination']['next_cursor'] is None) == (expected == 25)
+            
+            data = client.get('/api/bottles?page=1&per_page=0&total=false').get_json()
+            assert len(data['bottles']) == 20
+            assert data['pagination']['has_next'] is True
+            data = client.get('/api/bottles?page=2&per_page=-1&total=false').get_json()
+            assert len(data['bottles']) == 5
+            assert data['pagination']['has_next'] is False
+    
+    def test_get_bottles_query_count(self, client, app, logged_in_user, count_statements):
+        """Test a page of bottles costs the same few queries however many rows it has."""
+        with app.app_context():
+            for name in ('Anchor', 'Barrel', 'Cask', 'Dram', 'Ember'):
+                db.session.add(Bottle(user_id=logged_in_user.id, name=name, category='bourbon'))
+            db.session.commit()
+            
+            with count_statements() as statements:
+                response = client.get('/api/bottles')
+            
+            assert len(response.get_json()['bottles']) == 5
+            assert len(statements) <= 2
+    
+    def test_get_bottles_page_without_total(self, client, app, logged_in_user):
+        """Test ?total=false pages by number and reports has_next instead of counts."""
+        with app.app_context():
+            for name in ('Anchor', 'Barrel', 'Cask'):
+                db.session.add(Bottle(user_id=logged_in_user.id, name=name, category='bourbon'))
+            db.session.commit()
+            
+            first = client.get('/api/bottles?page=1&per_page=2&total=false').get_json()
+            assert [b['name'] for b in first['bottles']] == ['Anchor', 'Barrel']
+            assert first['pagination'] == {'page': 1, 'per_page': 2, 'has_next': True}
+            
+            last = client.get('/api/bottles?page=2&per_page=2&total=false').get_json()
+            assert [b['name'] for b in last['bottles']] == ['Cask']
+            assert last['pagination']['has_next'] is False
+    
+    def test_get_bottles_search_ignores_case(self, client, app, logged_in_user):
+        """Test name search matches substrings regardless of case."""
+        with app.app_context():
+            for name in ('Eagle Rare', 'Rare Breed', 'Blanton'):
+                db.session.add(Bottle(user_id=logged_in_user.id, name=name, category='bourbon'))
+            db.session.commit()
+            
+            data = client.get('/api/bottles?search=RARE').get_json()
+            assert sorted(b['name'] for b in data['bottles']) == ['Eagle Rare', 'Rare Breed']
+    
+    def test_export_bottles_csv_streamed(self, client, app, logged_in_user, monkeypatch):
+        """Test the CSV export is streamed in row batches."""
+        monkeypatch.setattr('app.api.utils.EXPORT_STREAM_BATCH', 2)
+        with app.app_context():
+            for name in ('Cask', 'Anchor', 'Barrel'):
+                db.session.add(Bottle(user_id=logged_in_user.id, name=name, category='rum'))
+            db.session.commit()
+            
+            response = client.get('/api/export/bottles', query_string={'format': 'csv'})
+            assert response.status_code == 200
+            assert response.is_streamed
+            assert response.mimetype == 'text/csv'
+            lines = response.get_data(as_text=True).splitlines()
+            assert lines[0].startswith('name,category,abv')
+            assert [line.split(',')[0] for line in lines[1:]] == ['Anchor', 'Barrel', 'Cask']
+    
+    def test_export_schedule_ical_single_query(self, client, app, logged_in_user, sample_schedule,
+                                               count_statements):
+        """Test the iCal export loads schedule items and their bottles together."""
+        from datetime import date, timedelta
+        with app.app_context():
+            for week in range(1, 4):
+                bottle = Bottle(user_id=logged_in_user.id, name=f'Week {week}', category='rum')
+                db.session.add(bottle)
+                db.session.flush()
+                db.session.add(ScheduleItem(schedule_id=sample_schedule.id, bottle_id=bottle.id, week=week,
+                                            date=date(2025, 1, 1) + timedelta(weeks=week)))
+            db.session.commit()
+            db.session.expunge_all()
+            
+            with count_statements() as statements:
+                response = client.get(f'/api/export/schedule/{sample_schedule.id}')
+            
+            assert response.status_code == 200
+            body = response.get_data(as_text=True)
+            assert [line for line in body.splitlines() if line.startswith('SUMMARY:')] == [
+                'SUMMARY:Taste: Week 1', 'SUMMARY:Taste: Week 2', 'SUMMARY:Taste: Week 3'
+            ]
+            assert sum('FROM bottles' in s for s in statements) == 0
+            assert sum('FROM schedule_items' in s for s in statements) == 1
+    
+    def test_import_bottles_skips_duplicates(self, client, app, logged_in_user, sample_bottle):
+        """Test an import inserts new bottles once and skips names already owned."""
+        csv_data = (
+            'name,category,abv,purchase_date\n'
+            f'{sample_bottle.name},bourbon,45,\n'
+            'Barrel,rum,40,2024-02-01\n'
+            'Barrel,rum,41,\n'
+            'Cask,gin,0,\n'
+        )
+        with app.app_context():
+            response = client.post('/api/import/bottles', data={
+                'file': (io.BytesIO(csv_data.encode()), 'bottles.csv')
+            }, content_type='multipart/form-data')
+            assert response.status_code == 200
+            data = response.get_json()
+            assert data['imported'] == 2
+            assert data['total'] == 4
+            
+            bottles = Bottle.query.filter_by(user_id=logged_in_user.id).order_by(Bottle.name).all()
+            assert [b.name for b in bottles] == ['Barrel', 'Cask', sample_bottle.name]
+            assert bottles[0].abv == 40.0
+            assert bottles[0].purchase_date.isoformat() == '2024-02-01'
+            assert bottles[1].abv == 0.0
+            assert bottles[1].tasted is False
+            assert bottles[1].created_at is not None
+    
+    def test_get_stats(self, client, app, logged_in_user):
+        """Test collection statistics totals, categories and average rating."""
+        with app.app_context():
+            for name, category, tasted, rating in (
+                ('Bourbon 1', 'bourbon', True, 8.0),
+                ('Bourbon 2', 'bourbon', True, None),
+                ('Bourbon 3', 'bourbon', False, None),
+                ('Scotch 1', 'scotch', True, 6.0),
+                ('Rye 1', 'rye', False, 9.0),
+            ):
+                db.session.add(Bottle(user_id=logged_in_user.id, name=name, category=category,
+                                      tasted=tasted, rating=rating))
+            db.session.commit()
+            
+            data = client.get('/api/bottles/stats').get_json()
+            assert (data['total'], data['tasted'], data['untasted']) == (5, 3, 2)
+            assert data['categories'] == {
+                'bourbon': {'total': 3, 'tasted': 2},
+                'scotch': {'total': 1, 'tasted': 1},
+                'rye': {'total': 1, 'tasted': 0},
+            }
+            assert data['average_rating'] == 7.0
+    
+    def test_get_stats_empty(self, client, app, logged_in_user):
+        """Test statistics for an empty collection."""
+        with app.app_context():
+            data = client.get('/api/bottles/stats').get_json()
+            assert (data['total'], data['tasted'], data['untasted']) == (0, 0, 0)
+            assert data['categories'] == {}
+            assert data['average_rating'] is None
+    
     def test_get_bottles_filtered(self, client, app, logged_in_user):
         """Test getting filtered bottles."""
         with app.app_context():
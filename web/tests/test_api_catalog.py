@@ -0,0 +1,230 @@
+"""
+Tests for master beverage catalog API endpoints
+"""
+
+import io
+import json
+
+from app.api import catalog as catalog_api
+from app.models import MasterBeverage, db
+
+
+def test_populate_sample_catalog_once(client, logged_in_user):
+    """Test sample beverages are only added the first time."""
+    response = client.post('/api/catalog/populate-sample')
+    assert response.status_code == 200
+    added = response.get_json()['total_added']
+    assert added == MasterBeverage.query.count() > 0
+    
+    response = client.post('/api/catalog/populate-sample')
+    assert response.get_json()['total_added'] == 0
+    assert MasterBeverage.query.count() == added
+
+
+def test_import_catalog_skips_duplicates(client, logged_in_user):
+    """Test imported rows already in the catalog or repeated in the file are skipped."""
+    db.session.add(MasterBeverage(name='Laphroaig 10', brand='Laphroaig', category='scotch'))
+    db.session.add(MasterBeverage(name='House Gin', category='clear'))
+    db.session.commit()
+    
+    beverages = [
+        {'name': 'Laphroaig 10', 'brand': 'Laphroaig', 'category': 'scotch'},
+        {'name': 'House Gin', 'category': 'clear'},
+        {'name': ' Ardbeg 10 ', 'brand': 'Ardbeg', 'category': 'scotch', 'abv': 46},
+        {'name': 'Ardbeg 10', 'brand': 'Ardbeg', 'category': 'scotch'},
+        {'name': 'Ardbeg 10', 'category': 'scotch'},
+        {'name': 'Mystery Malt', 'abv': 'strong'},
+    ]
+    response = client.post('/api/catalog/import', data={
+        'file': (io.BytesIO(json.dumps(beverages).encode()), 'catalog.json')
+    })
+    
+    assert response.status_code == 207
+    data = response.get_json()
+    assert data['imported'] == 2
+    assert len(data['errors']) == 1 and data['errors'][0].startswith('Row 6:')
+    ardbegs = MasterBeverage.query.filter_by(name='Ardbeg 10').order_by(MasterBeverage.id).all()
+    assert [(b.brand, b.abv) for b in ardbegs] == [('Ardbeg', 46.0), (None, None)]
+
+
+def test_import_catalog_csv_column_aliases(client, logged_in_user):
+    """Test CSV columns are matched by alias and their values coerced."""
+    content = (
+        'Product_Name,Manufacturer,Spirit_Type,Alcohol,Verified,Unknown\n'
+        'Redbreast 12, Redbreast ,irish,40,yes,x\n'
+        'Teeling Small Batch,Teeling,irish,n/a,no,y\n'
+        '\n'
+        'Short Row,Brand,rum\n'
+    )
+    response = client.post('/api/catalog/import', data={
+        'file': (io.BytesIO(content.encode()), 'catalog.csv')
+    })
+    
+    assert response.status_code == 200
+    assert response.get_json()['imported'] == 3
+    rows = {b.name: b for b in MasterBeverage.query.all()}
+    assert (rows['Redbreast 12'].brand, rows['Redbreast 12'].category) == ('Redbreast', 'irish')
+    assert (rows['Redbreast 12'].abv, rows['Redbreast 12'].verified) == (40.0, True)
+    assert (rows['Teeling Small Batch'].abv, rows['Teeling Small Batch'].verified) == (None, False)
+    assert (rows['Short Row'].brand, rows['Short Row'].category, rows['Short Row'].abv) == ('Brand', 'rum', None)
+
+
+def test_import_catalog_in_batches(client, logged_in_user, monkeypatch):
+    """Test imports commit in batches and list only the first row errors."""
+    monkeypatch.setattr('app.api.catalog._IMPORT_BATCH', 2)
+    monkeypatch.setattr('app.api.catalog._IMPORT_MAX_ERRORS', 1)
+    beverages = [{'name': f'Batch {n}', 'category': 'rum'} for n in range(5)]
+    beverages += [{'name': 'Bad 1', 'abv': 'x'}, {'name': 'Bad 2', 'abv': 'y'}]
+    response = client.post('/api/catalog/import', data={
+        'file': (io.BytesIO(json.dumps(beverages).encode()), 'catalog.json')
+    })
+    
+    assert response.status_code == 207
+    data = response.get_json()
+    assert data['imported'] == 5
+    assert data['error_count'] == 2
+    assert len(data['errors']) == 1
+    assert MasterBeverage.query.filter(MasterBeverage.name.like('Batch %')).count() == 5
+
+
+def test_import_catalog_duplicates_across_batches(client, logged_in_user, monkeypatch):
+    """Test a row repeated in a later batch is skipped and row numbers stay global."""
+    monkeypatch.setattr('app.api.catalog._IMPORT_BATCH', 2)
+    beverages = [
+        {'name': 'Cask One', 'brand': 'Distillery', 'category': 'scotch'},
+        {'name': 'Cask Two', 'brand': 'Distillery', 'category': 'scotch'},
+        {'name': 'Cask Three', 'brand': 'Distillery', 'abv': 'strong'},
+        {'name': 'Cask One', 'brand': 'Distillery', 'category': 'scotch'},
+        {'name': 'Cask Four', 'brand': 'Distillery', 'category': 'scotch'},
+    ]
+    response = client.post('/api/catalog/import', data={
+        'file': (io.BytesIO(json.dumps(beverages).encode()), 'catalog.json')
+    })
+    
+    assert response.status_code == 207
+    data = response.get_json()
+    assert data['imported'] == 3
+    assert len(data['errors']) == 1 and data['errors'][0].startswith('Row 3:')
+    assert MasterBeverage.query.filter_by(name='Cask One').count() == 1
+
+
+def test_search_catalog_total(client, logged_in_user):
+    """Test search pages report the total match count, even past the last page."""
+    client.post('/api/catalog/populate-sample')
+    total = MasterBeverage.query.count()
+    
+    data = client.get('/api/catalog/search', query_string={'limit': 2}).get_json()
+    assert len(data['beverages']) == 2
+    assert data['total'] == total
+    
+    data = client.get('/api/catalog/search', query_string={'q': 'whiskey', 'limit': 1}).get_json()
+    assert [b['name'] for b in data['beverages']] == ['Jameson Irish Whiskey']
+    assert data['total'] == 1
+    
+    data = client.get('/api/catalog/search', query_string={'limit': 2, 'offset': 50}).get_json()
+    assert data['beverages'] == []
+    assert data['total'] == total
+
+
+def test_search_catalog_keyset_pages(client, logged_in_user):
+    """Test catalog pages follow next_cursor and an unfiltered browse uses the cached size."""
+    client.post('/api/catalog/populate-sample')
+    expected = [b.name for b in MasterBeverage.query.order_by(MasterBeverage.name, MasterBeverage.id)]
+    
+    names = []
+    params = {'limit': 3}
+    while True:
+        data = client.get('/api/catalog/search', query_string=params).get_json()
+        names.extend(b['name'] for b in data['beverages'])
+        if not data['next_cursor']:
+            break
+        params = {'limit': 3, **data['next_cursor']}
+    assert names == expected
+    
+    # The browse total is cached until the catalog changes
+    assert client.get('/api/catalog/search').get_json()['total'] == len(expected)
+    db.session.add(MasterBeverage(name='Zz Extra', category='rum'))
+    db.session.commit()
+    assert client.get('/api/catalog/search').get_json()['total'] == len(expected) + 1
+
+
+def test_catalog_lists_cached_until_catalog_changes(client, logged_in_user):
+    """Test category and brand lists revalidate by ETag and refresh after catalog writes."""
+    assert client.get('/api/catalog/categories').get_json()['categories'] == []
+    client.post('/api/catalog/populate-sample')
+    response = client.get('/api/catalog/categories')
+    categories = response.get_json()['categories']
+    assert categories == sorted(categories) and 'bourbon' in categories
+    etag = response.headers['ETag']
+    
+    assert client.get('/api/catalog/categories', headers={'If-None-Match': etag}).status_code == 304
+    brands = client.get('/api/catalog/brands').get_json()['brands']
+    assert 'Macallan' in brands
+    
+    db.session.add(MasterBeverage(name='Havana Club 7', brand='Havana Club', category='rum'))
+    db.session.commit()
+    
+    response = client.get('/api/catalog/categories', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert 'rum' in response.get_json()['categories']
+    assert 'Havana Club' in client.get('/api/catalog/brands').get_json()['brands']
+
+
+def test_catalog_lists_encoded_once(client, logged_in_user, monkeypatch):
+    """Test a cached category list is not re-encoded until the catalog changes."""
+    calls = []
+    real_encode = catalog_api.encode_static_json
+    
+    def counting_encode(payload):
+        calls.append(payload)
+        return real_encode(payload)
+    
+    monkeypatch.setattr(catalog_api, 'encode_static_json', counting_encode)
+    client.post('/api/catalog/populate-sample')
+    
+    first = client.get('/api/catalog/categories')
+    second = client.get('/api/catalog/categories')
+    assert len(calls) == 1
+    assert second.headers['ETag'] == first.headers['ETag']
+    
+    db.session.add(MasterBeverage(name='Havana Club 7', brand='Havana Club', category='rum'))
+    db.session.commit()
+    assert 'rum' in client.get('/api/catalog/categories').get_json()['categories']
+    assert len(calls) == 2
+
+
+def test_find_duplicates_single_query(app, client, logged_in_admin, count_statements):
+    """Test duplicate groups, including ones without a brand, come from one entry query."""
+    db.session.add_all([
+        MasterBeverage(name='Dup', brand='Acme', category='whiskey'),
+        MasterBeverage(name='Dup', brand='Acme', category='whiskey'),
+        MasterBeverage(name='Dup', brand='Other', category='whiskey'),
+        MasterBeverage(name='Plain', category='rum'),
+        MasterBeverage(name='Plain', category='rum'),
+        MasterBeverage(name='Unique', brand='Acme', category='gin'),
+    ])
+    db.session.commit()
+    
+    with count_statements() as statements:
+        data = client.get('/api/admin/catalog/duplicates').get_json()
+    
+    assert data['total_groups'] == 2
+    assert [(g['name'], g['brand'], g['count']) for g in data['duplicates']] == [
+        ('Dup', 'Acme', 2), ('Plain', None, 2)
+    ]
+    assert sum('master_beverages' in s for s in statements) == 1
+
+
+def test_export_catalog_json_streamed(client, logged_in_admin, monkeypatch):
+    """Test the JSON catalog export is streamed and counts its entries."""
+    monkeypatch.setattr('app.api.utils.EXPORT_STREAM_BATCH', 2)
+    client.post('/api/catalog/populate-sample')
+    
+    response = client.get('/api/admin/catalog/export')
+    assert response.status_code == 200
+    assert response.is_streamed
+    data = json.loads(response.get_data())
+    names = [b.name for b in MasterBeverage.query.order_by(MasterBeverage.name)]
+    assert [b['name'] for b in data['beverages']] == names
+    assert data['total_entries'] == len(names)
+    assert 'export_date' in data
@@ -3,7 +3,9 @@ Tests for authentication API endpoints.
 """
 
 import pytest
-from app.models import User, db
+from sqlalchemy import inspect as sa_inspect
+from app import login_manager
+from app.models import User, UserConfig, db
 
 
 class TestRegistration:
@@ -27,6 +29,7 @@ class TestRegistration:
             user = User.query.filter_by(username='newuser').first()
             assert user is not None
             assert user.check_password('password123')
+            assert user.config is not None
     
     def test_register_missing_fields(self, client):
         """Test registration with missing fields."""
@@ -45,7 +48,8 @@ class TestRegistration:
             })
             assert response.status_code == 400
             data = response.get_json()
-            assert 'error' in data
+            assert data['error'] == 'Username already exists'
+            assert User.query.count() == 1
     
     def test_register_duplicate_email(self, client, app, user):
         """Test registration with duplicate email."""
@@ -56,6 +60,7 @@ class TestRegistration:
                 'password': 'password123'
             })
             assert response.status_code == 400
+            assert response.get_json()['error'] == 'Email already exists'
 
 
 class TestLogin:
@@ -113,3 +118,46 @@ class TestLogout:
         response = client.post('/api/auth/logout')
         assert response.status_code == 401 or response.status_code == 302
 
+
+
+class TestCurrentUser:
+    """Test the current user endpoint."""
+    
+    def test_me_not_modified(self, client, app, logged_in_user):
+        """Test a matching ETag gets 304 until the user's details change."""
+        with app.app_context():
+            response = client.get('/api/auth/me')
+            assert response.status_code == 200
+            assert response.get_json()['username'] == 'testuser'
+            etag = response.headers['ETag']
+            
+            response = client.get('/api/auth/me', headers={'If-None-Match': etag})
+            assert response.status_code == 304
+            assert response.headers['ETag'] == etag
+            
+            user = User.query.filter_by(username='testuser').first()
+            user.email = 'changed@example.com'
+            db.session.commit()
+            response = client.get('/api/auth/me', headers={'If-None-Match': etag})
+            assert response.status_code == 200
+            assert response.get_json()['email'] == 'changed@example.com'
+
+
+class TestUserLoader:
+    """Test the Flask-Login user loader."""
+    
+    def test_loads_config_with_user(self, app, db_session, user):
+        """Test the user's config is fetched in the same query as the user."""
+        user_id = user.id
+        db_session.add(UserConfig(user_id=user_id))
+        db_session.commit()
+        db_session.expunge_all()
+        
+        loaded = login_manager._user_callback(str(user_id))
+        assert loaded.id == user_id
+        assert 'config' not in sa_inspect(loaded).unloaded
+        assert loaded.config.user_id == user_id
+    
+    def test_unknown_user(self, app, db_session):
+        """Test an unknown id loads no user."""
+        assert login_manager._user_callback('999') is None
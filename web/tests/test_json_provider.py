@@ -0,0 +1,42 @@
+"""
+Tests for the orjson-backed JSON response provider.
+"""
+
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from flask import jsonify
+
+from app.json_provider import ORJSON_AVAILABLE, OrjsonProvider
+
+
+class TestOrjsonProvider:
+    """Test jsonify() output matches the default provider."""
+    
+    def test_app_uses_provider(self, app):
+        """Test the app factory installs the provider."""
+        assert isinstance(app.json, OrjsonProvider)
+    
+    @pytest.mark.parametrize('payload', [
+        {'b': 1, 'a': [1.5, None, True], 'nested': {'z': 'é', 'y': {}}},
+        {'when': datetime(2025, 1, 2, 3, 4, 5), 'price': Decimal('12.50')},
+        {1: 'one', 2: 'two'},
+        [],
+    ])
+    def test_matches_default_provider(self, app, payload):
+        """Test bodies decode to the same data as the stdlib encoder's."""
+        with app.test_request_context():
+            body = jsonify(payload).get_data()
+            expected = app.json.dumps(payload, separators=(',', ':'))
+        assert body.endswith(b'\n')
+        assert json.loads(body) == json.loads(expected)
+        if ORJSON_AVAILABLE:
+            assert list(json.loads(body)) == list(json.loads(expected))
+    
+    def test_unserializable_raises(self, app):
+        """Test values neither encoder handles still raise TypeError."""
+        with app.test_request_context():
+            with pytest.raises(TypeError):
+                jsonify({'value': object()})
@@ -48,6 +48,13 @@ class TestUser:
         db_session.commit()
         
         assert admin.is_admin is True
+    
+    def test_admin_lookup_uses_partial_index(self, app, db_session):
+        """Test admin lookups read the partial index of admins only."""
+        query = User.query.filter(User.is_admin.is_(True), User.id != 1).with_entities(User.id)
+        sql = str(query.statement.compile(db_session.get_bind(), compile_kwargs={'literal_binds': True}))
+        plan = db_session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}')).all()
+        assert 'ix_users_admin' in ' '.join(row[-1] for row in plan)
 
 
 class TestBottle: